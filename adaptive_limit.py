@@ -0,0 +1,197 @@
+import asyncio
+import contextlib
+import sys
+import threading
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Dict, Iterator, Optional
+
+import aiohttp
+
+# Completed calls per latency check; the limit is judged on this window's p95
+LATENCY_WINDOW = 20
+# p95 this many times above the baseline counts as congestion
+LATENCY_TOLERANCE = 2.0
+# Multiplicative decrease on congestion or overload
+BACKOFF_FACTOR = 0.7
+# Upstream answers that mean "slow down"
+OVERLOAD_STATUSES = (429, 503)
+
+
+def is_overload(error: BaseException) -> bool:
+    """True for errors that signal an overloaded upstream: 429/503 and timeouts"""
+    if isinstance(error, (asyncio.TimeoutError, TimeoutError)):
+        return True
+    if isinstance(error, aiohttp.ClientResponseError):
+        return error.status in OVERLOAD_STATUSES
+    # Only the sync script uses requests; the async one never pays for importing it
+    requests = sys.modules.get("requests")
+    if requests is None:
+        return False
+    if isinstance(error, requests.Timeout):
+        return True
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        return error.response.status_code in OVERLOAD_STATUSES
+    return False
+
+
+def _p95(samples) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency limit for one upstream (quote API, an RPC endpoint, status API)
+
+    While the limit is fully used and latency stays flat it grows by about
+    one slot per round trip (additive increase). A 429/503, a timeout, or a
+    window p95 drifting above `tolerance` x the baseline cuts it by
+    `backoff` (multiplicative decrease), at most once per baseline latency
+    so a burst of errors from one congested moment counts once.
+
+    Works from threads (`slot()`) or from asyncio (`slot_async()`); one
+    instance is meant to be used by one of the two.
+    """
+
+    def __init__(self, name: str,
+                 initial: int = 4,
+                 min_limit: int = 1,
+                 max_limit: int = 64,
+                 window: int = LATENCY_WINDOW,
+                 tolerance: float = LATENCY_TOLERANCE,
+                 backoff: float = BACKOFF_FACTOR):
+        self.name = name
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.tolerance = tolerance
+        self.backoff = backoff
+        self._limit = float(min(max(initial, min_limit), max_limit))
+        self.in_flight = 0
+        self._window: deque = deque(maxlen=window)
+        self._since_check = 0
+        self.baseline: Optional[float] = None  # seconds, lowest recent window p95
+        self._last_decrease = 0.0
+        self._lock = threading.Lock()
+        self._thread_cond = threading.Condition(self._lock)
+        self._async_waiters: deque = deque()
+        self.increases = 0
+        self.decreases = 0
+        self.overloads = 0
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    def _try_acquire(self) -> bool:
+        with self._lock:
+            if self.in_flight >= self.limit:
+                return False
+            self.in_flight += 1
+            return True
+
+    def acquire(self) -> None:
+        with self._thread_cond:
+            while self.in_flight >= self.limit:
+                self._thread_cond.wait()
+            self.in_flight += 1
+
+    async def acquire_async(self) -> None:
+        while not self._try_acquire():
+            waiter = asyncio.get_running_loop().create_future()
+            self._async_waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    self._wake_async()  # pass the wakeup on
+                raise
+            finally:
+                if waiter in self._async_waiters:
+                    self._async_waiters.remove(waiter)
+
+    def _wake_async(self) -> None:
+        free = self.limit - self.in_flight
+        while free > 0 and self._async_waiters:
+            waiter = self._async_waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                free -= 1
+
+    def release(self, latency: Optional[float] = None, overloaded: bool = False) -> None:
+        """Free a slot; `latency` of a good answer feeds the limit, `overloaded` cuts it"""
+        with self._thread_cond:
+            saturated = self.in_flight >= self.limit
+            self.in_flight -= 1
+            if overloaded:
+                self.overloads += 1
+                self._decrease()
+            elif latency is not None:
+                self._observe(latency, saturated)
+            self._thread_cond.notify_all()
+        if self._async_waiters:
+            self._wake_async()
+
+    def _observe(self, latency: float, saturated: bool) -> None:
+        self._window.append(latency)
+        self._since_check += 1
+        if self._since_check >= self._window.maxlen:
+            self._since_check = 0
+            p95 = _p95(self._window)
+            if self.baseline is None or p95 < self.baseline:
+                self.baseline = p95
+            elif p95 > self.baseline * self.tolerance:
+                self._decrease()
+                return
+            else:
+                # Let the baseline follow a slow, uncongested drift
+                self.baseline = 0.95 * self.baseline + 0.05 * p95
+        # Only grow when the limit is what holds callers back
+        if saturated and self._limit < self.max_limit:
+            before = self.limit
+            self._limit = min(self.max_limit, self._limit + 1.0 / self._limit)
+            if self.limit > before:
+                self.increases += 1
+
+    def _decrease(self) -> None:
+        now = time.monotonic()
+        if now - self._last_decrease < (self.baseline or 1.0):
+            return
+        self._last_decrease = now
+        self._limit = max(float(self.min_limit), self._limit * self.backoff)
+        self.decreases += 1
+        self._window.clear()
+        self._since_check = 0
+
+    @contextlib.contextmanager
+    def slot(self) -> Iterator[None]:
+        """`with limiter.slot():` around one upstream call from a thread"""
+        self.acquire()
+        started = time.monotonic()
+        try:
+            yield
+        except BaseException as e:
+            self.release(overloaded=is_overload(e))
+            raise
+        self.release(time.monotonic() - started)
+
+    @contextlib.asynccontextmanager
+    async def slot_async(self) -> AsyncIterator[None]:
+        """`async with limiter.slot_async():` around one upstream call"""
+        await self.acquire_async()
+        started = time.monotonic()
+        try:
+            yield
+        except BaseException as e:
+            self.release(overloaded=is_overload(e))
+            raise
+        self.release(time.monotonic() - started)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "baseline_ms": round(self.baseline * 1000, 1) if self.baseline is not None else None,
+            "increases": self.increases,
+            "decreases": self.decreases,
+            "overloads": self.overloads,
+        }
@@ -0,0 +1,224 @@
+import asyncio
+import itertools
+from typing import Any, Dict, List, Optional
+
+import aiohttp
+
+from adaptive_limit import AdaptiveLimiter
+
+# Keep-alive pool sizing for the shared aiohttp session
+RPC_CONNECTIONS_PER_HOST = 100
+RPC_KEEPALIVE_TIMEOUT = 30
+RPC_TIMEOUT = 15  # seconds per JSON-RPC request
+
+# Batching: pending calls are flushed as one JSON-RPC array when either limit is hit
+BATCH_MAX_SIZE = 50
+BATCH_FLUSH_INTERVAL = 0.01  # seconds
+
+# Transaction fields that JSON-RPC expects as hex quantities
+_QUANTITY_FIELDS = ("value", "gas", "maxFeePerGas", "maxPriorityFeePerGas", "gasPrice", "nonce", "chainId", "type")
+
+
+class RPCError(Exception):
+    """JSON-RPC error object returned by the node"""
+
+    def __init__(self, code: int, message: str, data: Any = None):
+        super().__init__(f"RPC error {code}: {message}")
+        self.code = code
+        self.message = message
+        self.data = data
+
+
+def make_connector(limit_per_host: int = RPC_CONNECTIONS_PER_HOST) -> aiohttp.TCPConnector:
+    """Connection pool for the session shared by the RPC client and the Gas.zip API"""
+    return aiohttp.TCPConnector(limit=0,
+                                limit_per_host=limit_per_host,
+                                keepalive_timeout=RPC_KEEPALIVE_TIMEOUT,
+                                ttl_dns_cache=300)
+
+
+def to_rpc_transaction(tx: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert a web3-style transaction dict into JSON-RPC wire format"""
+    out = {}
+    for key, value in tx.items():
+        if key in _QUANTITY_FIELDS and isinstance(value, int):
+            out[key] = hex(value)
+        else:
+            out[key] = value
+    return out
+
+
+class EthMethods:
+    """Typed wrappers for the eth_* calls used by the senders; subclasses provide `call()`"""
+
+    async def call(self, method: str, params: Optional[List[Any]] = None) -> Any:
+        raise NotImplementedError
+
+    async def block_number(self) -> int:
+        return int(await self.call("eth_blockNumber"), 16)
+
+    async def get_block(self, block: Any = "latest", full_transactions: bool = False) -> Dict[str, Any]:
+        if isinstance(block, int):
+            block = hex(block)
+        return await self.call("eth_getBlockByNumber", [block, full_transactions])
+
+    async def max_priority_fee(self) -> int:
+        return int(await self.call("eth_maxPriorityFeePerGas"), 16)
+
+    async def get_balance(self, address: str, block: str = "latest") -> int:
+        return int(await self.call("eth_getBalance", [address, block]), 16)
+
+    async def get_transaction_count(self, address: str, block: str = "latest") -> int:
+        return int(await self.call("eth_getTransactionCount", [address, block]), 16)
+
+    async def get_transaction(self, tx_hash: str) -> Optional[Dict[str, Any]]:
+        return await self.call("eth_getTransactionByHash", [tx_hash])
+
+    async def get_transaction_receipt(self, tx_hash: str) -> Optional[Dict[str, Any]]:
+        return await self.call("eth_getTransactionReceipt", [tx_hash])
+
+    async def find_transaction(self, tx_hash: str) -> Optional[Dict[str, Any]]:
+        """Look a transaction up wherever it may be known; a pool asks every endpoint"""
+        return await self.get_transaction(tx_hash)
+
+    async def estimate_gas(self, tx: Dict[str, Any]) -> int:
+        return int(await self.call("eth_estimateGas", [to_rpc_transaction(tx)]), 16)
+
+    async def send_raw_transaction(self, raw_transaction: Any) -> str:
+        if isinstance(raw_transaction, (bytes, bytearray)):
+            raw_transaction = "0x" + bytes(raw_transaction).hex()
+        return await self.call("eth_sendRawTransaction", [raw_transaction])
+
+
+class AsyncRPCClient(EthMethods):
+    """Native async JSON-RPC client running on a pooled aiohttp session
+
+    With a `limiter` the number of HTTP requests in flight to this endpoint
+    adapts to its latency and 429s instead of being fixed.
+    """
+
+    def __init__(self, session: aiohttp.ClientSession, url: str, timeout: float = RPC_TIMEOUT,
+                 limiter: Optional[AdaptiveLimiter] = None):
+        self.session = session
+        self.url = url
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.limiter = limiter
+        self._ids = itertools.count(1)
+        self.calls = 0  # JSON-RPC method calls
+        self.requests = 0  # HTTP round trips
+
+    def _payload(self, method: str, params: Optional[List[Any]]) -> Dict[str, Any]:
+        return {"jsonrpc": "2.0", "id": next(self._ids), "method": method, "params": params or []}
+
+    @staticmethod
+    def _result(response: Dict[str, Any]) -> Any:
+        error = response.get("error")
+        if error:
+            raise RPCError(error.get("code", 0), error.get("message", ""), error.get("data"))
+        return response.get("result")
+
+    async def _post(self, body: Any) -> Any:
+        if self.limiter is None:
+            return await self._send(body)
+        async with self.limiter.slot_async():
+            return await self._send(body)
+
+    async def _send(self, body: Any) -> Any:
+        self.requests += 1
+        async with self.session.post(self.url, json=body, timeout=self.timeout) as resp:
+            resp.raise_for_status()
+            return await resp.json(content_type=None)
+
+    async def call(self, method: str, params: Optional[List[Any]] = None) -> Any:
+        self.calls += 1
+        return self._result(await self._post(self._payload(method, params)))
+
+    async def call_batch(self, payloads: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Send several prepared payloads as one JSON-RPC batch array"""
+        self.calls += len(payloads)
+        responses = await self._post(payloads)
+        if isinstance(responses, dict):
+            # Some nodes answer a rejected batch with a single error object
+            self._result(responses)
+            raise RPCError(-32603, "unexpected non-batch response")
+        return responses
+
+
+class RPCBatcher(EthMethods):
+    """Coalesces concurrent calls from many wallets into JSON-RPC batch requests
+
+    Calls queue up until `max_size` are pending or `flush_interval` seconds pass
+    since the first one, then go out as a single HTTP request. Each caller still
+    awaits its own result or `RPCError`.
+    """
+
+    def __init__(self, client: AsyncRPCClient,
+                 max_size: int = BATCH_MAX_SIZE,
+                 flush_interval: float = BATCH_FLUSH_INTERVAL):
+        self.client = client
+        self.max_size = max_size
+        self.flush_interval = flush_interval
+        self._pending: List[tuple] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._in_flight: set = set()
+        self.batches = 0
+
+    async def call(self, method: str, params: Optional[List[Any]] = None) -> Any:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((self.client._payload(method, params), future))
+        if len(self._pending) >= self.max_size:
+            self.flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.flush_interval, self.flush)
+        return await future
+
+    def flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        task = asyncio.create_task(self._send(batch))
+        self._in_flight.add(task)
+        task.add_done_callback(self._in_flight.discard)
+
+    async def _send(self, batch: List[tuple]) -> None:
+        self.batches += 1
+        try:
+            responses = await self.client.call_batch([payload for payload, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        by_id = {response.get("id"): response for response in responses}
+        for payload, future in batch:
+            if future.done():
+                continue
+            response = by_id.get(payload["id"])
+            if response is None:
+                future.set_exception(RPCError(-32603, f"no response for {payload['method']} in batch"))
+                continue
+            try:
+                future.set_result(self.client._result(response))
+            except RPCError as e:
+                future.set_exception(e)
+
+    async def send_raw_transaction(self, raw_transaction: Any) -> str:
+        # Broadcasts skip the batch: they are latency-critical and a pool fans them out
+        return await self.client.send_raw_transaction(raw_transaction)
+
+    async def find_transaction(self, tx_hash: str) -> Optional[Dict[str, Any]]:
+        return await self.client.find_transaction(tx_hash)
+
+    async def close(self) -> None:
+        """Flush whatever is still queued and wait for in-flight batches"""
+        self.flush()
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight, return_exceptions=True)
+
+    def stats(self) -> Dict[str, int]:
+        return {"calls": self.client.calls, "http_requests": self.client.requests, "batches": self.batches}
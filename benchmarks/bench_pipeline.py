@@ -0,0 +1,176 @@
+"""End-to-end benchmark: run the sender scripts against the local simulator
+
+Each mode runs as a subprocess in its own scratch directory with synthetic
+`pk.txt` / `wallets.txt` and `GAS_ZIP_API_BASE_URL` / `BASE_RPC_URLS` pointed
+at `simulator.py`, so no real ETH or API quota is spent. Per mode it reports
+wallets/s, p50/p99 time between journal states (quoted -> signed ->
+broadcast -> included / confirmed), the scripts' own per-stage latencies (from their
+`METRICS_SNAPSHOT_PATH` snapshot) and how many Gas.zip and RPC requests were
+made.
+
+Run from the repository root:
+
+    python benchmarks/bench_pipeline.py --wallets 100 1000 --modes async presign
+    python benchmarks/bench_pipeline.py --wallets 10000 --modes async --latency 0.05 --error-rate 0.01
+"""
+import argparse
+import collections
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from eth_account import Account  # noqa: E402
+from eth_utils import keccak  # noqa: E402
+
+from journal import BROADCAST, CONFIRMED, INCLUDED, QUOTED, SIGNED, iter_journal  # noqa: E402
+from simulator import Simulator, add_arguments, from_arguments  # noqa: E402
+
+REPO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+BASE58_ALPHABET = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+
+# Each mode is a list of command lines run one after another in the same directory
+MODES: Dict[str, List[List[str]]] = {
+    "sync": [["send_tokens.py"]],
+    "async": [["send_tokens_async.py"]],
+    "presign": [["send_tokens_async.py", "--presign", "spool.jsonl"],
+                ["send_tokens_async.py", "--broadcast-spool", "spool.jsonl"]],
+}
+
+STAGES = [("sign", QUOTED, SIGNED), ("broadcast", SIGNED, BROADCAST), ("include", BROADCAST, INCLUDED),
+          ("confirm", BROADCAST, CONFIRMED)]
+
+
+def b58encode(raw: bytes) -> str:
+    n = int.from_bytes(raw, "big")
+    out = ""
+    while n:
+        n, r = divmod(n, 58)
+        out = BASE58_ALPHABET[r] + out
+    return "1" * (len(raw) - len(raw.lstrip(b"\x00"))) + out
+
+
+def write_inputs(directory: str, wallets: int, keys: int) -> None:
+    # Deterministic, so runs are comparable; only the simulator ever sees these keys
+    with open(os.path.join(directory, "pk.txt"), "w") as f:
+        for i in range(keys):
+            f.write(Account.from_key(keccak(b"benchmark key %d" % i)).key.hex() + "\n")
+    with open(os.path.join(directory, "wallets.txt"), "w") as f:
+        for i in range(wallets):
+            f.write(b58encode(keccak(b"benchmark wallet %d" % i)) + "\n")
+
+
+def percentile(values: List[float], share: float) -> Optional[float]:
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(share * len(values)))]
+
+
+def journal_timings(path: str) -> Dict[str, object]:
+    """First timestamp of every state per wallet -> per-stage durations and throughput"""
+    first: Dict[str, Dict[str, float]] = collections.defaultdict(dict)
+    for record in iter_journal(path):
+        first[record["wallet"]].setdefault(record["state"], record["ts"])
+    stages = {}
+    for name, start, end in STAGES:
+        durations = [states[end] - states[start] for states in first.values() if start in states and end in states]
+        stages[name] = durations
+    broadcast = sorted(states[BROADCAST] for states in first.values() if BROADCAST in states)
+    confirmed = sum(1 for states in first.values() if CONFIRMED in states)
+    return {"stages": stages, "broadcast": broadcast, "confirmed": confirmed}
+
+
+def run_mode(mode: str, wallets: int, keys: int, simulator: Simulator, timeout: float) -> Dict[str, object]:
+    before = simulator.counts.copy()
+    with tempfile.TemporaryDirectory(prefix=f"bench-{mode}-") as directory:
+        write_inputs(directory, wallets, keys)
+        snapshot_path = os.path.join(directory, "metrics.json")
+        env = dict(os.environ, GAS_ZIP_API_BASE_URL=simulator.api_url, BASE_RPC_URLS=",".join(simulator.rpc_urls),
+                   METRICS_SNAPSHOT_PATH=snapshot_path)
+        started = time.time()
+        log_path = os.path.join(directory, "output.log")
+        process_stages = {}
+        with open(log_path, "w") as log:
+            for command in MODES[mode]:
+                process = subprocess.run([sys.executable, os.path.join(REPO, command[0])] + command[1:],
+                                         cwd=directory, env=env, stdout=log, stderr=subprocess.STDOUT,
+                                         timeout=timeout)
+                if process.returncode != 0:
+                    with open(log_path) as f:
+                        tail = f.read()[-2000:]
+                    raise RuntimeError(f"{mode}: {command[0]} exited with {process.returncode}\n{tail}")
+                if os.path.exists(snapshot_path):
+                    with open(snapshot_path) as f:
+                        process_stages[" ".join(command)] = json.load(f)["stages"]
+        elapsed = time.time() - started
+        timings = journal_timings(os.path.join(directory, "bridge_journal.jsonl"))
+    counts = simulator.counts.copy()
+    counts.subtract(before)
+    broadcast = timings["broadcast"]
+    send_window = broadcast[-1] - started if broadcast else 0.0
+    return {
+        "mode": mode,
+        "wallets": wallets,
+        "elapsed_s": elapsed,
+        "sent": len(broadcast),
+        "confirmed": timings["confirmed"],
+        "sent_per_s": len(broadcast) / send_window if send_window else 0.0,
+        "wallets_per_s": wallets / elapsed,
+        "stages": {name: (percentile(d, 0.5), percentile(d, 0.99)) for name, d in timings["stages"].items()},
+        "process_stages": process_stages,
+        "requests": {key: value for key, value in counts.items() if value and not key.startswith("rpc endpoint")},
+    }
+
+
+def report(result: Dict[str, object]) -> None:
+    print(f"\n{result['mode']} x {result['wallets']} wallets: {result['elapsed_s']:.1f}s total, "
+          f"{result['sent']} sent ({result['sent_per_s']:.1f}/s), {result['confirmed']} confirmed, "
+          f"{result['wallets_per_s']:.1f} wallets/s end to end")
+    for name, (p50, p99) in result["stages"].items():
+        if p50 is not None:
+            print(f"  {name:<10} p50 {p50 * 1000:9.1f} ms   p99 {p99 * 1000:9.1f} ms")
+    for command, stages in result["process_stages"].items():
+        print(f"  {command}:")
+        for name, stats in stages.items():
+            print(f"    {name:<12} x{stats['count']:<7} p50 {stats['p50_ms']:9.1f} ms   p99 {stats['p99_ms']:9.1f} ms"
+                  f"   {stats['errors']} errors")
+    requests = result["requests"]
+    rpc_calls = sum(v for k, v in requests.items() if k.startswith("rpc eth_"))
+    per_wallet = rpc_calls / result["sent"] if result["sent"] else 0.0
+    print(f"  requests   {rpc_calls} RPC calls ({per_wallet:.2f}/sent wallet) "
+          f"in {requests.get('rpc batches', 0)} batches")
+    for key in sorted(requests):
+        print(f"    {key:<34} {requests[key]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--wallets", type=int, nargs="+", default=[100, 1000])
+    parser.add_argument("--modes", nargs="+", choices=sorted(MODES), default=["sync", "async"])
+    parser.add_argument("--keys", type=int, default=1, help="sender keys in pk.txt")
+    parser.add_argument("--timeout", type=float, default=3600, help="per-command timeout, seconds")
+    parser.add_argument("--json", metavar="PATH", help="also write the results to this file")
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    simulator = from_arguments(args)
+    simulator.start_in_thread()
+    results = []
+    for wallets in args.wallets:
+        for mode in args.modes:
+            result = run_mode(mode, wallets, args.keys, simulator, args.timeout)
+            report(result)
+            results.append(result)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Micro-benchmark: strict Solana address validation vs the original charset check
+
+Run from the repository root:
+
+    python benchmarks/bench_solana_address.py [N]
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from solana_address import BASE58_ALPHABET, is_valid_address  # noqa: E402
+
+
+def legacy_validate_solana_address(address):
+    """The validator both scripts shipped with (charset + length only)"""
+    if not address or len(address) < 32 or len(address) > 44:
+        return False
+    allowed_chars = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+    return all(c in allowed_chars for c in address)
+
+
+def b58encode(raw):
+    n = int.from_bytes(raw, "big")
+    out = ""
+    while n:
+        n, r = divmod(n, 58)
+        out = BASE58_ALPHABET[r] + out
+    return "1" * (len(raw) - len(raw.lstrip(b"\x00"))) + out
+
+
+def make_addresses(count):
+    # Mostly real-looking pubkeys plus the kinds of junk found in wallet files
+    addresses = [b58encode(os.urandom(32)) for _ in range(count)]
+    for i in range(0, count, 50):
+        addresses[i] = addresses[i][:-3] + "0Ol"  # foreign characters
+    for i in range(25, count, 50):
+        addresses[i] = b58encode(os.urandom(33))  # right charset, wrong length
+    return addresses
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    addresses = make_addresses(count)
+    legacy_accepts = sum(map(legacy_validate_solana_address, addresses))
+    strict_accepts = sum(map(is_valid_address, addresses))
+    print(f"{count} addresses: legacy accepts {legacy_accepts}, strict accepts {strict_accepts}")
+
+    cases = [
+        ("legacy all(c in allowed)", lambda: [legacy_validate_solana_address(a) for a in addresses]),
+        ("is_valid_address", lambda: [is_valid_address(a) for a in addresses]),
+        ("is_valid_address on-curve",
+         lambda: [is_valid_address(a, require_on_curve=True) for a in addresses[:count // 10]]),
+    ]
+    for name, fn in cases:
+        best = min(timeit.repeat(fn, number=1, repeat=3))
+        n = count // 10 if "on-curve" in name else count
+        print(f"  {name:<28} {best * 1e6 / n:8.2f} us/address")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""Simulator-driven check of RPC failover: circuit-breaker trips and broadcast fan-out
+
+Runs `RPCPool` (async script) and `FailoverHTTPProvider` (sync script)
+against three simulated endpoints and exits non-zero on the first failed
+check:
+
+- with one endpoint answering only 503s, reads keep succeeding, its breaker
+  opens and it stops receiving traffic;
+- a signed transaction reaches every healthy endpoint, and still goes out
+  while one of them is down.
+
+Run from the repository root:
+
+    python benchmarks/check_rpc_pool.py
+"""
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import aiohttp  # noqa: E402
+from eth_account import Account  # noqa: E402
+from eth_utils import keccak  # noqa: E402
+
+from presign import sign_transaction  # noqa: E402
+from rpc_pool import BREAKER_MIN_CALLS, OPEN, RPCPool  # noqa: E402
+from simulator import BASE_CHAIN_ID, Simulator  # noqa: E402
+
+DOWN = 2
+READS = BREAKER_MIN_CALLS * 4
+KEY = Account.from_key(keccak(b"rpc pool check key"))
+
+
+def check(condition: bool, message: str) -> None:
+    if not condition:
+        raise SystemExit(f"FAIL: {message}")
+    print(f"ok    {message}")
+
+
+def endpoint_counts(simulator: Simulator) -> list:
+    return [simulator.counts[f"rpc endpoint {n}"] for n in range(simulator.rpc_endpoints)]
+
+
+def signed_transfer(nonce: int) -> tuple:
+    return sign_transaction({"type": 2, "chainId": BASE_CHAIN_ID, "nonce": nonce, "to": KEY.address, "value": 0,
+                             "gas": 21000, "maxFeePerGas": 10 ** 9, "maxPriorityFeePerGas": 10 ** 6},
+                            KEY.key.hex())
+
+
+def wait_for(predicate, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.02)
+    return True
+
+
+async def check_async_pool(simulator: Simulator) -> None:
+    async with aiohttp.ClientSession() as session:
+        pool = RPCPool.from_urls(session, simulator.rpc_urls, broadcast_fanout=simulator.rpc_endpoints)
+        simulator.down_endpoints = {DOWN}
+        for _ in range(READS):
+            await pool.block_number()
+        check(pool.failovers > 0, f"async: {READS} reads fail over around endpoint {DOWN} ({pool.failovers} failovers)")
+        down = pool.endpoints[DOWN]
+        check(down.state == OPEN and down.trips >= 1, f"async: breaker of endpoint {DOWN} is open ({down.stats()})")
+        before = endpoint_counts(simulator)[DOWN]
+        for _ in range(READS):
+            await pool.block_number()
+        check(endpoint_counts(simulator)[DOWN] == before, f"async: no reads go to endpoint {DOWN} while it is open")
+
+        raw, signed_hash = signed_transfer(await pool.get_transaction_count(KEY.address, "pending"))
+        tx_hash = await pool.send_raw_transaction(raw)
+        check(tx_hash == signed_hash, "async: broadcast succeeds while an endpoint is down")
+
+        simulator.down_endpoints = set()
+        healthy = RPCPool.from_urls(session, simulator.rpc_urls, broadcast_fanout=simulator.rpc_endpoints)
+        raw, signed_hash = signed_transfer(await healthy.get_transaction_count(KEY.address, "pending"))
+        before = endpoint_counts(simulator)
+        tx_hash = await healthy.send_raw_transaction(raw)
+        await asyncio.gather(*healthy._background, return_exceptions=True)
+        sent = [after - was for after, was in zip(endpoint_counts(simulator), before)]
+        check(tx_hash == signed_hash and sent == [1] * simulator.rpc_endpoints,
+              f"async: broadcast fans out to every endpoint (requests per endpoint: {sent})")
+
+
+def check_sync_provider(simulator: Simulator) -> None:
+    from web3 import Web3
+    from web3_provider import FailoverHTTPProvider
+
+    provider = FailoverHTTPProvider(simulator.rpc_urls, broadcast_fanout=simulator.rpc_endpoints)
+    web3 = Web3(provider)
+    simulator.down_endpoints = {DOWN}
+    for _ in range(READS):
+        web3.eth.block_number
+    down = provider.endpoints[DOWN]
+    check(down.state == OPEN and down.trips >= 1, f"sync: breaker of endpoint {DOWN} is open ({down.stats()})")
+
+    simulator.down_endpoints = set()
+    healthy = FailoverHTTPProvider(simulator.rpc_urls, broadcast_fanout=simulator.rpc_endpoints)
+    web3 = Web3(healthy)
+    raw, signed_hash = signed_transfer(web3.eth.get_transaction_count(KEY.address, "pending"))
+    before = endpoint_counts(simulator)
+    tx_hash = "0x" + bytes(web3.eth.send_raw_transaction(raw)).hex()
+    fanned_out = wait_for(lambda: all(after > was for after, was in zip(endpoint_counts(simulator), before)))
+    check(tx_hash == signed_hash and fanned_out, "sync: broadcast fans out to every endpoint")
+
+
+def main():
+    simulator = Simulator(latency=0.005, rpc_endpoints=3, block_time=0.5)
+    simulator.start_in_thread()
+    asyncio.run(check_async_pool(simulator))
+    check_sync_provider(simulator)
+    print("all RPC pool checks passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,408 @@
+"""Local stand-in for the Gas.zip API and Base JSON-RPC, for benchmarks
+
+Serves, on one port:
+
+    GET  /v2/quotes/{deposit_chain}/{amount_wei}/{outbound_chain}?to=&from=
+    GET  /v2/deposit/{tx_hash}
+    POST /rpc/{n}          JSON-RPC (single and batch), n = 0..rpc_endpoints-1
+
+The chain is a small model of Base: a block every `block_time` seconds, a
+seeded random-walk base fee, and a mempool that includes transactions in
+nonce order once their max fee covers the base fee. Replacements need a 10%
+fee bump, like geth; `fee_spike` makes the base fee jump once to strand
+underpriced transactions. A deposit is CONFIRMED `confirm_delay` seconds
+after its transaction is included.
+
+Every response is delayed by `latency` (+/- `jitter`) and fails with a 503
+at `error_rate`; RPC endpoints in `down_endpoints` answer every request with
+a 503 (to trip circuit breakers); `quote_rps` makes `/quotes` answer 429 with `Retry-After`
+above that rate. Request counts per endpoint and RPC method are kept in
+`Simulator.counts` and served at `GET /stats`.
+
+Run standalone:
+
+    python benchmarks/simulator.py --port 8545 --latency 0.05 --block-time 2
+"""
+import argparse
+import asyncio
+import collections
+import os
+import random
+import sys
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import rlp
+from aiohttp import web
+from eth_account import Account
+from eth_utils import keccak
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from solana_address import decode_pubkey  # noqa: E402
+
+BASE_CHAIN_ID = 8453
+GAS_LIMIT = 30_000_000
+INITIAL_BASE_FEE = 10_000_000  # 0.01 gwei, about what Base runs at
+PRIORITY_FEE = 1_000_000
+BRIDGE_GAS = 31_000
+STARTING_BALANCE = 10 ** 24  # wei per address
+REPLACEMENT_BUMP = 1.1
+
+
+class _Tx:
+    __slots__ = ("hash", "sender", "nonce", "max_fee", "tip", "sent_at", "block")
+
+    def __init__(self, tx_hash: str, sender: str, nonce: int, max_fee: int, tip: int):
+        self.hash = tx_hash
+        self.sender = sender
+        self.nonce = nonce
+        self.max_fee = max_fee
+        self.tip = tip
+        self.sent_at = time.monotonic()
+        self.block: Optional[int] = None
+
+
+class RPCError(Exception):
+    def __init__(self, message: str, code: int = -32000):
+        super().__init__(message)
+        self.code = code
+
+
+def decode_raw_transaction(raw: bytes) -> _Tx:
+    """Sender, nonce and fees of a signed EIP-1559 transaction"""
+    if raw[:1] != b"\x02":
+        raise RPCError("only EIP-1559 transactions are simulated")
+    fields = rlp.decode(raw[1:])
+    nonce, tip, max_fee = (int.from_bytes(fields[i], "big") for i in (1, 2, 3))
+    sender = Account.recover_transaction(raw).lower()
+    return _Tx("0x" + keccak(raw).hex(), sender, nonce, max_fee, tip)
+
+
+class Chain:
+    """Blocks, base fee and mempool; advanced lazily from the wall clock"""
+
+    def __init__(self, block_time: float, seed: int = 0, base_fee_volatility: float = 0.02,
+                 fee_spike: Optional[Tuple[int, float]] = None):
+        self.block_time = block_time
+        self.started = time.monotonic()
+        self.volatility = base_fee_volatility
+        self.fee_spike = fee_spike  # (block number, factor): base fee jumps once, to strand underpriced txs
+        self._random = random.Random(seed)
+        self.base_fees: List[int] = [INITIAL_BASE_FEE]
+        self.blocks: List[List[str]] = [[]]
+        self.txs: Dict[str, _Tx] = {}
+        self.pending: Dict[str, Dict[int, _Tx]] = collections.defaultdict(dict)
+        self.next_nonce: Dict[str, int] = collections.defaultdict(int)
+
+    def head(self) -> int:
+        number = int((time.monotonic() - self.started) / self.block_time)
+        while len(self.blocks) <= number:
+            self._produce()
+        return number
+
+    def _produce(self) -> None:
+        number = len(self.blocks)
+        drift = 1 + self._random.uniform(-self.volatility, self.volatility)
+        base_fee = max(1, int(self.base_fees[-1] * drift))
+        if self.fee_spike is not None and number == self.fee_spike[0]:
+            base_fee = int(base_fee * self.fee_spike[1])
+        block_started = self.started + number * self.block_time
+        included = []
+        for sender, queue in self.pending.items():
+            nonce = self.next_nonce[sender]
+            while nonce in queue and queue[nonce].max_fee >= base_fee and queue[nonce].sent_at < block_started:
+                tx = queue.pop(nonce)
+                tx.block = number
+                included.append(tx.hash)
+                nonce += 1
+            self.next_nonce[sender] = nonce
+        self.base_fees.append(base_fee)
+        self.blocks.append(included)
+
+    def pending_count(self, sender: str) -> int:
+        self.head()
+        queue = self.pending.get(sender, {})
+        nonce = self.next_nonce[sender]
+        while nonce in queue:
+            nonce += 1
+        return nonce
+
+    def submit(self, raw: bytes) -> str:
+        tx = decode_raw_transaction(raw)
+        self.head()
+        if tx.hash in self.txs:
+            raise RPCError("already known")
+        if tx.nonce < self.next_nonce[tx.sender]:
+            raise RPCError("nonce too low")
+        queue = self.pending[tx.sender]
+        old = queue.get(tx.nonce)
+        if old is not None:
+            if tx.max_fee < old.max_fee * REPLACEMENT_BUMP or tx.tip < old.tip * REPLACEMENT_BUMP:
+                raise RPCError("replacement transaction underpriced")
+            del self.txs[old.hash]
+        queue[tx.nonce] = tx
+        self.txs[tx.hash] = tx
+        return tx.hash
+
+    def block(self, number: int, full: bool) -> Dict[str, Any]:
+        timestamp = int(time.time() - (self.head() - number) * self.block_time)
+        hashes = self.blocks[number]
+        return {
+            "number": hex(number),
+            "hash": "0x" + keccak(number.to_bytes(8, "big")).hex(),
+            "parentHash": "0x" + keccak(max(number - 1, 0).to_bytes(8, "big")).hex(),
+            "timestamp": hex(timestamp),
+            "baseFeePerGas": hex(self.base_fees[number]),
+            "gasLimit": hex(GAS_LIMIT),
+            "gasUsed": hex(BRIDGE_GAS * len(hashes)),
+            "miner": "0x4200000000000000000000000000000000000011",
+            "transactions": [self.transaction(h) for h in hashes] if full else hashes,
+        }
+
+    def transaction(self, tx_hash: str) -> Optional[Dict[str, Any]]:
+        tx = self.txs.get(tx_hash)
+        if tx is None:
+            return None
+        return {"hash": tx.hash, "from": tx.sender, "nonce": hex(tx.nonce),
+                "maxFeePerGas": hex(tx.max_fee), "maxPriorityFeePerGas": hex(tx.tip),
+                "blockNumber": hex(tx.block) if tx.block is not None else None}
+
+    def receipt(self, tx_hash: str) -> Optional[Dict[str, Any]]:
+        self.head()
+        tx = self.txs.get(tx_hash)
+        if tx is None or tx.block is None:
+            return None
+        return {"transactionHash": tx.hash, "from": tx.sender, "blockNumber": hex(tx.block),
+                "status": "0x1", "gasUsed": hex(BRIDGE_GAS),
+                "effectiveGasPrice": hex(min(tx.max_fee, self.base_fees[tx.block] + tx.tip))}
+
+    def confirmed_at(self, tx_hash: str) -> Optional[float]:
+        """Monotonic time the transaction was included, None while it is not"""
+        self.head()
+        tx = self.txs.get(tx_hash)
+        if tx is None or tx.block is None:
+            return None
+        return self.started + tx.block * self.block_time
+
+
+class Simulator:
+    def __init__(self, latency: float = 0.02, jitter: float = 0.5, error_rate: float = 0.0,
+                 block_time: float = 2.0, confirm_delay: float = 1.0, quote_rps: Optional[float] = None,
+                 rpc_endpoints: int = 1, seed: int = 0, fee_spike: Optional[Tuple[int, float]] = None,
+                 down_endpoints: Iterable[int] = ()):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.confirm_delay = confirm_delay
+        self.quote_rps = quote_rps
+        self.rpc_endpoints = rpc_endpoints
+        self.down_endpoints = set(down_endpoints)
+        self.chain = Chain(block_time, seed, fee_spike=fee_spike)
+        self.counts: Dict[str, int] = collections.Counter()
+        self._random = random.Random(seed)
+        self._quote_times: collections.deque = collections.deque()
+        self.app = web.Application()
+        self.app.router.add_get("/v2/quotes/{deposit_chain}/{amount}/{outbound_chain}", self.quotes)
+        self.app.router.add_get("/v2/deposit/{tx_hash}", self.deposit)
+        self.app.router.add_post("/rpc/{endpoint}", self.rpc)
+        self.app.router.add_get("/stats", self.stats)
+        self._runner: Optional[web.AppRunner] = None
+        self.port: Optional[int] = None
+
+    # ---------- endpoints ----------
+
+    async def _delay(self) -> bool:
+        """Simulated network latency; False when this request should fail"""
+        if self.latency:
+            await asyncio.sleep(self.latency * self._random.uniform(1 - self.jitter, 1 + self.jitter))
+        return self._random.random() >= self.error_rate
+
+    def _throttled(self) -> bool:
+        if not self.quote_rps:
+            return False
+        now = time.monotonic()
+        while self._quote_times and self._quote_times[0] < now - 1.0:
+            self._quote_times.popleft()
+        if len(self._quote_times) >= self.quote_rps:
+            return True
+        self._quote_times.append(now)
+        return False
+
+    async def quotes(self, request: web.Request) -> web.Response:
+        self.counts["gaszip /quotes"] += 1
+        if not await self._delay():
+            return web.Response(status=503)
+        if self._throttled():
+            self.counts["gaszip /quotes 429"] += 1
+            return web.Response(status=429, headers={"Retry-After": "1"})
+        destination = request.query.get("to", "")
+        try:
+            pubkey = decode_pubkey(destination).hex()
+        except ValueError:
+            return web.json_response({"error": "invalid destination"}, status=400)
+        amount = int(request.match_info["amount"])
+        return web.json_response({
+            "calldata": "0x010b" + pubkey,
+            "quotes": [{"chain": int(request.match_info["outbound_chain"]),
+                        "expected": str(amount // 1000), "usd": amount / 1e18 * 3000}],
+        })
+
+    async def deposit(self, request: web.Request) -> web.Response:
+        self.counts["gaszip /deposit"] += 1
+        if not await self._delay():
+            return web.Response(status=503)
+        tx_hash = request.match_info["tx_hash"].lower()
+        included = self.chain.confirmed_at(tx_hash)
+        if included is None:
+            return web.json_response({"error": "not found"}, status=404)
+        status = "CONFIRMED" if time.monotonic() >= included + self.confirm_delay else "SEEN"
+        outbound = [{"hash": "sim" + tx_hash[2:18]}] if status == "CONFIRMED" else []
+        return web.json_response({"deposit": {"status": status}, "outbound": outbound})
+
+    def _call(self, method: str, params: List[Any]) -> Any:
+        chain = self.chain
+        self.counts[f"rpc {method}"] += 1
+        if method == "eth_chainId":
+            return hex(BASE_CHAIN_ID)
+        if method == "net_version":
+            return str(BASE_CHAIN_ID)
+        if method == "web3_clientVersion":
+            return "gaszip-benchmark-simulator"
+        if method == "eth_blockNumber":
+            return hex(chain.head())
+        if method == "eth_getBlockByNumber":
+            head = chain.head()
+            number = head if params[0] in ("latest", "pending") else int(params[0], 16)
+            return chain.block(number, bool(params[1])) if number <= head else None
+        if method == "eth_maxPriorityFeePerGas":
+            return hex(PRIORITY_FEE)
+        if method == "eth_gasPrice":
+            return hex(chain.base_fees[chain.head()] + PRIORITY_FEE)
+        if method == "eth_getBalance":
+            return hex(STARTING_BALANCE)
+        if method == "eth_getTransactionCount":
+            address = params[0].lower()
+            return hex(chain.pending_count(address) if params[1] == "pending" else chain.next_nonce[address])
+        if method == "eth_estimateGas":
+            return hex(BRIDGE_GAS)
+        if method == "eth_sendRawTransaction":
+            raw = params[0]
+            return chain.submit(bytes.fromhex(raw[2:] if raw.startswith("0x") else raw))
+        if method == "eth_getTransactionByHash":
+            return chain.transaction(params[0].lower())
+        if method == "eth_getTransactionReceipt":
+            return chain.receipt(params[0].lower())
+        if method == "eth_getBlockReceipts":
+            head = chain.head()
+            number = head if params[0] == "latest" else int(params[0], 16)
+            return [chain.receipt(h) for h in chain.blocks[number]] if number <= head else None
+        raise RPCError(f"method {method} not simulated", -32601)
+
+    def _answer(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        response = {"jsonrpc": "2.0", "id": payload.get("id")}
+        try:
+            response["result"] = self._call(payload["method"], payload.get("params") or [])
+        except RPCError as e:
+            response["error"] = {"code": e.code, "message": str(e)}
+        return response
+
+    async def rpc(self, request: web.Request) -> web.Response:
+        self.counts[f"rpc endpoint {request.match_info['endpoint']}"] += 1
+        if not await self._delay() or int(request.match_info["endpoint"]) in self.down_endpoints:
+            return web.Response(status=503)
+        body = await request.json()
+        if isinstance(body, list):
+            self.counts["rpc batches"] += 1
+            return web.json_response([self._answer(payload) for payload in body])
+        return web.json_response(self._answer(body))
+
+    async def stats(self, request: web.Request) -> web.Response:
+        return web.json_response({"counts": dict(self.counts), "head": self.chain.head(),
+                                  "pending": sum(len(q) for q in self.chain.pending.values())})
+
+    # ---------- lifecycle ----------
+
+    @property
+    def api_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}/v2"
+
+    @property
+    def rpc_urls(self) -> List[str]:
+        return [f"http://127.0.0.1:{self.port}/rpc/{n}" for n in range(self.rpc_endpoints)]
+
+    async def start(self, port: int = 0) -> None:
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    def start_in_thread(self, port: int = 0) -> None:
+        """Serve from a daemon thread with its own event loop (for blocking callers)"""
+        started = threading.Event()
+
+        def serve():
+            loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+            loop.run_until_complete(self.start(port))
+            started.set()
+            loop.run_forever()
+
+        threading.Thread(target=serve, name="simulator", daemon=True).start()
+        started.wait()
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--latency", type=float, default=0.02, help="mean response latency, seconds")
+    parser.add_argument("--jitter", type=float, default=0.5, help="latency spread, share of --latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with 503")
+    parser.add_argument("--block-time", type=float, default=2.0, help="seconds per Base block")
+    parser.add_argument("--confirm-delay", type=float, default=1.0,
+                        help="seconds from inclusion until Gas.zip reports CONFIRMED")
+    parser.add_argument("--quote-rps", type=float, help="answer /quotes with 429 above this many requests/s")
+    parser.add_argument("--rpc-endpoints", type=int, default=1, help="how many RPC URLs to expose")
+    parser.add_argument("--down-endpoints", type=int, nargs="+", default=[], metavar="N",
+                        help="RPC endpoints that answer every request with 503")
+    parser.add_argument("--fee-spike", metavar="BLOCK:FACTOR",
+                        help="multiply the base fee by FACTOR at block BLOCK (exercises fee-bump replacement)")
+    parser.add_argument("--seed", type=int, default=0)
+
+
+def from_arguments(args: argparse.Namespace) -> Simulator:
+    fee_spike = None
+    if args.fee_spike:
+        block, factor = args.fee_spike.split(":")
+        fee_spike = (int(block), float(factor))
+    return Simulator(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                     block_time=args.block_time, confirm_delay=args.confirm_delay, quote_rps=args.quote_rps,
+                     rpc_endpoints=args.rpc_endpoints, seed=args.seed, fee_spike=fee_spike,
+                     down_endpoints=args.down_endpoints)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gas.zip API and Base RPC simulator")
+    parser.add_argument("--port", type=int, default=8545)
+    add_arguments(parser)
+    args = parser.parse_args()
+    simulator = from_arguments(args)
+
+    async def serve():
+        await simulator.start(args.port)
+        print(f"Gas.zip API: {simulator.api_url}")
+        print(f"Base RPC:    {','.join(simulator.rpc_urls)}")
+        await asyncio.Event().wait()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
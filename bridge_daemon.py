@@ -0,0 +1,475 @@
+"""Долгоживущий сервис поверх send_tokens_async: пачки кошельков без перезапуска процесса
+
+Соединения с RPC и Gas.zip, газ-оракул, кэш лимитов газа, шаблон calldata и очереди nonce
+создаются один раз при старте, поэтому небольшая пачка начинает отправку за миллисекунды.
+Задания принимаются по HTTP (127.0.0.1), через Unix-сокет с тем же API или из папки-инбокса;
+API требует bearer-токен из файла с правами 0600 и отклоняет запросы браузеров (с заголовком Origin);
+события по каждому кошельку (quoted, signed, broadcast, included, confirmed, failed, skipped)
+отдаются по мере появления в NDJSON. Журнал общий и только дописывается: после перезапуска
+отправленные транзакции доотслеживаются, как при --resume, а готовые кошельки не отправляются повторно.
+
+    python bridge_daemon.py --port 8787 --socket bridge.sock --inbox inbox
+    curl -N -H "Authorization: Bearer $(cat bridge_daemon.token)" --data-binary @wallets.txt \\
+         http://127.0.0.1:8787/jobs
+    curl -N --unix-socket bridge.sock -H "Authorization: Bearer $(cat bridge_daemon.token)" \\
+         -H 'Content-Type: application/json' -d '{"wallets": ["..."]}' http://localhost/jobs
+"""
+import argparse
+import asyncio
+import contextlib
+import hmac
+import ipaddress
+import itertools
+import json
+import os
+import secrets
+import signal
+import stat
+import time
+from typing import Any, AsyncIterator, Iterable
+
+from aiohttp import web
+
+import metrics
+import send_tokens_async as bridge
+from journal import BROADCAST, CONFIRMED, DONE_STATES, FAILED, INCLUDED, IN_FLIGHT_STATES, SKIPPED
+from pipeline import run_pipeline
+from wallet_source import iter_wallet_lines
+
+# ==================== CONFIG ====================
+DAEMON_HOST = "127.0.0.1"  # API тратит ETH с ключей из pk.txt - только локально
+DAEMON_PORT = int(os.environ.get("BRIDGE_DAEMON_PORT", "8787"))  # 0 - без TCP
+# bearer-токен API; файла нет - создаётся со случайным токеном, права шире 0600 - демон не запускается
+DAEMON_TOKEN_FILE = os.environ.get("BRIDGE_DAEMON_TOKEN_FILE", "bridge_daemon.token")
+DAEMON_SOCKET = os.environ.get("BRIDGE_DAEMON_SOCKET")  # путь Unix-сокета (права 0600)
+INBOX_DIR = os.environ.get("BRIDGE_INBOX_DIR")  # папка, новые файлы в которой становятся заданиями
+INBOX_POLL_INTERVAL = 0.2  # как часто проверять инбокс, сек
+MAX_REQUEST_BYTES = 16 * 1024 * 1024  # предел тела POST /jobs (~350k адресов)
+FINISHED_JOBS_KEPT = 100  # сколько завершённых заданий помнить для GET /jobs/{id}
+# =================================================
+
+
+def is_final(entry: dict) -> bool:
+    """После этой записи журнала по кошельку больше ничего не придёт"""
+    state = entry["state"]
+    if state in (CONFIRMED, FAILED, SKIPPED):
+        return True
+    if state == BROADCAST:
+        # таймаут отслеживания, либо отслеживать нечем
+        return entry.get("final_status") == "TIMEOUT" or not (bridge.TRACK_RECEIPTS or bridge.TRACK_DEPOSITS)
+    if state == INCLUDED:
+        # откатившаяся транзакция сразу получит failed
+        return entry.get("success", True) and not bridge.TRACK_DEPOSITS
+    return False
+
+
+def parse_wallets(text: str, is_json: bool = False) -> list[str]:
+    """Тело задания: адрес на строку, либо JSON-список адресов или {"wallets": [...]}"""
+    if not is_json:
+        return text.splitlines()
+    body = json.loads(text)
+    wallets = body.get("wallets") if isinstance(body, dict) else body
+    if not isinstance(wallets, list) or not all(isinstance(wallet, str) for wallet in wallets):
+        raise ValueError('ожидается список адресов или {"wallets": [...]}')
+    return wallets
+
+
+class BatchJob:
+    """Одно задание: его кошельки, последнее событие каждого и поток событий для клиентов"""
+
+    def __init__(self, job_id: str, source: str, wallets: list[str]):
+        self.id = job_id
+        self.source = source
+        self.wallets = wallets
+        self.created_at = time.time()
+        self.finished_at: float | None = None
+        self.states: dict[str, dict] = {}
+        self.open = set(wallets)  # кошельки без финального события
+        self.events: list[dict] = []  # для клиентов, подключившихся позже
+        self._subscribers: list[asyncio.Queue] = []
+
+    @property
+    def done(self) -> bool:
+        return self.finished_at is not None
+
+    def publish(self, event: dict) -> None:
+        self.states[event["wallet"]] = event
+        self._push(event)
+
+    def settle(self, wallet: str) -> bool:
+        """Кошелёк дошёл до финального события; True, если это был последний в задании"""
+        self.open.discard(wallet)
+        if self.open or self.done:
+            return False
+        self.finish()
+        return True
+
+    def finish(self) -> None:
+        self.finished_at = time.time()
+        self._push(self.summary())
+        for queue in self._subscribers:
+            queue.put_nowait(None)
+        self._subscribers.clear()
+
+    def _push(self, event: dict) -> None:
+        self.events.append(event)
+        for queue in self._subscribers:
+            queue.put_nowait(event)
+
+    async def stream(self) -> AsyncIterator[dict]:
+        """События задания с самого начала, затем новые по мере появления; последним идёт итог"""
+        queue: asyncio.Queue = asyncio.Queue()
+        for event in self.events:
+            queue.put_nowait(event)
+        if self.done:
+            queue.put_nowait(None)
+        else:
+            self._subscribers.append(queue)
+        try:
+            while (event := await queue.get()) is not None:
+                yield event
+        finally:
+            if queue in self._subscribers:
+                self._subscribers.remove(queue)
+
+    def outcomes(self) -> dict[str, int]:
+        counts: dict[str, int] = {}
+        for event in self.states.values():
+            outcome = event.get("final_status") or event["state"]
+            counts[outcome] = counts.get(outcome, 0) + 1
+        return counts
+
+    def summary(self) -> dict[str, Any]:
+        elapsed = (self.finished_at or time.time()) - self.created_at
+        return {"job": self.id, "source": self.source, "wallets": len(self.wallets), "open": len(self.open),
+                "done": self.done, "outcomes": self.outcomes(), "elapsed_s": round(elapsed, 3)}
+
+
+class BridgeDaemon:
+    """Задания поверх одного набора соединений, кэшей и очередей nonce send_tokens_async
+
+    Каждое задание - свой конвейер validate -> quote -> sign -> broadcast -> track с числом воркеров
+    по размеру пачки; отслеживание подтверждений и депозитов общее на весь процесс. События
+    приходят из журнала (Journal.listeners) и раздаются заданию, которому принадлежит кошелёк.
+    Кошелёк одновременно состоит не больше чем в одном задании; уже обработанные по журналу
+    кошельки не отправляются повторно и сразу возвращаются как skipped/already_done.
+    """
+
+    def __init__(self, finished_kept: int = FINISHED_JOBS_KEPT):
+        self.finished_kept = finished_kept
+        self.jobs: dict[str, BatchJob] = {}
+        self._owners: dict[str, BatchJob] = {}  # кошелёк -> активное задание
+        self._done: set[str] = set()
+        self._pipelines = 0
+        self._tasks: set[asyncio.Task] = set()
+        self._ids = itertools.count(1)
+        self._prefix = time.strftime("%Y%m%d%H%M%S")
+
+    async def start(self) -> None:
+        # журнал только дописывается: сервис после перезапуска продолжает, как --resume
+        self._done = await bridge.start(resume=True)
+        bridge.journal.listeners.append(self._on_record)
+        metrics.registry.add_collector("daemon", self.stats)
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        await bridge.stop()
+
+    def submit(self, lines: Iterable[str], source: str) -> BatchJob:
+        """Создаёт задание и сразу запускает его конвейер; возвращается до первой отправки"""
+        job = BatchJob(f"{self._prefix}-{next(self._ids)}", source, list(iter_wallet_lines(lines)))
+        self.jobs[job.id] = job
+        fresh, rejected = [], []
+        for wallet in job.wallets:
+            owner = self._owners.get(wallet)
+            if owner is not None:
+                rejected.append((wallet, {"reason": "in_progress", "other_job": owner.id}))
+            elif wallet in self._done:
+                rejected.append((wallet, {"reason": "already_done"}))
+            else:
+                self._owners[wallet] = job
+                fresh.append(wallet)
+        # отказы не пишутся в журнал: там у кошелька уже есть настоящее состояние
+        for wallet, fields in rejected:
+            job.publish({"job": job.id, "wallet": wallet, "state": SKIPPED, "ts": round(time.time(), 3), **fields})
+            job.settle(wallet)
+        if fresh:
+            self._spawn(self._send(job, fresh))
+        elif not job.wallets:
+            job.finish()
+        print(f"📥 Задание {job.id} ({source}): {len(job.wallets)} кошельков, {len(fresh)} к отправке")
+        return job
+
+    async def _send(self, job: BatchJob, wallets: list[str]) -> None:
+        self._pipelines += 1
+        try:
+            await run_pipeline((bridge.new_job(wallet) for wallet in wallets), bridge.send_stages(len(wallets)))
+        finally:
+            self._pipelines -= 1
+        for wallet in wallets:
+            event = job.states.get(wallet)
+            if wallet in job.open and (event is None or event["state"] not in IN_FLIGHT_STATES):
+                # стадия упала, не записав исход; без записи задание ждало бы этот кошелёк вечно
+                bridge.journal.record(wallet, FAILED, reason="pipeline_error")
+        if not self._pipelines:
+            # пока конвейеры идут, упавшие nonce и так выдаются заново
+            await asyncio.gather(*(bridge.cancel_nonce_gaps(sender) for sender in bridge.senders))
+
+    def _on_record(self, entry: dict) -> None:
+        wallet = entry["wallet"]
+        if entry["state"] in DONE_STATES:
+            self._done.add(wallet)
+        elif entry["state"] == FAILED:
+            self._done.discard(wallet)
+        job = self._owners.get(wallet)
+        if job is None:
+            return
+        event = {"job": job.id}
+        event.update((key, value) for key, value in entry.items() if key != "raw")
+        job.publish(event)
+        if is_final(entry):
+            del self._owners[wallet]
+            if job.settle(wallet):
+                self._forget_finished()
+                if not self._owners:
+                    # всё подтверждено - баланс ключей можно сверить с сетью без резервов
+                    self._spawn(bridge.refresh_balances())
+
+    def _forget_finished(self) -> None:
+        finished = [job_id for job_id, job in self.jobs.items() if job.done]
+        for job_id in finished[:-self.finished_kept or None]:
+            del self.jobs[job_id]
+
+    def _spawn(self, coroutine) -> None:
+        task = asyncio.create_task(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._reap)
+
+    def _reap(self, task: asyncio.Task) -> None:
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            print(f"❌ Ошибка фоновой задачи демона: {task.exception()!r}")
+
+    def stats(self) -> dict[str, Any]:
+        active = sum(1 for job in self.jobs.values() if not job.done)
+        return {"jobs_active": active, "jobs_finished": len(self.jobs) - active,
+                "wallets_in_flight": len(self._owners), "pipelines": self._pipelines}
+
+
+# ==================== HTTP / UNIX SOCKET API ====================
+# Каждый запрос несёт "Authorization: Bearer <токен>"; запросы с заголовком Origin (браузер,
+# в том числе "простой" cross-site POST с text/plain) отклоняются до аутентификации.
+# POST /jobs                 - задание из тела (адрес на строку или JSON), ответ - NDJSON события до итога;
+#                              ?stream=0 - сразу вернуть {"job": ...} без ожидания
+# GET  /jobs                 - сводка по заданиям
+# GET  /jobs/{id}            - сводка и последнее событие каждого кошелька
+# GET  /jobs/{id}/events     - NDJSON события задания с начала и дальше по мере появления
+# GET  /health               - состояние демона
+
+async def stream_job(request: web.Request, job: BatchJob) -> web.StreamResponse:
+    response = web.StreamResponse(headers={"Content-Type": "application/x-ndjson", "X-Job-Id": job.id})
+    await response.prepare(request)
+    try:
+        async for event in job.stream():
+            await response.write(json.dumps(event).encode() + b"\n")
+    except ConnectionResetError:
+        pass  # клиент ушёл; задание продолжается, события остаются в GET /jobs/{id}/events
+    return response
+
+
+def load_token(path: str) -> str:
+    """Токен API из файла, доступного только владельцу; при первом запуске файл создаётся"""
+    try:
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        mode = os.stat(path).st_mode
+        if os.name == "posix" and mode & 0o077:
+            raise SystemExit(f"❌ {path}: права {stat.filemode(mode)}, токен должен быть доступен только владельцу "
+                             f"(chmod 600 {path})")
+        with open(path, "r", encoding="utf-8") as f:
+            token = f.read().strip()
+        if not token:
+            raise SystemExit(f"❌ {path}: файл токена пуст")
+        return token
+    token = secrets.token_urlsafe(32)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(token + "\n")
+    print(f"🔑 Токен API записан в {path}")
+    return token
+
+
+def is_loopback(host: str) -> bool:
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False  # имя хоста может указывать куда угодно
+
+
+def auth_middleware(token: str | None):
+    expected = f"Bearer {token}".encode()
+
+    @web.middleware
+    async def check_auth(request: web.Request, handler):
+        if "Origin" in request.headers:
+            raise web.HTTPForbidden(text="cross-origin requests are not accepted\n")
+        if token is not None and not hmac.compare_digest(request.headers.get("Authorization", "").encode(), expected):
+            raise web.HTTPUnauthorized(text="bearer token required\n", headers={"WWW-Authenticate": "Bearer"})
+        return await handler(request)
+
+    return check_auth
+
+
+def make_app(daemon: BridgeDaemon, token: str | None = None) -> web.Application:
+    routes = web.RouteTableDef()
+
+    def find_job(request: web.Request) -> BatchJob:
+        job = daemon.jobs.get(request.match_info["job_id"])
+        if job is None:
+            raise web.HTTPNotFound(text="unknown job\n")
+        return job
+
+    @routes.post("/jobs")
+    async def post_job(request: web.Request) -> web.StreamResponse:
+        try:
+            lines = parse_wallets(await request.text(), request.content_type == "application/json")
+        except ValueError as e:
+            raise web.HTTPBadRequest(text=f"{e}\n")
+        job = daemon.submit(lines, source="api")
+        if request.query.get("stream") == "0":
+            return web.json_response(job.summary(), status=202)
+        return await stream_job(request, job)
+
+    @routes.get("/jobs")
+    async def list_jobs(request: web.Request) -> web.Response:
+        return web.json_response([job.summary() for job in daemon.jobs.values()])
+
+    @routes.get("/jobs/{job_id}")
+    async def get_job(request: web.Request) -> web.Response:
+        job = find_job(request)
+        return web.json_response(dict(job.summary(), results=list(job.states.values())))
+
+    @routes.get("/jobs/{job_id}/events")
+    async def job_events(request: web.Request) -> web.StreamResponse:
+        return await stream_job(request, find_job(request))
+
+    @routes.get("/health")
+    async def health(request: web.Request) -> web.Response:
+        return web.json_response(dict(daemon.stats(), ok=True))
+
+    app = web.Application(client_max_size=MAX_REQUEST_BYTES, middlewares=[auth_middleware(token)])
+    app.add_routes(routes)
+    return app
+
+
+# ==================== INBOX ====================
+# Файл в INBOX_DIR (адрес на строку, *.json - JSON) переносится в processing/, события пишутся
+# в results/<имя>.jsonl, по завершении файл уходит в done/. Пишите файл под именем с точкой
+# в начале или .tmp в конце и переименовывайте, когда он готов: такие имена не читаются.
+
+def inbox_files(directory: str) -> list[str]:
+    return sorted(entry.name for entry in os.scandir(directory)
+                  if entry.is_file() and not entry.name.startswith(".") and not entry.name.endswith(".tmp"))
+
+
+async def write_inbox_results(job: BatchJob, inbox: str, name: str) -> None:
+    with open(os.path.join(inbox, "results", name + ".jsonl"), "a", encoding="utf-8") as f:
+        async for event in job.stream():
+            f.write(json.dumps(event) + "\n")
+            f.flush()
+    os.replace(os.path.join(inbox, "processing", name), os.path.join(inbox, "done", name))
+
+
+def submit_inbox_file(daemon: BridgeDaemon, inbox: str, name: str) -> None:
+    path = os.path.join(inbox, "processing", name)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            lines = parse_wallets(f.read(), name.endswith(".json"))
+    except (OSError, ValueError) as e:
+        print(f"❌ Инбокс: не удалось прочитать {name}: {e}")
+        with open(os.path.join(inbox, "results", name + ".jsonl"), "a", encoding="utf-8") as f:
+            f.write(json.dumps({"source": name, "error": str(e)}) + "\n")
+        os.replace(path, os.path.join(inbox, "done", name))
+        return
+    job = daemon.submit(lines, source=f"inbox:{name}")
+    daemon._spawn(write_inbox_results(job, inbox, name))
+
+
+async def watch_inbox(daemon: BridgeDaemon, inbox: str) -> None:
+    for directory in ("processing", "results", "done"):
+        os.makedirs(os.path.join(inbox, directory), exist_ok=True)
+    # взятые до перезапуска файлы подаются снова: готовые кошельки вернутся как already_done
+    for name in inbox_files(os.path.join(inbox, "processing")):
+        submit_inbox_file(daemon, inbox, name)
+    while True:
+        for name in inbox_files(inbox):
+            os.replace(os.path.join(inbox, name), os.path.join(inbox, "processing", name))
+            submit_inbox_file(daemon, inbox, name)
+        await asyncio.sleep(INBOX_POLL_INTERVAL)
+
+
+async def serve(host: str = DAEMON_HOST, port: int = DAEMON_PORT, socket_path: str | None = DAEMON_SOCKET,
+                inbox: str | None = INBOX_DIR, token_file: str | None = DAEMON_TOKEN_FILE) -> None:
+    """Прогревает соединения и кэши, открывает API и инбокс и работает до SIGINT/SIGTERM"""
+    if port and not token_file and not is_loopback(host):
+        raise SystemExit(f"❌ HTTP API на {host} без токена тратило бы ETH по запросу из сети: уберите --no-auth")
+    token = load_token(token_file) if token_file and (port or socket_path) else None
+    daemon = BridgeDaemon()
+    runner = web.AppRunner(make_app(daemon, token), access_log=None)
+    watcher = None
+    await runner.setup()
+    try:
+        await daemon.start()
+        if port:
+            await web.TCPSite(runner, host, port).start()
+            print(f"🛰  Демон: http://{host}:{port}/jobs")
+        if socket_path:
+            if os.path.exists(socket_path) and stat.S_ISSOCK(os.stat(socket_path).st_mode):
+                os.unlink(socket_path)  # остался от упавшего процесса
+            await web.UnixSite(runner, socket_path).start()
+            os.chmod(socket_path, 0o600)
+            print(f"🛰  Демон: unix:{socket_path}")
+        if inbox:
+            watcher = asyncio.create_task(watch_inbox(daemon, inbox))
+            print(f"🛰  Демон: инбокс {inbox}")
+        stopping = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            with contextlib.suppress(NotImplementedError):
+                loop.add_signal_handler(signum, stopping.set)
+        await stopping.wait()
+        print("🛑 Остановка: отправленное доотследит следующий запуск по журналу")
+    finally:
+        if watcher is not None:
+            watcher.cancel()
+        await runner.cleanup()
+        await daemon.stop()
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Base -> Solana bridge daemon (send_tokens_async as a service)")
+    parser.add_argument("--host", default=DAEMON_HOST, help="адрес HTTP API")
+    parser.add_argument("--port", type=int, default=DAEMON_PORT, help="порт HTTP API, 0 - без TCP")
+    parser.add_argument("--socket", default=DAEMON_SOCKET, metavar="PATH", help="Unix-сокет с тем же API")
+    parser.add_argument("--token-file", default=DAEMON_TOKEN_FILE, metavar="PATH",
+                        help="файл с bearer-токеном API (права 0600), создаётся при первом запуске")
+    parser.add_argument("--no-auth", action="store_true", help="API без токена, только для loopback-адреса")
+    parser.add_argument("--inbox", default=INBOX_DIR, metavar="DIR", help="папка, файлы в которой становятся заданиями")
+    args = parser.parse_args(argv)
+    if not (args.port or args.socket or args.inbox):
+        parser.error("нужен хотя бы один источник заданий: --port, --socket или --inbox")
+    if bridge.BUFFERED_OUTPUT:
+        metrics.buffer_stdout()
+    if bridge.METRICS_PORT:
+        metrics.serve(bridge.METRICS_PORT)
+        print(f"📈 Метрики: http://127.0.0.1:{bridge.METRICS_PORT}/metrics")
+    if bridge.METRICS_SNAPSHOT_PATH:
+        metrics.start_snapshots(bridge.METRICS_SNAPSHOT_PATH)
+    asyncio.run(serve(args.host, args.port, args.socket, args.inbox, None if args.no_auth else args.token_file))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+import threading
+from typing import Any, Dict, Optional
+
+from solana_address import decode_pubkey
+
+# Real quotes that must agree with the learned layout before it is trusted
+TEMPLATE_VERIFY_SAMPLES = 3
+# After this many local builds the next wallet gets a real quote again
+# (price check and layout re-verification)
+TEMPLATE_REFRESH_EVERY = 100
+
+
+class CalldataTemplate:
+    """Gas.zip forwarder calldata with the destination public key cut out
+
+    The direct forwarder calldata is `prefix || pubkey || suffix`, where the
+    prefix/suffix depend on the destination chain only.
+    """
+
+    def __init__(self, prefix: str, suffix: str):
+        self.prefix = prefix
+        self.suffix = suffix
+
+    @classmethod
+    def learn(cls, calldata: str, destination_address: str) -> Optional["CalldataTemplate"]:
+        """Locate the decoded destination in `calldata`; None if it is absent or ambiguous"""
+        body = calldata[2:].lower() if calldata.startswith("0x") else calldata.lower()
+        pubkey_hex = decode_pubkey(destination_address).hex()
+        if body.count(pubkey_hex) != 1:
+            return None
+        index = body.index(pubkey_hex)
+        return cls(body[:index], body[index + len(pubkey_hex):])
+
+    def build(self, destination_address: str) -> str:
+        return "0x" + self.prefix + decode_pubkey(destination_address).hex() + self.suffix
+
+    def matches(self, calldata: str, destination_address: str) -> bool:
+        return self.build(destination_address) == calldata.lower()
+
+
+class CalldataCache:
+    """Learns the calldata layout from a few real quotes and builds the rest locally
+
+    `build()` returns None while the layout is unverified or a periodic refresh
+    is due; the caller then fetches a real quote and reports it via `observe()`.
+    A refresh is handed to a single caller - the others keep building locally
+    meanwhile. A quote that disagrees with the template resets verification.
+    """
+
+    def __init__(self, verify_samples: int = TEMPLATE_VERIFY_SAMPLES,
+                 refresh_every: int = TEMPLATE_REFRESH_EVERY):
+        self.verify_samples = verify_samples
+        self.refresh_every = refresh_every
+        self.template: Optional[CalldataTemplate] = None
+        self.verified = 0
+        self._since_refresh = 0
+        self._refresh_at = refresh_every
+        self._lock = threading.Lock()
+        self.local_builds = 0
+        self.api_quotes = 0
+        self.mismatches = 0
+
+    @property
+    def trusted(self) -> bool:
+        return self.template is not None and self.verified >= self.verify_samples
+
+    def build(self, destination_address: str) -> Optional[str]:
+        with self._lock:
+            if not self.trusted:
+                return None
+            if self._since_refresh >= self._refresh_at:
+                # If this refresh quote never arrives, the next caller retries after another period
+                self._refresh_at = self._since_refresh + self.refresh_every
+                return None
+            try:
+                calldata = self.template.build(destination_address)
+            except ValueError:
+                return None
+            self._since_refresh += 1
+            self.local_builds += 1
+            return calldata
+
+    def observe(self, calldata: str, destination_address: str) -> None:
+        """Feed a calldata returned by the Gas.zip API for `destination_address`"""
+        with self._lock:
+            self.api_quotes += 1
+            self._since_refresh = 0
+            self._refresh_at = self.refresh_every
+            try:
+                if self.template is not None and self.template.matches(calldata, destination_address):
+                    self.verified += 1
+                    return
+                if self.template is not None:
+                    self.mismatches += 1
+                    print(f"Calldata template mismatch for {destination_address}, relearning")
+                self.template = CalldataTemplate.learn(calldata, destination_address)
+            except ValueError:
+                # Address does not decode to a public key; nothing to learn from it
+                return
+            self.verified = 1 if self.template is not None else 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "trusted": self.trusted,
+            "local_builds": self.local_builds,
+            "api_quotes": self.api_quotes,
+            "mismatches": self.mismatches,
+        }
@@ -0,0 +1,311 @@
+import asyncio
+import json
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import aiohttp
+
+from async_rpc import EthMethods, RPCError
+
+BLOCK_TIME = 2.0  # Base produces a block every 2 seconds
+# A transaction not included after this long is checked: dropped, underpriced or just stuck
+STUCK_AFTER = 30.0
+CONFIRM_MAX_WAIT = 300.0  # give up on a transaction after this long
+# A transaction is only reported dropped after this many checks in a row found none of its
+# versions on any endpoint, and only once the sender's nonce has been used on chain
+DROP_AFTER_MISSES = 3
+
+INCLUDED = "included"
+STUCK = "stuck"  # still in the mempool, fee covers the base fee (e.g. waiting behind a nonce gap)
+UNDERPRICED = "underpriced"  # still in the mempool, max fee below the current base fee
+DROPPED = "dropped"  # no version is known anywhere and another transaction took the nonce
+TIMEOUT = "timeout"
+
+# JSON-RPC "method not found"; some providers answer an unknown method with another code, hence the messages
+METHOD_NOT_FOUND = -32601
+_UNSUPPORTED_ERRORS = ("method not found", "not supported", "unsupported", "does not exist")
+
+
+def is_unsupported_method(error: RPCError) -> bool:
+    """True if the node does not serve the method at all, as opposed to failing this one call"""
+    message = str(error.message).lower()
+    return error.code == METHOD_NOT_FOUND or any(fragment in message for fragment in _UNSUPPORTED_ERRORS)
+
+
+class _Pending:
+    __slots__ = ("tx_hash", "context", "sender", "nonce", "added_at", "flagged_at", "misses", "group")
+
+    def __init__(self, tx_hash: str, context: Any, sender: Optional[str] = None, nonce: Optional[int] = None,
+                 group: Optional[List["_Pending"]] = None):
+        self.tx_hash = tx_hash
+        self.context = context
+        self.sender = sender
+        self.nonce = nonce
+        self.added_at = time.monotonic()
+        self.flagged_at: Optional[float] = None
+        self.misses = 0  # consecutive checks that found no version; kept on the group's first member
+        # Every transaction for the same nonce (original and replacements), shared between them
+        self.group = group if group is not None else []
+        self.group.append(self)
+
+
+class ConfirmationWatcher:
+    """Confirms many Base transactions by following blocks instead of polling each hash
+
+    Pending hashes live in a dict; every new block is fetched once (by number,
+    transaction hashes only) and matched against it, so N confirmations cost
+    O(blocks) RPC calls instead of O(N x polls). Receipts are read with one
+    `eth_getBlockReceipts` per block that has a match (per-hash receipts if the
+    node lacks it). With `ws_url` new heads come from an `eth_subscribe`
+    subscription; polling is the fallback.
+
+    Transactions pending longer than `stuck_after` are looked up once per
+    period on every endpoint and reported as `stuck` or `underpriced` so the
+    caller can replace them. A transaction no endpoint knows is reported as
+    `stuck` with `missing` set (re-sending it is the fix while its nonce is
+    free); it becomes `dropped` only after DROP_AFTER_MISSES misses in a row,
+    no receipt for any version and the sender's on-chain nonce past it, so
+    hashes added without `sender` and `nonce` are never dropped, only timed
+    out. A replacement registered with `replace()` is watched together with
+    the transactions it replaces; whichever is mined resolves all of them
+    (`replaced` lists the others). Events arrive through `results()` as
+    `(tx_hash, event, context)`; `included`, `dropped` and `timeout` are final.
+    """
+
+    def __init__(self, rpc: EthMethods,
+                 block_time: float = BLOCK_TIME,
+                 stuck_after: float = STUCK_AFTER,
+                 max_wait_time: float = CONFIRM_MAX_WAIT,
+                 ws_url: Optional[str] = None,
+                 session: Optional[aiohttp.ClientSession] = None):
+        self.rpc = rpc
+        self.block_time = block_time
+        self.stuck_after = stuck_after
+        self.max_wait_time = max_wait_time
+        self.ws_url = ws_url
+        self.session = session
+        self._pending: Dict[str, _Pending] = {}
+        self._results: asyncio.Queue = asyncio.Queue()
+        self._closed = False
+        self._block_receipts = True
+        self.next_block: Optional[int] = None
+        self.base_fee: Optional[int] = None
+        self.blocks = 0
+        self.included = 0
+        self.flagged = 0
+        self.replacements = 0
+
+    @property
+    def outstanding(self) -> int:
+        return len(self._pending)
+
+    def add(self, tx_hash: str, context: Any = None, sender: Optional[str] = None,
+            nonce: Optional[int] = None) -> None:
+        self._pending[tx_hash.lower()] = _Pending(tx_hash, context, sender, nonce)
+
+    def replace(self, old_hash: str, new_hash: str) -> bool:
+        """Watch `new_hash` (same nonce, higher fee) alongside `old_hash`; False if `old_hash` is not pending"""
+        old = self._pending.get(old_hash.lower())
+        if old is None:
+            return False
+        new = _Pending(new_hash, old.context, old.sender, old.nonce, old.group)
+        new.added_at = old.added_at
+        new.flagged_at = time.monotonic()
+        self._pending[new_hash.lower()] = new
+        self.replacements += 1
+        return True
+
+    def discard(self, tx_hash: str) -> None:
+        pending = self._pending.get(tx_hash.lower())
+        if pending is not None:
+            self._forget(pending)
+
+    def _forget(self, pending: _Pending) -> None:
+        for member in pending.group:
+            self._pending.pop(member.tx_hash.lower(), None)
+
+    def close(self) -> None:
+        """No more hashes will be added; `run()` returns once all pending ones resolve"""
+        self._closed = True
+
+    def _finish(self, pending: _Pending, event: Dict[str, Any]) -> None:
+        self._forget(pending)
+        self._results.put_nowait((pending.tx_hash, event, pending.context))
+
+    def _include(self, pending: _Pending, block: int, receipt: Optional[Dict[str, Any]]) -> None:
+        receipt = receipt or {}
+        self.included += 1
+        self._finish(pending, {"status": INCLUDED, "block": block,
+                               "success": receipt.get("status", "0x1") == "0x1",
+                               "gas_used": int(receipt["gasUsed"], 16) if receipt.get("gasUsed") else None,
+                               "replaced": [m.tx_hash for m in pending.group if m is not pending]})
+
+    async def _receipts(self, number: int, hashes: List[str]) -> Dict[str, Dict[str, Any]]:
+        if self._block_receipts:
+            try:
+                receipts = await self.rpc.call("eth_getBlockReceipts", [hex(number)])
+                return {r["transactionHash"].lower(): r for r in receipts or []}
+            except RPCError as e:
+                if not is_unsupported_method(e):
+                    raise  # rate limit or node error: the block is processed again on the next round
+                # Node does not serve block receipts; fall back to per-hash lookups (batched)
+                self._block_receipts = False
+        receipts = await asyncio.gather(*(self.rpc.get_transaction_receipt(h) for h in hashes))
+        return {h: r for h, r in zip(hashes, receipts) if r}
+
+    async def _process_block(self, block: Dict[str, Any]) -> None:
+        number = int(block["number"], 16)
+        self.blocks += 1
+        if block.get("baseFeePerGas"):
+            self.base_fee = int(block["baseFeePerGas"], 16)
+        matched = [h.lower() for h in block.get("transactions", []) if h.lower() in self._pending]
+        if not matched:
+            return
+        receipts = await self._receipts(number, matched)
+        for tx_hash in matched:
+            pending = self._pending.get(tx_hash)
+            if pending is None:
+                continue
+            self._include(pending, number, receipts.get(tx_hash))
+
+    async def _catch_up(self, head: int) -> None:
+        """Fetch and process every block from `next_block` up to `head`"""
+        while self.next_block is not None and self.next_block <= head:
+            numbers = range(self.next_block, min(head, self.next_block + 49) + 1)
+            blocks = await asyncio.gather(*(self.rpc.get_block(n) for n in numbers))
+            for block in blocks:
+                if block is None:
+                    return  # not served yet by this endpoint; retry next round
+                await self._process_block(block)
+                self.next_block = int(block["number"], 16) + 1
+
+    async def _check_stuck(self) -> None:
+        now = time.monotonic()
+        # One check per nonce, timed from its latest replacement
+        due = [p for p in self._pending.values()
+               if p is p.group[-1] and now - (p.flagged_at or p.added_at) >= self.stuck_after]
+        if not due:
+            return
+        members = [m for p in due for m in p.group]
+        lookups = await asyncio.gather(*(self.rpc.find_transaction(m.tx_hash) for m in members),
+                                       return_exceptions=True)
+        found = dict(zip((m.tx_hash for m in members), lookups))
+        for pending in due:
+            if self._pending.get(pending.tx_hash.lower()) is not pending:
+                continue  # resolved by a block while the lookups were in flight
+            txs = [(m, found[m.tx_hash]) for m in pending.group]
+            if any(isinstance(tx, Exception) for _, tx in txs):
+                continue
+            age = now - pending.added_at
+            mined = [(m, tx) for m, tx in txs if tx is not None and tx.get("blockNumber")]
+            known = [(m, tx) for m, tx in txs if tx is not None]
+            if mined:
+                # Included before we started watching (e.g. --resume)
+                member, tx = mined[0]
+                receipt = await self.rpc.get_transaction_receipt(member.tx_hash)
+                self._include(member, int(tx["blockNumber"], 16), receipt)
+                continue
+            first = pending.group[0]
+            first.misses = 0 if known else first.misses + 1
+            if not known and first.misses >= DROP_AFTER_MISSES and await self._nonce_taken(pending):
+                receipts = await asyncio.gather(*(self.rpc.get_transaction_receipt(m.tx_hash)
+                                                  for m in pending.group), return_exceptions=True)
+                if any(isinstance(receipt, Exception) for receipt in receipts):
+                    continue
+                mined = [(m, r) for m, r in zip(pending.group, receipts) if r]
+                self.flagged += 1
+                if mined:
+                    member, receipt = mined[0]
+                    self._include(member, int(receipt["blockNumber"], 16), receipt)
+                else:
+                    self._finish(pending, {"status": DROPPED, "age": age})
+            elif age >= self.max_wait_time:
+                self._finish(pending, {"status": TIMEOUT, "age": age})
+            else:
+                pending.flagged_at = now
+                self.flagged += 1
+                tx = known[-1][1] if known else {}
+                max_fee = int(tx["maxFeePerGas"], 16) if tx.get("maxFeePerGas") else None
+                underpriced = max_fee is not None and self.base_fee is not None and max_fee < self.base_fee
+                self._results.put_nowait((pending.tx_hash, {"status": UNDERPRICED if underpriced else STUCK,
+                                                            "age": age, "max_fee_per_gas": max_fee,
+                                                            "base_fee": self.base_fee, "missing": not known},
+                                          pending.context))
+
+    async def _nonce_taken(self, pending: _Pending) -> bool:
+        """True if the sender's confirmed nonce moved past this transaction's (not re-sendable any more)"""
+        if pending.sender is None or pending.nonce is None:
+            return False
+        try:
+            return await self.rpc.get_transaction_count(pending.sender, "latest") > pending.nonce
+        except (RPCError, aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+            return False
+
+    @property
+    def _done(self) -> bool:
+        return self._closed and not self._pending
+
+    async def _poll_heads(self) -> None:
+        while not self._done:
+            block = await self.rpc.get_block(self.next_block)
+            if block is None:
+                # Not produced yet: look again a little later rather than a whole block later
+                await asyncio.sleep(self.block_time / 4)
+                continue
+            await self._process_block(block)
+            self.next_block += 1
+            await self._check_stuck()
+            # The next block is due one block time after this one; when behind, fetch it right away
+            due = int(block["timestamp"], 16) + self.block_time - time.time()
+            if due > 0 and not self._done:
+                await asyncio.sleep(due)
+
+    async def _subscribe_heads(self) -> None:
+        async with self.session.ws_connect(self.ws_url, heartbeat=30) as ws:
+            await ws.send_str(json.dumps({"jsonrpc": "2.0", "id": 1, "method": "eth_subscribe",
+                                          "params": ["newHeads"]}))
+            while not self._done:
+                try:
+                    message = await ws.receive(timeout=self.block_time * 2)
+                except asyncio.TimeoutError:
+                    await self._check_stuck()
+                    continue
+                if message.type != aiohttp.WSMsgType.TEXT:
+                    raise ConnectionError(f"websocket closed: {message.type}")
+                head = json.loads(message.data).get("params", {}).get("result", {}).get("number")
+                if head is not None:
+                    await self._catch_up(int(head, 16))
+                    await self._check_stuck()
+
+    async def run(self, start_block: Optional[int] = None) -> None:
+        """Watch from `start_block` (default: the current head) until closed and resolved"""
+        try:
+            while not self._done:
+                try:
+                    if self.next_block is None:
+                        self.next_block = start_block if start_block is not None else await self.rpc.block_number()
+                    if self.ws_url and self.session is not None:
+                        await self._subscribe_heads()
+                    else:
+                        await self._poll_heads()
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    print(f"Confirmation watcher error, retrying: {e}")
+                    if self.ws_url:
+                        print("Falling back to polling for new blocks")
+                        self.ws_url = None
+                    await asyncio.sleep(self.block_time)
+        finally:
+            self._results.put_nowait(None)
+
+    async def results(self) -> AsyncIterator[Tuple[str, Dict[str, Any], Any]]:
+        while True:
+            item = await self._results.get()
+            if item is None:
+                return
+            yield item
+
+    def stats(self) -> Dict[str, Any]:
+        return {"blocks": self.blocks, "included": self.included, "flagged": self.flagged,
+                "replacements": self.replacements, "pending": len(self._pending)}
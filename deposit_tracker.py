@@ -0,0 +1,172 @@
+import asyncio
+import heapq
+import itertools
+import time
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+
+import aiohttp
+
+import metrics
+from adaptive_limit import AdaptiveLimiter
+from rate_limit import TokenBucket, get_json_async
+
+FINAL_STATUSES = ("CONFIRMED", "CANCELLED", "FAILED")
+
+# Adaptive polling: deposits Gas.zip already knows about are polled faster than
+# ones it has not indexed yet, and the interval grows while the status is unchanged.
+SEEN_POLL_INTERVAL = 3.0
+UNSEEN_POLL_INTERVAL = 8.0
+POLL_BACKOFF_FACTOR = 1.5
+MAX_POLL_INTERVAL = 30.0
+
+# Concurrent /deposit requests adapt between 1 and STATUS_MAX_CONCURRENT
+STATUS_INITIAL_CONCURRENT = 4
+STATUS_MAX_CONCURRENT = 32
+STATUS_REQUESTS_PER_SECOND = 5.0
+STATUS_TIMEOUT = 15
+DEPOSIT_MAX_WAIT = 300
+
+
+class _Deposit:
+    __slots__ = ("tx_hash", "context", "added_at", "status", "unchanged_polls", "last_data")
+
+    def __init__(self, tx_hash: str, context: Any):
+        self.tx_hash = tx_hash
+        self.context = context
+        self.added_at = time.monotonic()
+        self.status = "UNKNOWN"
+        self.unchanged_polls = 0
+        self.last_data: Optional[Dict[str, Any]] = None
+
+    def next_delay(self) -> float:
+        base = UNSEEN_POLL_INTERVAL if self.status == "UNKNOWN" else SEEN_POLL_INTERVAL
+        return min(base * POLL_BACKOFF_FACTOR ** self.unchanged_polls, MAX_POLL_INTERVAL)
+
+
+class DepositTracker:
+    """Polls Gas.zip `/deposit/{hash}` for many deposits at once without blocking senders
+
+    Hashes are added with `add()` while `run()` is active; each one is polled on
+    its own adaptive schedule under a shared adaptive concurrency limit and the
+    `/deposit` token bucket (which honors the API's rate-limit headers).
+    Final states (or timeouts) are delivered through `results()` in the order
+    they resolve. Call `close()` once no more hashes will be added.
+    """
+
+    def __init__(self, session: aiohttp.ClientSession,
+                 api_base_url: str,
+                 limiter: Optional[AdaptiveLimiter] = None,
+                 bucket: Optional[TokenBucket] = None,
+                 max_wait_time: float = DEPOSIT_MAX_WAIT):
+        self.session = session
+        self.api_base_url = api_base_url
+        self.max_wait_time = max_wait_time
+        self.limiter = limiter or AdaptiveLimiter("status", STATUS_INITIAL_CONCURRENT, max_limit=STATUS_MAX_CONCURRENT)
+        self.bucket = bucket or TokenBucket("deposit", STATUS_REQUESTS_PER_SECOND)
+        self._schedule: list = []
+        self._seq = itertools.count()
+        self._deposits: Dict[str, _Deposit] = {}
+        self._polling: set = set()
+        self._wakeup = asyncio.Event()
+        self._results: asyncio.Queue = asyncio.Queue()
+        self._closed = False
+        self.polls = 0
+
+    @property
+    def outstanding(self) -> int:
+        return len(self._deposits)
+
+    def add(self, tx_hash: str, context: Any = None) -> None:
+        if tx_hash in self._deposits:
+            return
+        deposit = _Deposit(tx_hash, context)
+        self._deposits[tx_hash] = deposit
+        # Gas.zip needs a moment to index a fresh transaction
+        self._reschedule(deposit, SEEN_POLL_INTERVAL)
+
+    def close(self) -> None:
+        self._closed = True
+        self._wakeup.set()
+
+    def _reschedule(self, deposit: _Deposit, delay: float) -> None:
+        heapq.heappush(self._schedule, (time.monotonic() + delay, next(self._seq), deposit.tx_hash))
+        self._wakeup.set()
+
+    def _finish(self, deposit: _Deposit, status_data: Dict[str, Any]) -> None:
+        if self._deposits.pop(deposit.tx_hash, None) is None:
+            return  # discarded while its poll was in flight
+        self._results.put_nowait((deposit.tx_hash, status_data, deposit.context))
+
+    def discard(self, tx_hash: str) -> None:
+        """Stop tracking a deposit that can never arrive (e.g. its transaction reverted)"""
+        self._deposits.pop(tx_hash, None)
+        self._wakeup.set()
+
+    async def _fetch(self, tx_hash: str) -> Optional[Dict[str, Any]]:
+        self.polls += 1
+        # 404: Gas.zip has not indexed the transaction yet
+        with metrics.timer("status_poll"):
+            return await get_json_async(self.session, f"{self.api_base_url}/deposit/{tx_hash}", self.bucket,
+                                        timeout=STATUS_TIMEOUT, limiter=self.limiter, allow_404=True)
+
+    async def _poll(self, deposit: _Deposit) -> None:
+        try:
+            status_data = await self._fetch(deposit.tx_hash)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Error tracking deposit status for {deposit.tx_hash}: {e}")
+            status_data = None
+
+        if status_data is not None:
+            deposit.last_data = status_data
+            status = status_data.get("deposit", {}).get("status", "UNKNOWN")
+            if status in FINAL_STATUSES:
+                self._finish(deposit, status_data)
+                return
+            if status != deposit.status:
+                deposit.status = status
+                deposit.unchanged_polls = 0
+            else:
+                deposit.unchanged_polls += 1
+        else:
+            deposit.unchanged_polls += 1
+
+        if time.monotonic() - deposit.added_at >= self.max_wait_time:
+            self._finish(deposit, {"timeout": True, "last_status": deposit.status})
+            return
+        self._reschedule(deposit, deposit.next_delay())
+
+    async def run(self) -> None:
+        """Poll until `close()` has been called and every deposit has resolved"""
+        try:
+            while not (self._closed and not self._deposits):
+                now = time.monotonic()
+                while self._schedule and self._schedule[0][0] <= now:
+                    _, _, tx_hash = heapq.heappop(self._schedule)
+                    deposit = self._deposits.get(tx_hash)
+                    if deposit is None:
+                        continue
+                    task = asyncio.create_task(self._poll(deposit))
+                    self._polling.add(task)
+                    task.add_done_callback(self._polling.discard)
+                    task.add_done_callback(lambda _: self._wakeup.set())
+
+                timeout = self._schedule[0][0] - now if self._schedule else None
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            for task in list(self._polling):
+                task.cancel()
+            self._results.put_nowait(None)
+
+    async def results(self) -> AsyncIterator[Tuple[str, Dict[str, Any], Any]]:
+        """Yield `(tx_hash, status_data, context)` for each deposit as it reaches a final state"""
+        while True:
+            item = await self._results.get()
+            if item is None:
+                return
+            yield item
@@ -0,0 +1,148 @@
+import inspect
+import math
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from nonce_manager import is_already_known, is_nonce_too_low, is_rejection
+from presign import sign_transaction
+from sender_pool import Sender, SenderPool
+
+# Nodes only accept a replacement that raises both fees by at least 10%;
+# each bump adds a little more so rounding never lands under the threshold
+FEE_BUMP = 0.125
+MIN_REPLACEMENT_BUMP = 0.10
+# Replacements per nonce before the transaction is left to its fate
+MAX_BUMPS = 5
+BASE_FEE_MULTIPLIER = 2.0
+
+
+class _Tracked:
+    __slots__ = ("sender", "transaction", "bumps", "hashes")
+
+    def __init__(self, sender: Sender, transaction: Dict[str, Any], tx_hash: str):
+        self.sender = sender
+        self.transaction = transaction
+        self.bumps = 0
+        self.hashes = [tx_hash]
+
+
+def bump_fees(max_fee_per_gas: int, max_priority_fee_per_gas: int, base_fee: Optional[int],
+              bump: float = FEE_BUMP,
+              base_fee_multiplier: float = BASE_FEE_MULTIPLIER,
+              max_fee_cap: Optional[int] = None,
+              max_priority_fee_cap: Optional[int] = None) -> Optional[Tuple[int, int]]:
+    """Fees for a replacement, or None when the caps leave no room for an acceptable bump
+
+    Both fees go up by at least `bump`; the max fee also covers
+    `base_fee * base_fee_multiplier` plus the new tip, like a fresh transaction would.
+    """
+    priority_fee = math.ceil(max_priority_fee_per_gas * (1 + bump))
+    max_fee = math.ceil(max_fee_per_gas * (1 + bump))
+    if base_fee is not None:
+        max_fee = max(max_fee, int(base_fee * base_fee_multiplier) + priority_fee)
+    if max_priority_fee_cap is not None:
+        priority_fee = min(priority_fee, max_priority_fee_cap)
+    if max_fee_cap is not None:
+        max_fee = min(max_fee, max_fee_cap)
+    priority_fee = min(priority_fee, max_fee)
+    if (priority_fee < max_priority_fee_per_gas * (1 + MIN_REPLACEMENT_BUMP)
+            or max_fee < max_fee_per_gas * (1 + MIN_REPLACEMENT_BUMP)):
+        return None
+    return max_fee, priority_fee
+
+
+class FeeBumper:
+    """Replaces stuck or underpriced transactions with the same nonce and higher fees
+
+    Sent transactions are registered with `track()`. When the confirmation
+    watcher flags one, `replace()` re-signs it with both fees raised by `bump`
+    (capped by `max_fee_cap` / `max_priority_fee_cap`), broadcasts it with
+    `send`, a plain or coroutine function taking the raw transaction hex, and
+    returns the new hash (the locally computed one if the send got no
+    answer). The extra worst-case cost is reserved on the sender through
+    `senders` first; a sender that cannot afford it is not bumped. A nonce
+    is replaced at most `max_bumps` times.
+    """
+
+    def __init__(self, senders: SenderPool, send: Callable[[str], Any],
+                 bump: float = FEE_BUMP,
+                 max_fee_cap: Optional[int] = None,
+                 max_priority_fee_cap: Optional[int] = None,
+                 max_bumps: int = MAX_BUMPS,
+                 base_fee_multiplier: float = BASE_FEE_MULTIPLIER):
+        self.senders = senders
+        self._send = send
+        self.bump = bump
+        self.max_fee_cap = max_fee_cap
+        self.max_priority_fee_cap = max_priority_fee_cap
+        self.max_bumps = max_bumps
+        self.base_fee_multiplier = base_fee_multiplier
+        self._tracked: Dict[str, _Tracked] = {}
+        self.replaced = 0
+        self.capped = 0
+        self.rejected = 0
+
+    def track(self, tx_hash: str, sender: Sender, transaction: Dict[str, Any]) -> None:
+        """Remember a broadcast transaction (with its nonce set) so it can be replaced later"""
+        self._tracked[tx_hash.lower()] = _Tracked(sender, dict(transaction), tx_hash)
+
+    def forget(self, tx_hash: str) -> None:
+        """The nonce is settled (mined, dropped or given up): drop it and all its replacements"""
+        tracked = self._tracked.get(tx_hash.lower())
+        if tracked is not None:
+            for known in tracked.hashes:
+                self._tracked.pop(known.lower(), None)
+
+    def hashes(self, tx_hash: str) -> List[str]:
+        """Every hash sent for the nonce of `tx_hash`, oldest first"""
+        tracked = self._tracked.get(tx_hash.lower())
+        return list(tracked.hashes) if tracked is not None else [tx_hash]
+
+    async def replace(self, tx_hash: str, base_fee: Optional[int]) -> Optional[str]:
+        """Replace the transaction behind `tx_hash`; the new hash, or None if it was not replaced"""
+        tracked = self._tracked.get(tx_hash.lower())
+        if tracked is None or tracked.hashes[-1].lower() != tx_hash.lower():
+            return None  # unknown, or already replaced by a newer hash
+        if tracked.bumps >= self.max_bumps:
+            self.capped += 1
+            return None
+        old = tracked.transaction
+        fees = bump_fees(old['maxFeePerGas'], old['maxPriorityFeePerGas'], base_fee, self.bump,
+                         self.base_fee_multiplier, self.max_fee_cap, self.max_priority_fee_cap)
+        if fees is None:
+            self.capped += 1
+            print(f"Fee cap reached for nonce {old['nonce']} of {tracked.sender.address}, not replacing {tx_hash}")
+            return None
+        transaction = dict(old, maxFeePerGas=fees[0], maxPriorityFeePerGas=fees[1])
+        extra_wei = transaction['gas'] * (fees[0] - old['maxFeePerGas'])
+        if not self.senders.reserve(tracked.sender, extra_wei):
+            self.capped += 1
+            print(f"{tracked.sender.address} cannot cover a fee bump for {tx_hash}")
+            return None
+        tracked.bumps += 1
+        raw_transaction, signed_hash = sign_transaction(transaction, tracked.sender.private_key)
+        try:
+            result = self._send(raw_transaction)
+            if inspect.isawaitable(result):
+                result = await result
+        except Exception as e:
+            if is_rejection(e) and not is_already_known(e):
+                self.senders.refund(tracked.sender, extra_wei)
+                if is_nonce_too_low(e):
+                    return None  # the old transaction was just mined
+                self.rejected += 1
+                print(f"Replacement for {tx_hash} rejected: {e}")
+                return None
+            # No answer: it may be in the mempool, so watch it like any other version
+            print(f"Replacement for {tx_hash} not acknowledged ({e}); watching {signed_hash}")
+            result = signed_hash
+        new_hash = "0x" + bytes(result).hex() if isinstance(result, (bytes, bytearray)) else result
+        tracked.transaction = transaction
+        tracked.hashes.append(new_hash)
+        self._tracked[new_hash.lower()] = tracked
+        self.replaced += 1
+        tracked.sender.nonce_manager.mark_sent(transaction['nonce'], new_hash)
+        return new_hash
+
+    def stats(self) -> Dict[str, Any]:
+        return {"tracked": len(self._tracked), "replaced": self.replaced, "capped": self.capped,
+                "rejected": self.rejected}
@@ -0,0 +1,147 @@
+import asyncio
+import inspect
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# Buffer on top of eth_estimateGas, as both scripts always used
+GAS_LIMIT_BUFFER = 1.2
+# After this many cached answers for a shape the next transaction is estimated again
+GAS_LIMIT_RESAMPLE_EVERY = 50
+
+ShapeKey = Tuple[str, int, bool]
+
+
+def shape_key(transaction: Dict[str, Any]) -> ShapeKey:
+    """Transactions to the same contract with calldata of the same length cost the same gas
+
+    The selector is deliberately not part of the key: Gas.zip forwarder calldata
+    is not an ABI call, its leading bytes already carry the destination.
+    """
+    data = transaction.get("data") or "0x"
+    body = data[2:] if data.startswith("0x") else data
+    return (transaction["to"].lower(), len(body) // 2, bool(transaction.get("value")))
+
+
+class _Shape:
+    def __init__(self, estimate: int):
+        self.estimate = estimate
+        self.uses = 0
+        self.resampling = False
+
+
+class GasLimitCache:
+    """Gas limits learned per calldata shape, so `eth_estimateGas` runs once per shape
+
+    `estimate` takes a transaction dict and returns the raw gas estimate. Like
+    `GasOracle`, it may be a plain function (sync script) or a coroutine function
+    (async script). The cached limit is the largest estimate seen for the shape
+    plus the buffer. Every `resample_every` uses one caller re-estimates, so a
+    shape that got more expensive is noticed; a cheaper answer never lowers the
+    limit. Estimation errors propagate and are not cached - the caller falls back.
+    """
+
+    def __init__(self, estimate: Callable[[Dict[str, Any]], Any],
+                 buffer: float = GAS_LIMIT_BUFFER,
+                 resample_every: int = GAS_LIMIT_RESAMPLE_EVERY):
+        self._estimate = estimate
+        self.buffer = buffer
+        self.resample_every = resample_every
+        self._shapes: Dict[ShapeKey, _Shape] = {}
+        self._inflight: Dict[ShapeKey, asyncio.Future] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.estimates = 0
+        self.raised = 0
+
+    def _limit(self, shape: _Shape) -> int:
+        return int(shape.estimate * self.buffer)
+
+    def _lookup(self, key: ShapeKey) -> Optional[int]:
+        """Cached limit, or None when this caller has to estimate (unknown shape or resample due)"""
+        with self._lock:
+            shape = self._shapes.get(key)
+            if shape is None:
+                return None
+            if shape.uses >= self.resample_every and not shape.resampling:
+                # Handed to a single caller; the others keep using the cached limit meanwhile
+                shape.resampling = True
+                return None
+            shape.uses += 1
+            self.hits += 1
+            return self._limit(shape)
+
+    def _store(self, key: ShapeKey, estimate: Optional[int]) -> Optional[int]:
+        with self._lock:
+            shape = self._shapes.get(key)
+            if estimate is None:
+                # Failed resample: try again after another period
+                if shape is not None:
+                    shape.resampling = False
+                    shape.uses = 0
+                return None
+            self.estimates += 1
+            if shape is None:
+                shape = self._shapes[key] = _Shape(estimate)
+            elif estimate > shape.estimate:
+                self.raised += 1
+                print(f"Gas estimate for {key[0]} grew {shape.estimate:,} -> {estimate:,}")
+                shape.estimate = estimate
+            shape.uses = 0
+            shape.resampling = False
+            return self._limit(shape)
+
+    def get(self, transaction: Dict[str, Any]) -> int:
+        """Return the buffered gas limit for `transaction`, estimating only when needed"""
+        key = shape_key(transaction)
+        cached = self._lookup(key)
+        if cached is not None:
+            return cached
+        try:
+            estimate = self._estimate(transaction)
+        except Exception:
+            self._store(key, None)
+            raise
+        return self._store(key, estimate)
+
+    async def get_async(self, transaction: Dict[str, Any]) -> int:
+        """Async variant of `get()`: concurrent first callers of a shape share one estimate"""
+        key = shape_key(transaction)
+        cached = self._lookup(key)
+        if cached is not None:
+            return cached
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            limit = await asyncio.shield(inflight)
+            with self._lock:
+                self.hits += 1
+            return limit
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            estimate = self._estimate(transaction)
+            if inspect.isawaitable(estimate):
+                estimate = await estimate
+            limit = self._store(key, estimate)
+            future.set_result(limit)
+            return limit
+        except Exception as e:
+            self._store(key, None)
+            future.set_exception(e)
+            future.exception()  # retrieved here, so an unawaited future does not warn
+            raise
+        except BaseException:
+            self._store(key, None)
+            future.cancel()
+            raise
+        finally:
+            del self._inflight[key]
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.estimates
+        return {
+            "shapes": len(self._shapes),
+            "hits": self.hits,
+            "estimates": self.estimates,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "raised": self.raised,
+        }
@@ -0,0 +1,124 @@
+import asyncio
+import inspect
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# Base produces a block roughly every 2 seconds, so gas parameters
+# fetched within this window almost always belong to the same block.
+BLOCK_TTL = 2.0
+
+
+class GasOracle:
+    """Per-block cache of base fee and priority fee shared by all senders.
+
+    `fetch` returns a `(block_number, base_fee_per_gas, priority_fee)` tuple.
+    It may be a plain function (sync script) or a coroutine function (async
+    script). The cached value is served until it is older than `ttl`, after
+    which the next caller refreshes it - or a background task does it, see
+    `start()`.
+    """
+
+    def __init__(self, fetch: Callable[[], Any], ttl: float = BLOCK_TTL):
+        self._fetch = fetch
+        self.ttl = ttl
+        self.block_number: Optional[int] = None
+        self.base_fee_per_gas: Optional[int] = None
+        self.priority_fee: Optional[int] = None
+        self._fetched_at = 0.0
+        self._thread_lock = threading.Lock()
+        self._async_lock: Optional[asyncio.Lock] = None
+        self._refresher: Optional[asyncio.Task] = None
+        self.hits = 0
+        self.misses = 0
+        self.fetches = 0
+        self.blocks_seen = 0
+
+    @property
+    def fresh(self) -> bool:
+        return self.block_number is not None and time.monotonic() - self._fetched_at < self.ttl
+
+    def _cached(self) -> Tuple[int, int]:
+        return self.base_fee_per_gas, self.priority_fee
+
+    def _store(self, snapshot: Tuple[int, int, int]) -> None:
+        block_number, base_fee_per_gas, priority_fee = snapshot
+        if block_number != self.block_number:
+            self.blocks_seen += 1
+        self.block_number = block_number
+        self.base_fee_per_gas = base_fee_per_gas
+        self.priority_fee = priority_fee
+        self._fetched_at = time.monotonic()
+
+    def get(self) -> Tuple[int, int]:
+        """Return `(base_fee_per_gas, priority_fee)`, fetching only when the cache is stale"""
+        if self.fresh:
+            self.hits += 1
+            return self._cached()
+        with self._thread_lock:
+            # Another thread may have refreshed while we waited for the lock
+            if self.fresh:
+                self.hits += 1
+                return self._cached()
+            self.misses += 1
+            self.fetches += 1
+            self._store(self._fetch())
+            return self._cached()
+
+    async def get_async(self) -> Tuple[int, int]:
+        """Async variant of `get()`: concurrent callers share a single in-flight refresh"""
+        if self.fresh:
+            self.hits += 1
+            return self._cached()
+        if self._async_lock is None:
+            self._async_lock = asyncio.Lock()
+        async with self._async_lock:
+            if self.fresh:
+                self.hits += 1
+                return self._cached()
+            self.misses += 1
+            await self.refresh()
+            return self._cached()
+
+    async def refresh(self) -> None:
+        self.fetches += 1
+        snapshot = self._fetch()
+        if inspect.isawaitable(snapshot):
+            snapshot = await snapshot
+        self._store(snapshot)
+
+    async def _refresh_forever(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Keep serving the last value; callers refresh on demand once it goes stale
+                print(f"Gas oracle refresh failed: {e}")
+            await asyncio.sleep(self.ttl / 2)
+
+    def start(self) -> None:
+        """Refresh in the background so callers never wait on the RPC"""
+        if self._refresher is None:
+            self._refresher = asyncio.create_task(self._refresh_forever())
+
+    async def stop(self) -> None:
+        if self._refresher is not None:
+            self._refresher.cancel()
+            try:
+                await self._refresher
+            except asyncio.CancelledError:
+                pass
+            self._refresher = None
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "rpc_fetches": self.fetches,
+            "rpc_saved": max(lookups - self.fetches, 0),
+            "blocks_seen": self.blocks_seen,
+        }
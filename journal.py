@@ -0,0 +1,106 @@
+import json
+import os
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Set
+
+JOURNAL_PATH = "bridge_journal.jsonl"
+
+# Wallet lifecycle states, in the order a successful wallet goes through them
+QUOTED = "quoted"
+SIGNED = "signed"
+BROADCAST = "broadcast"
+INCLUDED = "included"  # Base receipt seen; see `block` and `success`
+CONFIRMED = "confirmed"  # deposit tracking resolved; see `final_status`
+FAILED = "failed"  # retried on --resume
+SKIPPED = "skipped"  # invalid input, never retried
+
+# Wallets in these states are not sent again on --resume
+DONE_STATES = (BROADCAST, INCLUDED, CONFIRMED, SKIPPED)
+# Wallets in these states still have a deposit to track
+IN_FLIGHT_STATES = (BROADCAST, INCLUDED)
+
+
+class Journal:
+    """Append-only JSONL log of every wallet state transition
+
+    Each record is flushed as it is written, so after a crash the journal
+    holds everything up to the last completed step. Starting without
+    `resume` moves an existing journal aside to `<path>.prev`. Every
+    callable in `listeners` is handed each record once it is written, e.g.
+    to stream results to a client.
+    """
+
+    def __init__(self, path: str = JOURNAL_PATH, resume: bool = False, fsync: bool = False):
+        if not resume and os.path.exists(path):
+            os.replace(path, path + ".prev")
+        self.path = path
+        self.fsync = fsync
+        self.listeners: List[Callable[[Dict[str, Any]], None]] = []
+        self._file = open(path, "a", encoding="utf-8")
+        if self._file.tell() > 0:
+            # Terminate a line torn by a crash so the next record starts clean
+            with open(path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    self._file.write("\n")
+
+    def record(self, wallet: str, state: str, **fields: Any) -> None:
+        entry = {"wallet": wallet, "state": state, "ts": round(time.time(), 3)}
+        entry.update(fields)
+        self._file.write(json.dumps(entry, separators=(",", ":")) + "\n")
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+        for listener in self.listeners:
+            listener(entry)
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def iter_journal(path: str = JOURNAL_PATH) -> Iterator[Dict[str, Any]]:
+    """Stream journal records, skipping a line torn by a crash"""
+    if not os.path.exists(path):
+        return
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+
+def fold_journal(path: str = JOURNAL_PATH, drop: Iterable[str] = ()) -> Dict[str, Dict[str, Any]]:
+    """Latest state per wallet, with fields from earlier records merged in
+
+    Fields in `drop` are discarded as records are read, so they never pile
+    up in memory (the signed `raw` bytes are most of a SIGNED record).
+    """
+    drop = tuple(drop)
+    wallets: Dict[str, Dict[str, Any]] = {}
+    for record in iter_journal(path):
+        for field in drop:
+            record.pop(field, None)
+        wallets.setdefault(record["wallet"], {}).update(record)
+    return wallets
+
+
+def completed_wallets(wallets: Dict[str, Dict[str, Any]]) -> Set[str]:
+    return {wallet for wallet, entry in wallets.items() if entry["state"] in DONE_STATES}
+
+
+def write_results(output_file: str, path: str = JOURNAL_PATH) -> Dict[str, int]:
+    """Write the per-wallet outcome as a JSON array and return counts per outcome
+
+    Still one merged entry per wallet in memory, but without the signed
+    bytes, which are only needed for resume.
+    """
+    counts: Dict[str, int] = {}
+    with open(output_file, "w", encoding="utf-8") as f:
+        f.write("[")
+        for i, entry in enumerate(fold_journal(path, drop=("raw",)).values()):
+            f.write(("," if i else "") + "\n    " + json.dumps(entry))
+            outcome = entry.get("final_status") or entry["state"]
+            counts[outcome] = counts.get(outcome, 0) + 1
+        f.write("\n]\n")
+    return counts
@@ -0,0 +1,259 @@
+import atexit
+import bisect
+import contextlib
+import io
+import json
+import os
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+# Latency histogram bucket upper bounds, seconds
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+SNAPSHOT_INTERVAL = 10.0  # seconds between JSON snapshots
+STDOUT_FLUSH_INTERVAL = 0.5  # seconds buffered output may lag behind
+
+STAGE_SECONDS = "bridge_stage_seconds"
+STAGE_TOTAL = "bridge_stage_total"
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(key: LabelKey, extra: str = "") -> str:
+    parts = [f'{k}="{v}"' for k, v in key]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram (Prometheus layout) with quantile estimates"""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate by linear interpolation inside the bucket holding the q-th observation"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                lower = self.buckets[i - 1] if i else 0.0
+                if i == len(self.buckets):
+                    return lower  # beyond the last bound: report the bound
+                return lower + (self.buckets[i] - lower) * (rank - seen) / n
+            seen += n
+        return self.buckets[-1]
+
+    def summary(self) -> Dict[str, Any]:
+        p50, p99 = self.quantile(0.5), self.quantile(0.99)
+        return {
+            "count": self.count,
+            "mean_ms": round(self.sum / self.count * 1000, 2) if self.count else None,
+            "p50_ms": round(p50 * 1000, 2) if p50 is not None else None,
+            "p99_ms": round(p99 * 1000, 2) if p99 is not None else None,
+        }
+
+
+class Registry:
+    """Counters, latency histograms and gauge callbacks, safe to use from threads and asyncio
+
+    Stages are timed with `timer(stage)`: the duration lands in
+    `bridge_stage_seconds{stage=...}` and the outcome in
+    `bridge_stage_total{stage=...,outcome=ok|error}`. Components that already
+    keep `stats()` are exported as gauges via `add_collector()`.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters: Dict[Tuple[str, LabelKey], float] = {}
+        self.histograms: Dict[Tuple[str, LabelKey], Histogram] = {}
+        self._collectors: List[Tuple[str, Callable[[], Dict[str, Any]]]] = []
+        self.started = time.time()
+
+    def inc(self, name: str, value: float = 1, **labels: Any) -> None:
+        key = (name, _labels(labels))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        key = (name, _labels(labels))
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(value)
+
+    @contextlib.contextmanager
+    def timer(self, stage: str) -> Iterator[None]:
+        """Time a stage; an exception counts as an error outcome and is re-raised"""
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            yield
+            outcome = "ok"
+        finally:
+            self.observe(STAGE_SECONDS, time.perf_counter() - started, stage=stage)
+            self.inc(STAGE_TOTAL, stage=stage, outcome=outcome)
+
+    def add_collector(self, name: str, collect: Callable[[], Dict[str, Any]]) -> None:
+        """Export the numeric fields of `collect()` (e.g. a component's `stats`) as `<name>_<field>` gauges
+
+        Adding a name again replaces its collector, so a component rebuilt on every run is exported once.
+        """
+        self._collectors = [(n, c) for n, c in self._collectors if n != name] + [(name, collect)]
+
+    def _gauges(self) -> Dict[str, float]:
+        gauges = {}
+        for name, collect in self._collectors:
+            try:
+                values = collect()
+            except Exception:
+                continue
+            for field, value in values.items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    gauges[f"{name}_{field}"] = value
+        return gauges
+
+    def stages(self) -> Dict[str, Dict[str, Any]]:
+        """Per-stage count, mean, p50 and p99 plus error count"""
+        with self._lock:
+            summary = {}
+            for (name, key), histogram in self.histograms.items():
+                if name == STAGE_SECONDS:
+                    stage = dict(key)["stage"]
+                    summary[stage] = histogram.summary()
+                    summary[stage]["errors"] = int(self.counters.get((STAGE_TOTAL, _labels(
+                        {"stage": stage, "outcome": "error"})), 0))
+            return summary
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = [{"name": name, "labels": dict(key), "value": value}
+                        for (name, key), value in self.counters.items()]
+            histograms = [{"name": name, "labels": dict(key), "buckets": list(h.buckets), "counts": list(h.counts),
+                           "sum": h.sum, "count": h.count} for (name, key), h in self.histograms.items()]
+        return {"ts": round(time.time(), 3), "uptime_s": round(time.time() - self.started, 3),
+                "stages": self.stages(), "counters": counters, "histograms": histograms, "gauges": self._gauges()}
+
+    def render(self) -> str:
+        """Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            for (name, key), value in sorted(self.counters.items()):
+                lines.append(f"{name}{_format_labels(key)} {value}")
+            for (name, key), h in sorted(self.histograms.items(), key=lambda item: item[0]):
+                cumulative = 0
+                for bound, n in zip(h.buckets + (float("inf"),), h.counts):
+                    cumulative += n
+                    le = '"+Inf"' if bound == float("inf") else f'"{bound}"'
+                    lines.append(f"{name}_bucket{_format_labels(key, 'le=' + le)} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(key)} {h.sum}")
+                lines.append(f"{name}_count{_format_labels(key)} {h.count}")
+        for name, value in sorted(self._gauges().items()):
+            lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide registry used by the scripts and shared modules
+registry = Registry()
+
+
+def timer(stage: str):
+    return registry.timer(stage)
+
+
+def serve(port: int, host: str = "127.0.0.1", metrics: Registry = registry) -> "http.server.ThreadingHTTPServer":
+    """Expose `/metrics` (Prometheus text) and `/metrics.json` on a local port from a daemon thread"""
+    import http.server  # only when serving; keeps it off every script's startup
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == "/metrics":
+                body, content_type = metrics.render().encode(), "text/plain; version=0.0.4"
+            elif self.path == "/metrics.json":
+                body, content_type = json.dumps(metrics.snapshot()).encode(), "application/json"
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
+
+
+def write_snapshot(path: str, metrics: Registry = registry) -> None:
+    # Written aside and renamed, so a reader never sees half a file
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(metrics.snapshot(), f)
+    os.replace(tmp_path, path)
+
+
+def start_snapshots(path: str, interval: float = SNAPSHOT_INTERVAL, metrics: Registry = registry) -> None:
+    """Rewrite `path` with a JSON snapshot every `interval` seconds and once more at exit"""
+
+    def loop():
+        while True:
+            time.sleep(interval)
+            try:
+                write_snapshot(path, metrics)
+            except OSError as e:
+                print(f"Metrics snapshot failed: {e}")
+
+    threading.Thread(target=loop, name="metrics-snapshot", daemon=True).start()
+    atexit.register(write_snapshot, path, metrics)
+
+
+_original_stdout = None
+
+
+def buffer_stdout(interval: float = STDOUT_FLUSH_INTERVAL) -> None:
+    """Block-buffer stdout and flush it from a background thread every `interval` seconds
+
+    `print` then costs a memory copy instead of a write syscall per line, which
+    matters with many concurrent senders on a slow terminal.
+    """
+    global _original_stdout
+    if _original_stdout is not None or not hasattr(sys.stdout, "buffer"):
+        return
+    sys.stdout.flush()
+    # Kept referenced: collecting the old wrapper would close the shared buffer
+    _original_stdout = sys.stdout
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding=sys.stdout.encoding, errors=sys.stdout.errors,
+                                  line_buffering=False, write_through=False)
+    stream = sys.stdout
+
+    def loop():
+        while True:
+            time.sleep(interval)
+            try:
+                stream.flush()
+            except (OSError, ValueError):
+                return
+
+    threading.Thread(target=loop, name="stdout-flush", daemon=True).start()
+    atexit.register(stream.flush)
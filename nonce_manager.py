@@ -0,0 +1,184 @@
+import heapq
+import threading
+from typing import Dict, List, Optional
+
+ALLOCATED = "allocated"
+SENT = "sent"
+CONFIRMED = "confirmed"
+FAILED = "failed"
+
+# Node error fragments meaning the nonce is already taken on chain or in the mempool
+_NONCE_CONFLICT_ERRORS = ("nonce too low", "already known", "replacement transaction underpriced",
+                          "known transaction", "nonce has already been used")
+
+# ...of which these mean the node already holds these exact signed bytes
+_ALREADY_KNOWN_ERRORS = ("already known", "known transaction")
+
+CANCEL_GAS_LIMIT = 21000
+
+
+def is_nonce_too_low(error: Exception) -> bool:
+    """True if the node already has a transaction from this sender at a higher nonce"""
+    return "nonce too low" in str(error).lower()
+
+
+def is_nonce_conflict(error: Exception) -> bool:
+    """True if the broadcast failed because the nonce is already used"""
+    message = str(error).lower()
+    return any(fragment in message for fragment in _NONCE_CONFLICT_ERRORS)
+
+
+def is_already_known(error: Exception) -> bool:
+    """True if the node refused the broadcast because it already has this very transaction"""
+    message = str(error).lower()
+    return any(fragment in message for fragment in _ALREADY_KNOWN_ERRORS)
+
+
+def is_rejection(error: Exception) -> bool:
+    """True if a node answered the broadcast with a JSON-RPC error, i.e. it definitely did not take it
+
+    Timeouts, connection resets and garbled responses are not rejections: the
+    node may have accepted the transaction before the answer got lost, so its
+    nonce must stay taken until the chain says otherwise.
+    """
+    if isinstance(getattr(error, "code", None), int):
+        return True  # async_rpc.RPCError
+    # web3 raises ValueError(<JSON-RPC error object>)
+    return bool(error.args) and isinstance(error.args[0], dict) and "code" in error.args[0]
+
+
+def build_cancel_transaction(sender_address: str, nonce: int, max_fee_per_gas: int,
+                             max_priority_fee_per_gas: int, chain_id: int) -> Dict:
+    """0 ETH self-transfer that consumes `nonce` to close a gap"""
+    return {
+        'from': sender_address,
+        'to': sender_address,
+        'value': 0,
+        'gas': CANCEL_GAS_LIMIT,
+        'maxFeePerGas': max_fee_per_gas,
+        'maxPriorityFeePerGas': max_priority_fee_per_gas,
+        'nonce': nonce,
+        'chainId': chain_id,
+        'type': 2
+    }
+
+
+class NonceManager:
+    """Allocates nonces locally for one sender and recycles the ones that failed to broadcast
+
+    Only the starting nonce comes from the RPC. A nonce whose broadcast failed
+    goes back into a pool and is handed out again by the next `allocate()`, so a
+    single failure does not leave every later transaction stuck behind a gap.
+    Nonces still unused at the end of a run are reported by `gaps()` so the
+    caller can fill them with cancel transactions.
+    """
+
+    def __init__(self, next_nonce: int):
+        self._next = next_nonce
+        self._reusable: List[int] = []
+        self._states: Dict[int, str] = {}
+        self._nonces_by_hash: Dict[str, int] = {}
+        self._highest_sent: Optional[int] = None
+        self._lock = threading.Lock()
+        self.reissued = 0
+
+    def allocate(self) -> int:
+        with self._lock:
+            if self._reusable:
+                nonce = heapq.heappop(self._reusable)
+                self.reissued += 1
+            else:
+                nonce = self._next
+                self._next += 1
+            self._states[nonce] = ALLOCATED
+            return nonce
+
+    def claim(self, nonce: int) -> None:
+        """Take a nonce chosen elsewhere (a presigned transaction) instead of `allocate()`
+
+        Nonces skipped on the way up go to the reusable pool until they are
+        claimed too, so one that never gets broadcast shows up in `gaps()`.
+        """
+        with self._lock:
+            if nonce >= self._next:
+                for skipped in range(self._next, nonce):
+                    heapq.heappush(self._reusable, skipped)
+                self._next = nonce + 1
+            elif nonce in self._reusable:
+                self._reusable.remove(nonce)
+                heapq.heapify(self._reusable)
+            self._states[nonce] = ALLOCATED
+
+    def mark_sent(self, nonce: int, tx_hash: str) -> None:
+        with self._lock:
+            self._states[nonce] = SENT
+            self._nonces_by_hash[tx_hash] = nonce
+            if self._highest_sent is None or nonce > self._highest_sent:
+                self._highest_sent = nonce
+
+    def mark_confirmed(self, nonce: Optional[int]) -> bool:
+        """Returns False if the nonce was already confirmed (e.g. receipt first, deposit later)"""
+        if nonce is None:
+            return False
+        with self._lock:
+            if self._states.get(nonce) == CONFIRMED:
+                return False
+            self._states[nonce] = CONFIRMED
+            return True
+
+    def mark_failed(self, nonce: int, error: Optional[Exception] = None) -> bool:
+        """Record a transaction that never reached the network; returns True if the nonce was released for reuse
+
+        Only for definite outcomes: signing failed, or the node rejected the
+        broadcast (`is_rejection`). After an ambiguous broadcast error keep the
+        nonce with `mark_sent()` under the signed hash instead.
+        """
+        with self._lock:
+            if error is not None and is_nonce_conflict(error):
+                # Something else already occupies this nonce - never hand it out again
+                self._states[nonce] = CONFIRMED
+                return False
+            self._states[nonce] = FAILED
+            heapq.heappush(self._reusable, nonce)
+            return True
+
+    def resync(self, chain_nonce: int) -> None:
+        """Move forward to the node's pending nonce after an external transaction"""
+        with self._lock:
+            if chain_nonce > self._next:
+                self._next = chain_nonce
+            self._reusable = [n for n in self._reusable if n >= chain_nonce]
+            heapq.heapify(self._reusable)
+
+    def gaps(self) -> List[int]:
+        """Failed nonces below the highest broadcast one; these block later transactions"""
+        with self._lock:
+            if self._highest_sent is None:
+                return []
+            return sorted(n for n in self._reusable if n < self._highest_sent)
+
+    def take_gap(self, nonce: int) -> bool:
+        """Claim a gap nonce for a cancel transaction; False if `allocate()` has reissued it meanwhile"""
+        with self._lock:
+            if nonce not in self._reusable:
+                return False
+            self._reusable.remove(nonce)
+            heapq.heapify(self._reusable)
+            self._states[nonce] = ALLOCATED
+            return True
+
+    def nonce_for(self, tx_hash: str) -> Optional[int]:
+        return self._nonces_by_hash.get(tx_hash)
+
+    def in_flight(self) -> List[int]:
+        with self._lock:
+            return sorted(n for n, state in self._states.items() if state in (ALLOCATED, SENT))
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            counts = {ALLOCATED: 0, SENT: 0, CONFIRMED: 0, FAILED: 0}
+            for state in self._states.values():
+                counts[state] += 1
+            counts["next"] = self._next
+            counts["reissued"] = self.reissued
+            return counts
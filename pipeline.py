@@ -0,0 +1,79 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+PIPELINE_QUEUE_SIZE = 100
+
+_DONE = object()
+
+
+class Stage:
+    """One step of the pipeline: `concurrency` workers applying `handler` to items
+
+    The handler returns the item to pass downstream, or None when the item
+    is finished at this stage (skipped, failed - the handler records why).
+    """
+
+    def __init__(self, name: str,
+                 handler: Callable[[Any], Awaitable[Optional[Any]]],
+                 concurrency: int = 1,
+                 queue_size: int = PIPELINE_QUEUE_SIZE):
+        self.name = name
+        self.handler = handler
+        self.concurrency = concurrency
+        self.queue_size = queue_size
+        self.processed = 0
+        self.dropped = 0
+
+    async def _work(self, inbox: asyncio.Queue, outbox: Optional[asyncio.Queue]) -> None:
+        while True:
+            item = await inbox.get()
+            if item is _DONE:
+                return
+            try:
+                out = await self.handler(item)
+            except Exception as e:
+                print(f"Pipeline stage '{self.name}' failed: {e}")
+                out = None
+            self.processed += 1
+            if outbox is None:
+                continue
+            if out is None:
+                self.dropped += 1
+            else:
+                await outbox.put(out)
+
+
+async def _feed(items: Any, queue: asyncio.Queue) -> None:
+    if hasattr(items, "__aiter__"):
+        async for item in items:
+            await queue.put(item)
+    else:
+        for item in items:
+            await queue.put(item)
+
+
+async def run_pipeline(items: Iterable[Any], stages: List[Stage]) -> Dict[str, Dict[str, int]]:
+    """Push `items` through `stages` connected by bounded queues
+
+    Every stage runs its own worker pool, so a slow upstream (quotes) and a
+    slow downstream (broadcast) overlap instead of running back to back. The
+    bounded queues apply back-pressure: the feeder never reads further ahead
+    than the queues can hold. Returns per-stage processed/dropped counters.
+    """
+    queues = [asyncio.Queue(maxsize=stage.queue_size) for stage in stages]
+
+    async def run_stage(index: int) -> None:
+        stage = stages[index]
+        outbox = queues[index + 1] if index + 1 < len(stages) else None
+        await asyncio.gather(*(stage._work(queues[index], outbox) for _ in range(stage.concurrency)))
+        if outbox is not None:
+            for _ in range(stages[index + 1].concurrency):
+                await outbox.put(_DONE)
+
+    async def feed() -> None:
+        await _feed(items, queues[0])
+        for _ in range(stages[0].concurrency):
+            await queues[0].put(_DONE)
+
+    await asyncio.gather(feed(), *(run_stage(i) for i in range(len(stages))))
+    return {stage.name: {"processed": stage.processed, "dropped": stage.dropped} for stage in stages}
@@ -0,0 +1,86 @@
+import json
+import os
+from typing import Any, Dict, Iterator, Tuple
+
+SIGN_WORKERS = os.cpu_count() or 1
+
+
+def sign_transaction(transaction: Dict[str, Any], private_key: str) -> Tuple[str, str]:
+    """Sign (also in a worker process); returns `(raw_transaction_hex, tx_hash_hex)`"""
+    # eth_account takes about a second to import, so only code that signs pays for it
+    from eth_account import Account
+
+    signed = Account.sign_transaction(transaction, private_key)
+    return "0x" + signed.rawTransaction.hex().removeprefix("0x"), "0x" + signed.hash.hex().removeprefix("0x")
+
+
+def decode_transaction(raw_transaction: str) -> Dict[str, Any]:
+    """Fields of a signed EIP-1559 transaction in the form `sign_transaction` takes, e.g. to re-sign it"""
+    import rlp
+    from eth_utils import to_checksum_address
+
+    payload = bytes.fromhex(raw_transaction.removeprefix("0x"))
+    if payload[:1] != b"\x02":
+        raise ValueError(f"not an EIP-1559 transaction: type {payload[:1].hex() or 'missing'}")
+    fields = rlp.decode(payload[1:])
+    chain_id, nonce, priority_fee, max_fee, gas = (int.from_bytes(field, "big") for field in fields[:5])
+    to, value, data, access_list = fields[5:9]
+    return {
+        'type': 2,
+        'chainId': chain_id,
+        'nonce': nonce,
+        'maxPriorityFeePerGas': priority_fee,
+        'maxFeePerGas': max_fee,
+        'gas': gas,
+        'to': to_checksum_address(to),
+        'value': int.from_bytes(value, "big"),
+        'data': "0x" + data.hex(),
+        'accessList': [{'address': to_checksum_address(address), 'storageKeys': ["0x" + key.hex() for key in keys]}
+                       for address, keys in access_list],
+    }
+
+
+class SpoolWriter:
+    """Append-only spool of signed raw transactions, one compact JSON object per line
+
+    Each record is flushed as soon as it is written, so a spool interrupted
+    half-way is still valid up to its last complete line.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "a", encoding="utf-8")
+        if self._file.tell() > 0:
+            # Terminate a line torn by a crash so the next record starts clean
+            with open(path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    self._file.write("\n")
+        self.written = 0
+
+    def append(self, record: Dict[str, Any]) -> None:
+        self._file.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self._file.flush()
+        self.written += 1
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self) -> "SpoolWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def read_spool(path: str) -> Iterator[Dict[str, Any]]:
+    """Stream spool records in the order they were written, skipping a torn last line"""
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                print(f"Skipping corrupt spool line in {path}: {line[:60]}")
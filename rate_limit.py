@@ -0,0 +1,242 @@
+import asyncio
+import contextlib
+import email.utils
+import random
+import re
+import threading
+import time
+from typing import Any, Dict, Mapping, Optional
+
+import aiohttp
+
+from adaptive_limit import AdaptiveLimiter
+
+# Transient failures are retried this many times in total, with full-jitter backoff
+RETRY_ATTEMPTS = 4
+RETRY_BASE_DELAY = 0.5  # seconds, doubled per attempt
+RETRY_MAX_DELAY = 10.0
+TRANSIENT_STATUSES = (429, 500, 502, 503, 504)
+
+# When the server announces its policy, run at this share of it
+RATE_HEADROOM = 0.9
+# A 429 halves the rate; every good answer wins back this share of the configured rate
+RATE_BACKOFF = 0.5
+RATE_RECOVERY = 0.02
+MIN_RATE = 0.2  # requests/s
+
+_POLICY = re.compile(r"^\s*(\d+)\s*;\s*w\s*=\s*(\d+)")
+
+
+def backoff_delay(attempt: int, base: float = RETRY_BASE_DELAY, cap: float = RETRY_MAX_DELAY) -> float:
+    """Full jitter: uniform in [0, min(cap, base * 2^attempt)] so retries do not line up"""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def _header(headers: Mapping[str, str], *names: str) -> Optional[str]:
+    for name in names:
+        value = headers.get(name)
+        if value is not None:
+            return value
+    return None
+
+
+def retry_after(headers: Optional[Mapping[str, str]]) -> Optional[float]:
+    """Seconds the server asked us to wait (`Retry-After` as seconds or an HTTP date)"""
+    value = _header(headers or {}, "Retry-After")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _reset_seconds(value: str) -> Optional[float]:
+    try:
+        reset = float(value)
+    except ValueError:
+        return None
+    # Some APIs send an epoch timestamp, others the seconds left in the window
+    return max(0.0, reset - time.time()) if reset > 1e9 else reset
+
+
+class TokenBucket:
+    """Request budget for one API endpoint: `rate` requests/s with bursts up to `burst`
+
+    Callers reserve a token and sleep until it is theirs, so concurrent
+    callers are spaced out instead of racing. The server has the last word:
+    `Retry-After` and exhausted `RateLimit-Remaining` headers pause the whole
+    bucket, an announced `RateLimit-Policy` caps the rate just under it, and
+    a 429 halves the rate, which then creeps back up with every good answer.
+    """
+
+    def __init__(self, name: str, rate: float, burst: Optional[float] = None):
+        self.name = name
+        self.rate = rate
+        self.max_rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.waited = 0.0
+        self.pauses = 0
+
+    def _reserve(self, retake: bool = False) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if not retake:
+                self._tokens -= 1
+                self.requests += 1
+            # Tokens keep accruing during a pause; spend them from its end on
+            start = max(now, self._paused_until)
+            wait = start - now + (-self._tokens / self.rate if self._tokens < 0 else 0.0)
+            self.waited += wait
+            return wait
+
+    def _paused(self) -> bool:
+        return self._paused_until > time.monotonic()
+
+    def acquire(self) -> None:
+        # A pause set while we slept (another caller got a 429) applies to us too:
+        # reschedule the token we already hold behind it
+        wait = self._reserve()
+        while wait > 0:
+            time.sleep(wait)
+            wait = self._reserve(retake=True) if self._paused() else 0
+
+    async def acquire_async(self) -> None:
+        wait = self._reserve()
+        while wait > 0:
+            await asyncio.sleep(wait)
+            wait = self._reserve(retake=True) if self._paused() else 0
+
+    def pause(self, seconds: float) -> None:
+        """Hold every caller of this endpoint for `seconds` (server asked us to back off)"""
+        with self._lock:
+            until = time.monotonic() + seconds
+            if until > self._paused_until:
+                self._paused_until = until
+                self._tokens = min(self._tokens, 0.0)  # no burst when the pause ends
+                self.pauses += 1
+                print(f"Rate limit on {self.name}: pausing {seconds:.1f}s")
+
+    def observe(self, headers: Optional[Mapping[str, str]], status: int = 200) -> None:
+        """Apply a response: its status and rate-limit headers"""
+        headers = headers or {}
+        if status == 429:
+            if not self._paused():
+                # Once per episode: the rest of the burst was already in flight
+                with self._lock:
+                    self.rate = max(MIN_RATE, self.rate * RATE_BACKOFF)
+            self.pause(retry_after(headers) or 1.0 / self.rate)
+        elif status < 400 and self.rate < self.max_rate:
+            with self._lock:
+                self.rate = min(self.max_rate, self.rate + self.max_rate * RATE_RECOVERY)
+        policy = _header(headers, "RateLimit-Policy", "X-RateLimit-Policy")
+        match = _POLICY.match(policy) if policy else None
+        if match and int(match.group(2)) > 0:
+            allowed = int(match.group(1)) / int(match.group(2)) * RATE_HEADROOM
+            with self._lock:
+                self.max_rate = allowed
+                self.rate = min(self.rate, allowed)
+        remaining = _header(headers, "RateLimit-Remaining", "X-RateLimit-Remaining", "X-Ratelimit-Remaining")
+        reset = _header(headers, "RateLimit-Reset", "X-RateLimit-Reset", "X-Ratelimit-Reset")
+        if remaining is not None and reset is not None:
+            try:
+                exhausted = float(remaining) <= 0
+            except ValueError:
+                exhausted = False
+            seconds = _reset_seconds(reset) if exhausted else None
+            if seconds:
+                self.pause(seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"rate": round(self.rate, 2), "requests": self.requests,
+                "waited_s": round(self.waited, 1), "pauses": self.pauses}
+
+
+class RateLimiter:
+    """One `TokenBucket` per API endpoint, e.g. `{"quotes": 10, "deposit": 5}` requests/s"""
+
+    def __init__(self, rates: Dict[str, float]):
+        self.buckets = {name: TokenBucket(name, rate) for name, rate in rates.items()}
+
+    def bucket(self, name: str) -> TokenBucket:
+        return self.buckets[name]
+
+    def stats(self) -> Dict[str, Any]:
+        return {name: bucket.stats() for name, bucket in self.buckets.items()}
+
+
+def _retry_delay(headers: Optional[Mapping[str, str]], attempt: int) -> float:
+    delay = retry_after(headers)
+    return delay if delay is not None else backoff_delay(attempt)
+
+
+def get_json(url: str, bucket: TokenBucket,
+             params: Optional[Dict[str, Any]] = None,
+             timeout: float = 15,
+             limiter: Optional[AdaptiveLimiter] = None,
+             attempts: int = RETRY_ATTEMPTS,
+             allow_404: bool = False) -> Any:
+    """GET with the endpoint's token bucket, retrying transient failures; None on 404 if `allow_404`"""
+    import requests  # sync callers only; kept off the async sender's import path
+
+    for attempt in range(attempts):
+        bucket.acquire()
+        last = attempt == attempts - 1
+        try:
+            with limiter.slot() if limiter is not None else contextlib.nullcontext():
+                response = requests.get(url, params=params, timeout=timeout)
+                bucket.observe(response.headers, response.status_code)
+                if allow_404 and response.status_code == 404:
+                    return None
+                response.raise_for_status()
+                return response.json()
+        except requests.HTTPError as e:
+            status = e.response.status_code if e.response is not None else None
+            if last or status not in TRANSIENT_STATUSES:
+                raise
+            delay = _retry_delay(e.response.headers, attempt)
+        except (requests.ConnectionError, requests.Timeout):
+            if last:
+                raise
+            delay = backoff_delay(attempt)
+        time.sleep(delay)
+
+
+async def get_json_async(session: aiohttp.ClientSession, url: str, bucket: TokenBucket,
+                         params: Optional[Dict[str, Any]] = None,
+                         timeout: float = 15,
+                         limiter: Optional[AdaptiveLimiter] = None,
+                         attempts: int = RETRY_ATTEMPTS,
+                         allow_404: bool = False) -> Any:
+    """Async `get_json`: token bucket, optional adaptive concurrency limit, jittered retries"""
+    for attempt in range(attempts):
+        await bucket.acquire_async()
+        last = attempt == attempts - 1
+        try:
+            async with limiter.slot_async() if limiter is not None else contextlib.nullcontext():
+                async with session.get(url, params=params, timeout=timeout) as resp:
+                    bucket.observe(resp.headers, resp.status)
+                    if allow_404 and resp.status == 404:
+                        return None
+                    resp.raise_for_status()
+                    return await resp.json(content_type=None)
+        except aiohttp.ClientResponseError as e:
+            if last or e.status not in TRANSIENT_STATUSES:
+                raise
+            delay = _retry_delay(e.headers, attempt)
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+            if last:
+                raise
+            delay = backoff_delay(attempt)
+        await asyncio.sleep(delay)
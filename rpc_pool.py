@@ -0,0 +1,285 @@
+import asyncio
+import itertools
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import aiohttp
+
+from adaptive_limit import AdaptiveLimiter
+from async_rpc import RPC_TIMEOUT, AsyncRPCClient, EthMethods, RPCError
+from nonce_manager import is_nonce_conflict
+
+# Rolling health: latency is an EWMA, error rate is taken over the last HEALTH_WINDOW calls
+LATENCY_EWMA_ALPHA = 0.2
+HEALTH_WINDOW = 20
+
+# Circuit breaker: an endpoint failing this share of its recent calls is taken out
+# of rotation for BREAKER_COOLDOWN seconds, doubled on every failed probe
+BREAKER_ERROR_RATE = 0.5
+BREAKER_MIN_CALLS = 5
+BREAKER_COOLDOWN = 10.0
+BREAKER_MAX_COOLDOWN = 120.0
+
+# eth_sendRawTransaction goes to this many endpoints at once
+BROADCAST_FANOUT = 3
+# A fan-out that no endpoint answered is sent again this many times (the same signed bytes,
+# so a copy that did land only comes back as "already known" or a nonce conflict)
+BROADCAST_RETRIES = 2
+BROADCAST_RETRY_DELAY = 0.5  # seconds, multiplied by the attempt number
+
+# Endpoint states
+CLOSED = "closed"  # healthy, in rotation
+OPEN = "open"  # tripped, skipped until the cooldown ends
+HALF_OPEN = "half_open"  # cooldown over, the next call is a probe
+
+
+class EndpointHealth:
+    """Rolling latency, error rate and circuit-breaker state of one RPC endpoint
+
+    Only transport failures count against an endpoint (connection errors,
+    timeouts, HTTP errors, malformed responses). A JSON-RPC error such as
+    "nonce too low" is a valid answer and counts as a success.
+    """
+
+    def __init__(self, url: str):
+        self.url = url
+        self.latency: Optional[float] = None  # seconds, EWMA
+        self._outcomes: deque = deque(maxlen=HEALTH_WINDOW)
+        self.state = CLOSED
+        self._cooldown = BREAKER_COOLDOWN
+        self._open_until = 0.0
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.failures = 0
+        self.trips = 0
+
+    @property
+    def error_rate(self) -> float:
+        return self._outcomes.count(False) / len(self._outcomes) if self._outcomes else 0.0
+
+    def available(self) -> bool:
+        with self._lock:
+            if self.state == OPEN and time.monotonic() >= self._open_until:
+                self.state = HALF_OPEN
+            return self.state != OPEN
+
+    def record_success(self, latency: float) -> None:
+        with self._lock:
+            self.calls += 1
+            self._outcomes.append(True)
+            self.latency = latency if self.latency is None else (
+                LATENCY_EWMA_ALPHA * latency + (1 - LATENCY_EWMA_ALPHA) * self.latency)
+            if self.state == HALF_OPEN:
+                self.state = CLOSED
+                self._cooldown = BREAKER_COOLDOWN
+                self._outcomes.clear()
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.calls += 1
+            self.failures += 1
+            self._outcomes.append(False)
+            if self.state == HALF_OPEN:
+                self._trip(min(self._cooldown * 2, BREAKER_MAX_COOLDOWN))
+            elif (self.state == CLOSED and len(self._outcomes) >= BREAKER_MIN_CALLS
+                  and self.error_rate >= BREAKER_ERROR_RATE):
+                self._trip(BREAKER_COOLDOWN)
+
+    def _trip(self, cooldown: float) -> None:
+        self.state = OPEN
+        self._cooldown = cooldown
+        self._open_until = time.monotonic() + cooldown
+        self.trips += 1
+        print(f"RPC endpoint {self.url} circuit open for {cooldown:.0f}s "
+              f"(error rate {self.error_rate:.0%})")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "latency_ms": round(self.latency * 1000, 1) if self.latency is not None else None,
+            "error_rate": round(self.error_rate, 3),
+            "calls": self.calls,
+            "failures": self.failures,
+            "trips": self.trips,
+        }
+
+
+def rank_endpoints(endpoints: List[EndpointHealth]) -> List[EndpointHealth]:
+    """Healthy endpoints, fastest first; unmeasured ones go first so they get measured
+
+    If every breaker is open the endpoints are still returned (soonest to
+    recover first) - a long shot beats failing the call outright.
+    """
+    healthy = [endpoint for endpoint in endpoints if endpoint.available()]
+    if not healthy:
+        return sorted(endpoints, key=lambda endpoint: endpoint._open_until)
+    return sorted(healthy, key=lambda endpoint: endpoint.latency or 0.0)
+
+
+class RPCPool(EthMethods):
+    """Async JSON-RPC over several endpoints with latency-aware routing and failover
+
+    Reads (and batches) go to the fastest healthy endpoint and fail over to
+    the next one on a transport error. `eth_sendRawTransaction` is fanned out
+    to the `broadcast_fanout` best endpoints at once; the first node to accept
+    it wins and the rest keep propagating in the background. Drop-in for
+    `AsyncRPCClient`, so `RPCBatcher` can sit on top of it.
+    """
+
+    def __init__(self, clients: List[AsyncRPCClient], broadcast_fanout: int = BROADCAST_FANOUT):
+        if not clients:
+            raise ValueError("RPCPool needs at least one endpoint")
+        self.clients = {client.url: client for client in clients}
+        self.endpoints = [EndpointHealth(client.url) for client in clients]
+        self.broadcast_fanout = broadcast_fanout
+        self._ids = itertools.count(1)
+        self._background: set = set()
+        self.failovers = 0
+
+    @classmethod
+    def from_urls(cls, session: aiohttp.ClientSession, urls: List[str], timeout: float = RPC_TIMEOUT,
+                  broadcast_fanout: int = BROADCAST_FANOUT,
+                  initial_concurrency: Optional[int] = None,
+                  max_concurrency: Optional[int] = None) -> "RPCPool":
+        """One client per URL; with `max_concurrency` each gets its own adaptive limit"""
+        clients = []
+        for url in urls:
+            limiter = None
+            if max_concurrency is not None:
+                limiter = AdaptiveLimiter(url, initial_concurrency or max_concurrency, max_limit=max_concurrency)
+            clients.append(AsyncRPCClient(session, url, timeout, limiter))
+        return cls(clients, broadcast_fanout)
+
+    @property
+    def calls(self) -> int:
+        return sum(client.calls for client in self.clients.values())
+
+    @property
+    def requests(self) -> int:
+        return sum(client.requests for client in self.clients.values())
+
+    def _payload(self, method: str, params: Optional[List[Any]]) -> Dict[str, Any]:
+        return {"jsonrpc": "2.0", "id": next(self._ids), "method": method, "params": params or []}
+
+    _result = staticmethod(AsyncRPCClient._result)
+
+    async def _timed(self, endpoint: EndpointHealth, request: Callable[[AsyncRPCClient], Awaitable[Any]],
+                     node_errors_are_failures: bool = False) -> Any:
+        started = time.monotonic()
+        try:
+            result = await request(self.clients[endpoint.url])
+        except RPCError:
+            if node_errors_are_failures:
+                endpoint.record_failure()
+            else:
+                endpoint.record_success(time.monotonic() - started)
+            raise
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+            endpoint.record_failure()
+            raise
+        endpoint.record_success(time.monotonic() - started)
+        return result
+
+    async def _failover(self, request: Callable[[AsyncRPCClient], Awaitable[Any]],
+                        node_errors_are_failures: bool = False) -> Any:
+        last_error: Optional[Exception] = None
+        for attempt, endpoint in enumerate(rank_endpoints(self.endpoints)):
+            if attempt:
+                self.failovers += 1
+            try:
+                return await self._timed(endpoint, request, node_errors_are_failures)
+            except RPCError as e:
+                if not node_errors_are_failures:
+                    raise
+                last_error = e
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                last_error = e
+        raise last_error
+
+    async def call(self, method: str, params: Optional[List[Any]] = None) -> Any:
+        if method == "eth_sendRawTransaction":
+            return await self._broadcast(params)
+        return await self._failover(lambda client: client.call(method, params))
+
+    async def find_transaction(self, tx_hash: str) -> Optional[Dict[str, Any]]:
+        """Ask every healthy endpoint: one that never saw the broadcast answers null"""
+        targets = rank_endpoints(self.endpoints)
+        lookups = await asyncio.gather(
+            *(self._timed(endpoint, lambda client: client.get_transaction(tx_hash)) for endpoint in targets),
+            return_exceptions=True)
+        answered = [tx for tx in lookups if not isinstance(tx, Exception)]
+        if not answered:
+            raise lookups[0]
+        # Prefer a copy that is already mined
+        return max(answered, key=lambda tx: (tx is not None, bool(tx and tx.get("blockNumber"))))
+
+    async def call_batch(self, payloads: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        # A batch rejected as a whole (rate limit, batch size) is the endpoint's fault
+        return await self._failover(lambda client: client.call_batch(payloads), node_errors_are_failures=True)
+
+    async def _broadcast(self, params: List[Any]) -> str:
+        for attempt in range(BROADCAST_RETRIES + 1):
+            try:
+                return await self._broadcast_once(params)
+            except RPCError as e:
+                # After a silent attempt a nonce conflict may be our own copy: still ambiguous
+                if attempt and is_nonce_conflict(e):
+                    raise transport_error
+                raise
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                transport_error = e
+                if attempt == BROADCAST_RETRIES:
+                    raise
+                await asyncio.sleep(BROADCAST_RETRY_DELAY * (attempt + 1))
+
+    async def _broadcast_once(self, params: List[Any]) -> str:
+        targets = rank_endpoints(self.endpoints)[:self.broadcast_fanout]
+        pending = {asyncio.create_task(self._timed(endpoint, lambda client: client.call("eth_sendRawTransaction",
+                                                                                         params)))
+                   for endpoint in targets}
+        tx_hash: Optional[str] = None
+        node_error: Optional[RPCError] = None
+        transport_error: Optional[Exception] = None
+        try:
+            while pending and tx_hash is None:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    try:
+                        tx_hash = task.result()
+                    except RPCError as e:
+                        # e.g. "already known" from a node the transaction reached first
+                        node_error = node_error or e
+                    except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                        transport_error = e
+        finally:
+            # Slower endpoints keep going: each extra node that accepts it helps propagation
+            for task in pending:
+                self._background.add(task)
+                task.add_done_callback(self._discard_background)
+        if tx_hash is not None:
+            return tx_hash
+        # A refusal is only definite if no target went silent: one that timed out may have taken it
+        if node_error is not None and (transport_error is None or is_nonce_conflict(node_error)):
+            raise node_error
+        raise transport_error
+
+    def _discard_background(self, task: asyncio.Task) -> None:
+        self._background.discard(task)
+        if not task.cancelled():
+            task.exception()  # retrieved; a late duplicate-send error is expected
+
+    async def close(self) -> None:
+        """Wait for broadcasts still propagating to slower endpoints"""
+        if self._background:
+            await asyncio.gather(*self._background, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        endpoints = {}
+        for endpoint in self.endpoints:
+            endpoints[endpoint.url] = endpoint.stats()
+            limiter = self.clients[endpoint.url].limiter
+            if limiter is not None:
+                endpoints[endpoint.url]["concurrency"] = limiter.stats()
+        return {"failovers": self.failovers, "endpoints": endpoints}
@@ -1,10 +1,29 @@
 import os
 import random
-import json
+import argparse
 import requests
-import time
-from web3 import Web3
-from eth_account import Account
+import asyncio
+import aiohttp
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from adaptive_limit import AdaptiveLimiter
+from gas_oracle import GasOracle
+from gas_limit_cache import GasLimitCache
+from nonce_manager import (NonceManager, build_cancel_transaction, is_already_known, is_nonce_conflict, is_nonce_too_low,
+                           is_rejection)
+from deposit_tracker import DepositTracker
+from confirmation_watcher import DROPPED, INCLUDED as TX_INCLUDED, TIMEOUT, ConfirmationWatcher
+from async_rpc import RPCBatcher
+from fee_bumper import FeeBumper
+from calldata_template import CalldataCache
+from rpc_pool import RPCPool
+from sender_pool import KEYS_PATH, SenderPool, read_private_keys
+from solana_address import is_valid_address
+from wallet_source import WALLETS_PATH, iter_wallets, parse_line_range
+from rate_limit import RateLimiter, get_json
+import metrics
+from journal import (JOURNAL_PATH, QUOTED, SIGNED, BROADCAST, INCLUDED, CONFIRMED, FAILED, SKIPPED, IN_FLIGHT_STATES,
+                     Journal, completed_wallets, fold_journal, write_results)
 
 #=========================================================================
 
@@ -12,8 +31,56 @@ from eth_account import Account
 MIN_ETH_AMOUNT = 0.00015  # Minimum ETH to send
 MAX_ETH_AMOUNT = 0.0002  # Maximum ETH to send
 
-#Sleep time
-sleep_time = random.randint(1, 10)
+# Gas.zip API request budgets (requests per second) per endpoint; Retry-After and
+# rate-limit headers from the API override them
+QUOTE_REQUESTS_PER_SECOND = 10.0
+STATUS_REQUESTS_PER_SECOND = 5.0
+
+# How many Gas.zip quotes are fetched ahead of the wallet being sent; how many of
+# them are in flight at once adapts to the API's latency and 429s (up to this many)
+QUOTE_PREFETCH = 5
+
+# Build calldata locally once its layout is learned and verified against the API
+USE_CALLDATA_TEMPLATE = True
+
+# Also reject 32-byte keys that are not ed25519 points (program-derived addresses)
+REQUIRE_ON_CURVE = False
+
+# Skip repeated addresses in wallets.txt; costs 16-32 MB per million lines, so turn it
+# off for huge files that are already deduplicated
+DEDUPE_WALLETS = True
+
+# Sender keys (one per line in pk.txt) each get their own nonce lane;
+# wallets are assigned by "least-pending" or "round-robin"
+SENDER_SCHEDULER = "least-pending"
+# Confirm inclusion by following new Base blocks (one block fetch per block, not
+# one receipt poll per transaction); BASE_WS_URL switches to an eth_subscribe feed
+TRACK_RECEIPTS = True
+BLOCK_TIME = 2.0  # Base block time, seconds
+STUCK_AFTER = 30  # seconds before a not-yet-included transaction is checked (stuck, underpriced or dropped)
+BASE_WS_URL = os.environ.get("BASE_WS_URL")
+# Replace transactions flagged as stuck with the same nonce and both fees raised by
+# FEE_BUMP (nodes require at least 10%), up to the caps and MAX_FEE_BUMPS times per nonce
+REPLACE_STUCK = True
+FEE_BUMP = 0.125
+MAX_FEE_BUMPS = 5
+# Fees used when the gas oracle fails; the max fee cap lets even such a transaction take every bump
+FALLBACK_MAX_FEE_GWEI = 2.0
+FALLBACK_PRIORITY_FEE_GWEI = 0.001
+MAX_FEE_CAP_GWEI = FALLBACK_MAX_FEE_GWEI * (1 + FEE_BUMP) ** MAX_FEE_BUMPS
+MAX_PRIORITY_FEE_CAP_GWEI = 0.1
+# Per-stage counters and latency histograms: served as Prometheus text on
+# 127.0.0.1:METRICS_PORT/metrics when set, and/or written as JSON to METRICS_SNAPSHOT_PATH
+METRICS_PORT = int(os.environ["METRICS_PORT"]) if os.environ.get("METRICS_PORT") else None
+METRICS_SNAPSHOT_PATH = os.environ.get("METRICS_SNAPSHOT_PATH")
+# Buffer stdout and flush it in the background instead of a write per printed line
+BUFFERED_OUTPUT = True
+
+# Gas limit used when estimation fails, and for the balance reserved per transaction
+FALLBACK_GAS_LIMIT = 100000
+# Estimate gas once per calldata shape (contract and calldata length) and reuse it,
+# re-estimating every this many transactions of the shape
+GAS_LIMIT_RESAMPLE_EVERY = 50
 
 # EIP-1559 Gas Settings
 MAX_PRIORITY_FEE_MULTIPLIER = 0.1  # Multiplier for priority fee (tip)
@@ -24,38 +91,100 @@ MAX_FEE_MULTIPLIER = 2.0  # Multiplier for max fee per gas
 # Configuration
 BASE_CHAIN_ID = 8453  # Base
 SOLANA_CHAIN_ID = 501474  # Solana (Gas.zip uses this ID for Solana)
-GAS_ZIP_API_BASE_URL = "https://backend.gas.zip/v2"
-
-# Read private key
-try:
-    with open("pk.txt", "r") as f:
-        PRIVATE_KEY = f.read().strip()
-except FileNotFoundError:
-    print("Error: pk.txt not found. Please create it and add your private key.")
-    exit()
-
-# Read Solana wallet addresses
-try:
-    with open("wallets.txt", "r") as f:
-        SOLANA_WALLETS = [line.strip() for line in f if line.strip()]
-except FileNotFoundError:
-    print("Error: wallets.txt not found. Please create it and add Solana wallet addresses.")
-    exit()
-
-if not SOLANA_WALLETS:
-    print("Error: wallets.txt is empty. Please add Solana wallet addresses.")
-    exit()
-
-# Connect to Base network
-BASE_RPC_URL = "https://mainnet.base.org"
-web3 = Web3(Web3.HTTPProvider(BASE_RPC_URL))
-
-if not web3.is_connected():
-    print(f"Error: Could not connect to Base network at {BASE_RPC_URL}")
-    exit()
-
-account = Account.from_key(PRIVATE_KEY)
-print(f"Sender address: {account.address}")
+# Both endpoints can be overridden from the environment (e.g. to run against the benchmark simulator)
+GAS_ZIP_API_BASE_URL = os.environ.get("GAS_ZIP_API_BASE_URL", "https://backend.gas.zip/v2")
+
+# Nothing below reads files or touches the network at import time: connect() does that
+# for a real run, and a dry run never needs web3, the keys or an RPC endpoint
+# Only the official endpoint by default; list more to get failover and broadcast fan-out
+BASE_RPC_URLS = os.environ["BASE_RPC_URLS"].split(",") if os.environ.get("BASE_RPC_URLS") else [
+    "https://mainnet.base.org",
+]
+BROADCAST_FANOUT = 3
+
+# Set by connect()
+web3 = None
+rpc_provider = None
+senders = None
+fee_bumper = None
+# Set by run()
+journal = None
+
+# Calldata layout learned from real quotes (see USE_CALLDATA_TEMPLATE)
+calldata_cache = CalldataCache()
+# Concurrent Gas.zip quote requests from the prefetch threads
+quote_limiter = AdaptiveLimiter("quotes", initial = 2, max_limit = QUOTE_PREFETCH)
+# Token buckets shared by everything that calls the Gas.zip API
+rate_limits = RateLimiter({"quotes": QUOTE_REQUESTS_PER_SECOND, "deposit": STATUS_REQUESTS_PER_SECOND})
+# Component stats are exported next to the stage timings
+metrics.registry.add_collector("calldata_template", calldata_cache.stats)
+metrics.registry.add_collector("quote_limiter", quote_limiter.stats)
+
+
+def load_senders():
+    """Read pk.txt (one private key per line) into a SenderPool; exits with a message if there are none"""
+    try:
+        private_keys = read_private_keys(KEYS_PATH)
+    except FileNotFoundError:
+        print("Error: pk.txt not found. Please create it and add your private key(s), one per line.")
+        exit()
+    if not private_keys:
+        print("Error: pk.txt is empty. Please add your private key(s), one per line.")
+        exit()
+    return SenderPool(private_keys, scheduler = SENDER_SCHEDULER)
+
+
+def check_wallets_file():
+    # Solana wallet addresses are streamed from wallets.txt, never loaded all at once
+    try:
+        if next(iter_wallets(WALLETS_PATH), None) is None:
+            print("Error: wallets.txt is empty. Please add Solana wallet addresses.")
+            exit()
+    except FileNotFoundError:
+        print("Error: wallets.txt not found. Please create it and add Solana wallet addresses.")
+        exit()
+
+
+async def send_replacement(raw_transaction):
+    # Called from the tracking event loop: keep the blocking web3 call off it
+    with metrics.timer("replace"):
+        return await asyncio.to_thread(web3.eth.send_raw_transaction, raw_transaction)
+
+
+def connect():
+    """Connect to Base and load the sender keys with their nonces and balances (once per process)"""
+    global web3, rpc_provider, senders, fee_bumper
+    if web3 is not None:
+        return
+    # web3 takes over a second to import, so only a real run loads it
+    from web3 import Web3
+    from web3_provider import FailoverHTTPProvider
+
+    # Reads go to the fastest healthy endpoint, broadcasts are sent to several endpoints at once
+    rpc_provider = FailoverHTTPProvider(BASE_RPC_URLS, broadcast_fanout = BROADCAST_FANOUT)
+    web3 = Web3(rpc_provider)
+    if not web3.is_connected():
+        print(f"Error: Could not connect to Base network at any of {BASE_RPC_URLS}")
+        exit()
+
+    senders = load_senders()
+    for sender in senders:
+        # Nonces are allocated locally per key; only the starting value comes from the RPC
+        sender.nonce_manager = NonceManager(web3.eth.get_transaction_count(sender.address, 'pending'))
+        sender.balance = web3.eth.get_balance(sender.address)
+        print(f"Sender address: {sender.address} ({web3.from_wei(sender.balance, 'ether'):.6f} ETH)")
+
+    # Same-nonce replacements with higher fees for transactions that stop moving
+    if (MAX_FEE_CAP_GWEI < FALLBACK_MAX_FEE_GWEI * (1 + FEE_BUMP)
+            or MAX_PRIORITY_FEE_CAP_GWEI < FALLBACK_PRIORITY_FEE_GWEI * (1 + FEE_BUMP)):
+        print(f"Error: fee caps ({MAX_FEE_CAP_GWEI} / {MAX_PRIORITY_FEE_CAP_GWEI} Gwei) leave no room to bump a "
+              f"transaction sent with the fallback fees ({FALLBACK_MAX_FEE_GWEI} / {FALLBACK_PRIORITY_FEE_GWEI} Gwei)")
+        exit()
+    fee_bumper = FeeBumper(senders, send_replacement, bump = FEE_BUMP,
+                           max_fee_cap = web3.to_wei(MAX_FEE_CAP_GWEI, 'gwei'),
+                           max_priority_fee_cap = web3.to_wei(MAX_PRIORITY_FEE_CAP_GWEI, 'gwei'),
+                           max_bumps = MAX_FEE_BUMPS, base_fee_multiplier = MAX_FEE_MULTIPLIER)
+    metrics.registry.add_collector("fee_bumper", fee_bumper.stats)
 
 
 def get_gas_zip_calldata_quote(deposit_chain_id, deposit_amount_wei, outbound_chain_id, destination_address,
@@ -68,9 +197,9 @@ def get_gas_zip_calldata_quote(deposit_chain_id, deposit_amount_wei, outbound_ch
     }
 
     try:
-        response = requests.get(url, params = params)
-        response.raise_for_status()
-        return response.json()
+        # Rate limited per endpoint, transient failures are retried with jittered backoff
+        with metrics.timer("quote"):
+            return get_json(url, rate_limits.bucket("quotes"), params = params, timeout = 15, limiter = quote_limiter)
     except requests.exceptions.RequestException as e:
         print(f"Error getting calldata quote from Gas.zip: {e}")
         if hasattr(e, 'response') and e.response is not None:
@@ -87,19 +216,40 @@ def get_inbound_address(chain_id):
     return inbound_addresses.get(chain_id)
 
 
+def fetch_gas_snapshot():
+    """Fetch latest block number, base fee and suggested priority fee from Base"""
+    latest_block = web3.eth.get_block('latest')
+    base_fee_per_gas = latest_block.get('baseFeePerGas', 0)
+
+    # Get suggested priority fee from eth_maxPriorityFeePerGas if available
+    try:
+        priority_fee = web3.eth.max_priority_fee
+    except:
+        # Fallback: use a reasonable priority fee for Base (typically low)
+        priority_fee = web3.to_wei(FALLBACK_PRIORITY_FEE_GWEI, 'gwei')
+
+    return latest_block['number'], base_fee_per_gas, priority_fee
+
+
+# Base fee and tip are shared by every transaction landing in the same block
+gas_oracle = GasOracle(fetch_gas_snapshot)
+
+
+def estimate_gas(transaction):
+    return web3.eth.estimate_gas(transaction)
+
+
+# eth_estimateGas once per calldata shape, shared by all senders
+gas_limits = GasLimitCache(estimate_gas, resample_every = GAS_LIMIT_RESAMPLE_EVERY)
+metrics.registry.add_collector("gas_oracle", gas_oracle.stats)
+metrics.registry.add_collector("gas_limits", gas_limits.stats)
+
+
 def get_eip1559_gas_params():
     """Get EIP-1559 gas parameters for Base network"""
     try:
-        # Get latest block to determine base fee
-        latest_block = web3.eth.get_block('latest')
-        base_fee_per_gas = latest_block.get('baseFeePerGas', 0)
-
-        # Get suggested priority fee from eth_maxPriorityFeePerGas if available
-        try:
-            priority_fee = web3.eth.max_priority_fee
-        except:
-            # Fallback: use a reasonable priority fee for Base (typically low)
-            priority_fee = web3.to_wei(0.001, 'gwei')  # 0.001 Gwei priority fee
+        with metrics.timer("gas_params"):
+            base_fee_per_gas, priority_fee = gas_oracle.get()
 
         # Calculate max fees with multipliers
         max_priority_fee_per_gas = int(priority_fee * MAX_PRIORITY_FEE_MULTIPLIER)
@@ -115,8 +265,8 @@ def get_eip1559_gas_params():
     except Exception as e:
         print(f"Error getting EIP-1559 gas parameters: {e}")
         # Fallback to reasonable defaults for Base
-        max_fee_per_gas = web3.to_wei(2, 'gwei')  # 2 Gwei max fee
-        max_priority_fee_per_gas = web3.to_wei(0.001, 'gwei')  # 0.001 Gwei priority fee
+        max_fee_per_gas = web3.to_wei(FALLBACK_MAX_FEE_GWEI, 'gwei')
+        max_priority_fee_per_gas = web3.to_wei(FALLBACK_PRIORITY_FEE_GWEI, 'gwei')
 
         print(f"Using fallback EIP-1559 gas parameters:")
         print(f"  Max Fee: {web3.from_wei(max_fee_per_gas, 'gwei'):.4f} Gwei")
@@ -125,30 +275,30 @@ def get_eip1559_gas_params():
         return max_fee_per_gas, max_priority_fee_per_gas
 
 
-def send_bridge_transaction(private_key, sender_address, amount_eth, inbound_address, calldata):
+def send_bridge_transaction(sender, amount_eth, inbound_address, calldata, solana_wallet=None):
     """Send ETH with calldata to Gas.zip for bridging to Solana using EIP-1559"""
-    nonce = web3.eth.get_transaction_count(sender_address)
+    sender_address = sender.address
+    nonce_manager = sender.nonce_manager
     amount_wei = web3.to_wei(amount_eth, 'ether')
 
     # Get EIP-1559 gas parameters
     max_fee_per_gas, max_priority_fee_per_gas = get_eip1559_gas_params()
 
-    # Estimate gas for transaction with calldata
+    # Estimate gas for transaction with calldata (cached per calldata shape, 20% buffer included)
     try:
-        gas_estimate = web3.eth.estimate_gas({
-            'from': sender_address,
-            'to': inbound_address,
-            'value': amount_wei,
-            'data': calldata,
-            'maxFeePerGas': max_fee_per_gas,
-            'maxPriorityFeePerGas': max_priority_fee_per_gas
-        })
-        # Add 20% buffer to gas estimate
-        gas_limit = int(gas_estimate * 1.2)
+        with metrics.timer("estimate"):
+            gas_limit = gas_limits.get({
+                'from': sender_address,
+                'to': inbound_address,
+                'value': amount_wei,
+                'data': calldata,
+                'maxFeePerGas': max_fee_per_gas,
+                'maxPriorityFeePerGas': max_priority_fee_per_gas
+            })
         print(f"  Gas Estimate: {gas_limit:,} units")
     except Exception as e:
         print(f"Gas estimation failed: {e}")
-        gas_limit = 100000  # Fallback gas limit
+        gas_limit = FALLBACK_GAS_LIMIT
 
     # Calculate estimated transaction cost
     estimated_gas_cost_wei = gas_limit * max_fee_per_gas
@@ -166,101 +316,284 @@ def send_bridge_transaction(private_key, sender_address, amount_eth, inbound_add
         'gas': gas_limit,
         'maxFeePerGas': max_fee_per_gas,
         'maxPriorityFeePerGas': max_priority_fee_per_gas,
-        'nonce': nonce,
         'data': calldata,  # Include calldata for bridging instructions
         'chainId': BASE_CHAIN_ID,
         'type': 2  # EIP-1559 transaction type
     }
 
-    signed_txn = web3.eth.account.sign_transaction(transaction, private_key)
-    tx_hash = web3.eth.send_raw_transaction(signed_txn.rawTransaction)
-    return web3.to_hex(tx_hash)
-
-
-def track_deposit_status(tx_hash, max_wait_time=300):
-    """Track the status of a deposit transaction with timeout"""
-    url = f"{GAS_ZIP_API_BASE_URL}/deposit/{tx_hash}"
-    start_time = time.time()
-
-    while time.time() - start_time < max_wait_time:
+    for attempt in range(2):
+        nonce = nonce_manager.allocate()
+        transaction['nonce'] = nonce
         try:
-            response = requests.get(url)
-            response.raise_for_status()
-            status_data = response.json()
-
-            deposit_info = status_data.get("deposit", {})
-            status = deposit_info.get("status", "UNKNOWN")
-            outbound_txs = status_data.get("outbound", [])
-
-            print(f"Deposit status for {tx_hash}: {status}")
-
-            if outbound_txs:
-                for outbound in outbound_txs:
-                    print(f"  Outbound tx: {outbound.get('hash', 'N/A')} on chain {outbound.get('chain', 'N/A')}")
-
-            if status in ["CONFIRMED", "CANCELLED", "FAILED"]:
-                return status_data
-
-            time.sleep(15)  # Wait 15 seconds before next check
-
-        except requests.exceptions.RequestException as e:
-            print(f"Error tracking deposit status: {e}")
-            time.sleep(15)
+            with metrics.timer("sign"):
+                signed_txn = web3.eth.account.sign_transaction(transaction, sender.private_key)
+        except Exception:
+            nonce_manager.mark_failed(nonce)  # never left the process
+            raise
+        signed_hash = web3.to_hex(signed_txn.hash)
+        if solana_wallet:
+            # Journal the signed bytes first so --resume can re-broadcast instead of re-sending
+            journal.record(solana_wallet, SIGNED, sender = sender_address, nonce = nonce,
+                           tx_hash = signed_hash, raw = web3.to_hex(signed_txn.rawTransaction))
+        try:
+            with metrics.timer("broadcast"):
+                tx_hash = web3.to_hex(web3.eth.send_raw_transaction(signed_txn.rawTransaction))
+        except Exception as e:
+            if not is_rejection(e) or is_already_known(e):
+                # No answer (timeout, reset) or the node already holds these bytes: it may be out there.
+                # The nonce stays with the signed hash and the block watcher settles it
+                print(f"Broadcast of {signed_hash} not acknowledged ({e}); tracking it as sent")
+                tx_hash = signed_hash
+            else:
+                # Rejected by the node: the nonce goes back to the pool and is re-issued to the next transaction
+                nonce_manager.mark_failed(nonce, e)
+                if attempt == 0 and is_nonce_too_low(e):
+                    print(f"Nonce {nonce} already used on chain, resyncing and retrying...")
+                    nonce_manager.resync(web3.eth.get_transaction_count(sender_address, 'pending'))
+                    continue
+                raise
+        nonce_manager.mark_sent(nonce, tx_hash)
+        if REPLACE_STUCK:
+            fee_bumper.track(tx_hash, sender, transaction)
+        return tx_hash
+
+
+def cancel_nonce_gaps(sender):
+    """Fill nonces that failed to broadcast below the last sent one with 0 ETH self-transfers"""
+    nonce_manager = sender.nonce_manager
+    for nonce in nonce_manager.gaps():
+        nonce_manager.take_gap(nonce)
+        max_fee_per_gas, max_priority_fee_per_gas = get_eip1559_gas_params()
+        transaction = build_cancel_transaction(sender.address, nonce, max_fee_per_gas,
+                                               max_priority_fee_per_gas, BASE_CHAIN_ID)
+        try:
+            signed_txn = web3.eth.account.sign_transaction(transaction, sender.private_key)
+        except Exception as e:
+            nonce_manager.mark_failed(nonce, e)
+            print(f"Could not fill nonce gap {nonce} of {sender.address}: {e}")
             continue
+        try:
+            tx_hash = web3.to_hex(web3.eth.send_raw_transaction(signed_txn.rawTransaction))
+        except Exception as e:
+            if is_rejection(e) and not is_already_known(e):
+                nonce_manager.mark_failed(nonce, e)
+                print(f"Could not fill nonce gap {nonce} of {sender.address}: {e}")
+                continue
+            tx_hash = web3.to_hex(signed_txn.hash)  # no answer: it may be out there, keep the nonce
+        nonce_manager.mark_sent(nonce, tx_hash)
+        print(f"Cancelled nonce gap {nonce} of {sender.address}: {tx_hash}")
+
+
+def apply_deposit_status(solana_wallet, tx_hash, deposit_status):
+    """Journal the final Gas.zip deposit state of a sent wallet"""
+    # Check if bridging was successful
+    if deposit_status and not deposit_status.get("timeout"):
+        final_status = deposit_status.get("deposit", {}).get("status", "UNKNOWN")
+        senders.confirm(tx_hash)
+        print(f"Deposit status for {tx_hash}: {final_status}")
+
+        outbound_txs = deposit_status.get("outbound", [])
+        solana_tx_hashes = [tx.get("hash") for tx in outbound_txs]
+        journal.record(solana_wallet, CONFIRMED, tx_hash = tx_hash, final_status = final_status,
+                       solana_tx_hashes = solana_tx_hashes)
+        if outbound_txs:
+            for outbound in outbound_txs:
+                print(f"  Outbound tx: {outbound.get('hash', 'N/A')} on chain {outbound.get('chain', 'N/A')}")
+            print(f"✅ Bridge completed! Solana transaction(s): {solana_tx_hashes}")
+        else:
+            print(f"⚠️  Bridge status: {final_status} (no outbound transactions yet)")
+    else:
+        # Stays in the broadcast state so --resume keeps tracking it
+        journal.record(solana_wallet, BROADCAST, tx_hash = tx_hash, final_status = "TIMEOUT_OR_ERROR")
+        print(f"❌ Bridge tracking timed out or failed for {tx_hash}")
+
+
+async def replace_stuck(solana_wallet, tx_hash, event, watcher, tracker):
+    """Re-send a stuck transaction with the same nonce and higher fees, and follow the new hash"""
+    new_hash = await fee_bumper.replace(tx_hash, event["base_fee"])
+    if new_hash is None:
+        return
+    watcher.replace(tx_hash, new_hash)
+    # Gas.zip indexes the deposit under whichever version gets mined; follow the newest until then
+    tracker.discard(tx_hash)
+    tracker.add(new_hash, solana_wallet)
+    hashes = fee_bumper.hashes(new_hash)
+    journal.record(solana_wallet, BROADCAST, tx_hash = new_hash, replaces = hashes[:-1])
+    print(f"⛽ Replaced {tx_hash} with {new_hash} (replacement {len(hashes) - 1})")
+
+
+async def apply_confirmation(solana_wallet, tx_hash, event, watcher, tracker):
+    """Journal what the block watcher learned about a sent transaction"""
+    status = event["status"]
+    metrics.registry.inc("bridge_tx_events_total", status = status)
+    if status in (TX_INCLUDED, DROPPED, TIMEOUT):
+        fee_bumper.forget(tx_hash)
+    if status == TX_INCLUDED:
+        journal.record(solana_wallet, INCLUDED, tx_hash = tx_hash, block = event["block"], success = event["success"])
+        if event["replaced"]:
+            # An earlier or later version of the same nonce won; track the deposit under its hash
+            for replaced_hash in event["replaced"]:
+                tracker.discard(replaced_hash)
+            tracker.add(tx_hash, solana_wallet)
+        if not event["success"]:
+            # No ETH left Base, so no deposit will ever show up; --resume sends it again
+            print(f"❌ Transaction {tx_hash} reverted in block {event['block']}")
+            journal.record(solana_wallet, FAILED, reason = "reverted", tx_hash = tx_hash)
+            tracker.discard(tx_hash)
+    elif status == DROPPED:
+        # Another transaction took the nonce and ours was never mined: no ETH left, --resume sends it again
+        senders.drop(tx_hash)
+        print(f"🕳  Transaction {tx_hash} was dropped: its nonce was used by another transaction")
+        journal.record(solana_wallet, FAILED, reason = "dropped", tx_hash = tx_hash)
+        tracker.discard(tx_hash)
+    elif status == TIMEOUT:
+        print(f"⏳ Transaction {tx_hash} not included after {event['age']:.0f}s")
+    else:
+        if event["missing"]:
+            print(f"⚠️ Transaction {tx_hash} not known to any endpoint after {event['age']:.0f}s")
+        else:
+            print(f"⚠️ Transaction {tx_hash} pending for {event['age']:.0f}s ({status}): "
+                  f"maxFee {event['max_fee_per_gas']}, baseFee {event['base_fee']}")
+        if REPLACE_STUCK:
+            await replace_stuck(solana_wallet, tx_hash, event, watcher, tracker)
+
+
+def track_deposit_statuses(sent, max_wait_time=300, start_block=None):
+    """Track all sent deposits concurrently once sending is finished
+
+    `sent` holds (wallet, tx_hash, state, replaces, sender, nonce) tuples; sender
+    and nonce may be None, and then the block watcher never reports a drop.
+
+    With TRACK_RECEIPTS, Base blocks from `start_block` on are followed at the
+    same time to confirm inclusion and catch reverted or dropped transactions.
+    """
+
+    async def watch(watcher, tracker):
+        runner = asyncio.create_task(watcher.run(start_block))
+        async for tx_hash, event, solana_wallet in watcher.results():
+            await apply_confirmation(solana_wallet, tx_hash, event, watcher, tracker)
+        await runner
+        print(f"Block watching finished: {watcher.stats()}")
+
+    async def run():
+        async with aiohttp.ClientSession() as session:
+            tracker = DepositTracker(session, GAS_ZIP_API_BASE_URL, bucket = rate_limits.bucket("deposit"),
+                                     max_wait_time = max_wait_time)
+            watcher = None
+            if TRACK_RECEIPTS:
+                watcher = ConfirmationWatcher(RPCBatcher(RPCPool.from_urls(session, BASE_RPC_URLS)),
+                                              block_time = BLOCK_TIME, stuck_after = STUCK_AFTER,
+                                              ws_url = BASE_WS_URL, session = session)
+                metrics.registry.add_collector("confirmations", watcher.stats)
+            for solana_wallet, tx_hash, state, replaces, sender_address, nonce in sent:
+                tracker.add(tx_hash, solana_wallet)
+                if watcher is not None and state == BROADCAST:
+                    # Replacements are watched together with what they replace: any of them may be mined
+                    hashes = replaces + [tx_hash]
+                    watcher.add(hashes[0], solana_wallet, sender_address, nonce)
+                    for old_hash, new_hash in zip(hashes, hashes[1:]):
+                        watcher.replace(old_hash, new_hash)
+            tracker.close()
+
+            watching = None
+            if watcher is not None:
+                watcher.close()
+                watching = asyncio.create_task(watch(watcher, tracker))
+            poller = asyncio.create_task(tracker.run())
+            try:
+                async for tx_hash, deposit_status, solana_wallet in tracker.results():
+                    apply_deposit_status(solana_wallet, tx_hash, deposit_status)
+                    if watcher is not None and deposit_status and not deposit_status.get("timeout"):
+                        # A confirmed deposit means the transaction is in a block already
+                        watcher.discard(tx_hash)
+                        fee_bumper.forget(tx_hash)
+                await poller
+                if watching is not None:
+                    await watching
+            finally:
+                if watching is not None and not watching.done():
+                    watching.cancel()
+            print(f"Deposit tracking finished after {tracker.polls} status requests")
+
+    if sent:
+        asyncio.run(run())
+
+
+def find_sent(entry):
+    """True if a journaled transaction was mined or is pending, False if unknown or reverted, None if unchecked"""
+    from web3.exceptions import TransactionNotFound
 
-    print(f"Timeout waiting for deposit status after {max_wait_time} seconds")
-    return {"timeout": True, "last_status": status if 'status' in locals() else "UNKNOWN"}
-
-
-def validate_solana_address(address):
-    """Basic validation for Solana address format"""
-    if not address or len(address) < 32 or len(address) > 44:
-        return False
-    # Solana addresses are base58 encoded and typically 32-44 characters
     try:
-        # Basic check - should be alphanumeric with some specific chars
-        allowed_chars = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
-        return all(c in allowed_chars for c in address)
-    except:
-        return False
-
-
-# Main execution
-results = []
-inbound_address_base = get_inbound_address(BASE_CHAIN_ID)
+        for tx_hash in entry.get("replaces", []) + [entry["tx_hash"]]:
+            try:
+                return web3.eth.get_transaction_receipt(tx_hash)["status"] == 1
+            except TransactionNotFound:
+                pass
+            try:
+                web3.eth.get_transaction(tx_hash)
+                return True
+            except TransactionNotFound:
+                pass
+    except Exception as e:
+        print(f"Could not look up {entry['tx_hash']}: {e}")
+        return None
+    return False
+
+
+def reconcile_journal(entries):
+    """--resume: re-broadcast signed but unsent transactions; return (in flight, held back)
+
+    A FAILED wallet with a journaled hash (an unanswered broadcast, a drop)
+    is looked up first: if any version went out it is tracked again instead
+    of being paid twice. Wallets whose lookup fails are held back this run.
+    """
+    in_flight = []
+    held = set()
+    for solana_wallet, entry in entries.items():
+        if entry["state"] == FAILED and entry.get("tx_hash"):
+            sent = find_sent(entry)
+            if sent is None:
+                held.add(solana_wallet)
+            elif sent:
+                print(f"{entry['tx_hash']} for {solana_wallet} did go out; tracking it instead of re-sending")
+                journal.record(solana_wallet, BROADCAST, tx_hash = entry["tx_hash"])
+                entry["state"] = BROADCAST
+        if entry["state"] == SIGNED and entry.get("raw"):
+            try:
+                # Same signed bytes, same nonce: re-sending can never double-spend
+                web3.eth.send_raw_transaction(entry["raw"])
+            except Exception as e:
+                # Without an answer it may have gone out; the block watcher settles it
+                if is_rejection(e) and not is_nonce_conflict(e):
+                    print(f"Could not re-broadcast {entry['tx_hash']}: {e}")
+                    journal.record(solana_wallet, FAILED, reason = str(e))
+                    entry["state"] = FAILED
+                    continue
+            journal.record(solana_wallet, BROADCAST, tx_hash = entry["tx_hash"])
+            entry["state"] = BROADCAST
+        if entry["state"] in IN_FLIGHT_STATES and entry.get("tx_hash"):
+            in_flight.append((solana_wallet, entry["tx_hash"], entry["state"], entry.get("replaces", []),
+                              entry.get("sender"), entry.get("nonce")))
+    return in_flight, held
 
-if not inbound_address_base:
-    print(f"Error: Inbound address for Base chain ID {BASE_CHAIN_ID} not found.")
-    exit()
 
-print(f"Using Gas.zip inbound address: {inbound_address_base}")
-print(f"Processing {len(SOLANA_WALLETS)} Solana wallets...")
-print(f"\n💰 ETH Amount Configuration:")
-print(f"  Minimum ETH per transaction: {MIN_ETH_AMOUNT} ETH")
-print(f"  Maximum ETH per transaction: {MAX_ETH_AMOUNT} ETH")
-print(f"\n⛽ Gas Configuration (EIP-1559):")
-print(f"  Priority Fee Multiplier: {MAX_PRIORITY_FEE_MULTIPLIER}x")
-print(f"  Max Fee Multiplier: {MAX_FEE_MULTIPLIER}x")
+def validate_solana_address(address):
+    """Check that the address is base58 and decodes to a 32-byte public key"""
+    return is_valid_address(address, require_on_curve = REQUIRE_ON_CURVE)
 
-for i, solana_wallet in enumerate(SOLANA_WALLETS):
-    print(f"\n{'=' * 60}")
-    print(f"Processing wallet {i + 1}/{len(SOLANA_WALLETS)}: {solana_wallet}")
-
-    # Validate Solana address
-    if not validate_solana_address(solana_wallet):
-        print(f"Warning: Invalid Solana address format: {solana_wallet}")
-        results.append({
-            "solana_wallet": solana_wallet,
-            "status": "Skipped - Invalid Solana address format",
-            "eth_amount": 0
-        })
-        continue
 
+def request_quote(solana_wallet):
+    """Pick a random ETH amount for the wallet and fetch its Gas.zip calldata quote"""
     # Random ETH amount between configured min and max
     eth_amount = random.uniform(MIN_ETH_AMOUNT, MAX_ETH_AMOUNT)
     eth_amount = max(eth_amount, MIN_ETH_AMOUNT)  # Ensure minimum
     eth_amount = min(eth_amount, MAX_ETH_AMOUNT)  # Ensure maximum
-    print(f"Planning to send {eth_amount:.6f} ETH from Base to Solana wallet: {solana_wallet}")
+
+    # Skip the API round trip when the calldata template is trusted
+    if USE_CALLDATA_TEMPLATE:
+        calldata = calldata_cache.build(solana_wallet)
+        if calldata:
+            return eth_amount, {"calldata": calldata, "quotes": [], "source": "template"}
 
     # Get calldata and quote for bridging
     deposit_amount_wei = web3.to_wei(eth_amount, 'ether')
@@ -269,114 +602,240 @@ for i, solana_wallet in enumerate(SOLANA_WALLETS):
         deposit_amount_wei = deposit_amount_wei,
         outbound_chain_id = SOLANA_CHAIN_ID,
         destination_address = solana_wallet,
-        sender_address = account.address
+        sender_address = senders.primary.address  # the calldata does not depend on the sender
     )
+    if USE_CALLDATA_TEMPLATE and calldata_quote and calldata_quote.get("calldata"):
+        calldata_cache.observe(calldata_quote["calldata"], solana_wallet)
+    return eth_amount, calldata_quote
+
+
+def prefetch_quotes(wallets, lookahead=QUOTE_PREFETCH):
+    """Yield (wallet, quote_future) while quotes for the next wallets are fetched in background threads"""
+    with ThreadPoolExecutor(max_workers = lookahead) as executor:
+        pending = deque()
+        for wallet in wallets:
+            # Invalid addresses never cost a quote request
+            future = executor.submit(request_quote, wallet) if validate_solana_address(wallet) else None
+            pending.append((wallet, future))
+            if len(pending) > lookahead:
+                yield pending.popleft()
+        while pending:
+            yield pending.popleft()
+
+
+def dry_run(resume=False, line_range=(0, None)):
+    """Validate addresses and plan amounts without web3, keys, network or journal writes"""
+    completed = completed_wallets(fold_journal(JOURNAL_PATH, drop=("raw",))) if resume else set()
+    planned = invalid = 0
+    total_eth = 0.0
+    for solana_wallet in iter_wallets(WALLETS_PATH, *line_range, dedupe = DEDUPE_WALLETS, skip = completed):
+        if not validate_solana_address(solana_wallet):
+            invalid += 1
+            print(f"Warning: Invalid Solana address format: {solana_wallet}")
+            continue
+        eth_amount = random.uniform(MIN_ETH_AMOUNT, MAX_ETH_AMOUNT)
+        planned += 1
+        total_eth += eth_amount
+        print(f"Would send {eth_amount:.6f} ETH to {solana_wallet}")
+    print(f"\nDry run, nothing sent: {planned} wallet(s) planned ({total_eth:.6f} ETH), "
+          f"{invalid} invalid, {len(completed)} already done")
+
+
+def run(resume=False, line_range=(0, None)):
+    """Send to every pending wallet in `line_range`, track the deposits and print a summary"""
+    global journal
+    connect()
+
+    # Every state transition is appended to the journal as it happens
+    journal = Journal(JOURNAL_PATH, resume = resume)
+    sent = []
+    completed = set()
+    if resume:
+        journal_entries = fold_journal(JOURNAL_PATH)
+        sent, held = reconcile_journal(journal_entries)
+        completed = completed_wallets(journal_entries) | held
+        del journal_entries
+        print(f"Resuming: {len(completed)} wallet(s) already done, {len(sent)} deposit(s) still in flight, "
+              f"{len(held)} held back until the next --resume")
+        # Re-broadcasts may have taken nonces the managers have not seen
+        for sender in senders:
+            sender.nonce_manager.resync(web3.eth.get_transaction_count(sender.address, 'pending'))
+
+    # Blocks are followed from here on to confirm what this run sends
+    start_block = web3.eth.block_number
+    pending_wallets = iter_wallets(WALLETS_PATH, *line_range, dedupe = DEDUPE_WALLETS, skip = completed)
+    inbound_address_base = get_inbound_address(BASE_CHAIN_ID)
+
+    if not inbound_address_base:
+        print(f"Error: Inbound address for Base chain ID {BASE_CHAIN_ID} not found.")
+        exit()
+
+    print(f"Using Gas.zip inbound address: {inbound_address_base}")
+    print(f"Processing Solana wallets from {WALLETS_PATH} (lines {line_range[0]}:{line_range[1] or 'end'})...")
+    print(f"\n💰 ETH Amount Configuration:")
+    print(f"  Minimum ETH per transaction: {MIN_ETH_AMOUNT} ETH")
+    print(f"  Maximum ETH per transaction: {MAX_ETH_AMOUNT} ETH")
+    print(f"\n⛽ Gas Configuration (EIP-1559):")
+    print(f"  Priority Fee Multiplier: {MAX_PRIORITY_FEE_MULTIPLIER}x")
+    print(f"  Max Fee Multiplier: {MAX_FEE_MULTIPLIER}x")
+    print(f"\n🔑 Senders: {len(senders)} key(s), {SENDER_SCHEDULER} scheduling")
+
+    for i, (solana_wallet, quote_future) in enumerate(prefetch_quotes(pending_wallets)):
+        # No fixed delay between wallets: Gas.zip calls are paced by the rate limiter
+        print(f"\n{'=' * 60}")
+        print(f"Processing wallet {i + 1}: {solana_wallet}")
+
+        # Validate Solana address
+        if quote_future is None:
+            print(f"Warning: Invalid Solana address format: {solana_wallet}")
+            journal.record(solana_wallet, SKIPPED, reason = "Invalid Solana address format")
+            continue
 
-    if not calldata_quote:
-        print("Could not get calldata quote. Skipping this wallet.")
-        results.append({
-            "solana_wallet": solana_wallet,
-            "status": "Skipped - No calldata quote available",
-            "eth_amount": eth_amount
-        })
-        continue
-
-    calldata = calldata_quote.get("calldata")
-    quotes = calldata_quote.get("quotes", [])
-
-    if not calldata:
-        print("No calldata received from Gas.zip. Skipping this wallet.")
-        results.append({
-            "solana_wallet": solana_wallet,
-            "status": "Skipped - No calldata received",
-            "eth_amount": eth_amount
-        })
-        continue
-
-    print(f"Received calldata: {calldata}")
-    if quotes:
-        for quote in quotes:
-            chain_id = quote.get("chain", "Unknown")
-            expected_amount = quote.get("expected", "0")
-            usd_value = quote.get("usd", 0)
-            print(f"  Expected output on chain {chain_id}: {expected_amount} wei (~${usd_value:.4f})")
-
-    # Send the bridging transaction
-    try:
-        print("Sending bridge transaction...")
-        tx_hash = send_bridge_transaction(
-            PRIVATE_KEY,
-            account.address,
-            eth_amount,
-            inbound_address_base,
-            calldata
-        )
-        print(f"Bridge transaction sent! Hash: {tx_hash}")
-        print(f"Base explorer: https://basescan.org/tx/{tx_hash}")
-
-        # Track the deposit status
-        print("Tracking deposit status...")
-        deposit_status = track_deposit_status(tx_hash)
-
-        result_entry = {
-            "solana_wallet": solana_wallet,
-            "eth_amount": eth_amount,
-            "base_tx_hash": tx_hash,
-            "calldata": calldata,
-            "quotes": quotes,
-            "deposit_status": deposit_status
-        }
-
-        # Check if bridging was successful
-        if deposit_status and not deposit_status.get("timeout"):
-            final_status = deposit_status.get("deposit", {}).get("status", "UNKNOWN")
-            result_entry["final_status"] = final_status
-
-            outbound_txs = deposit_status.get("outbound", [])
-            if outbound_txs:
-                result_entry["solana_tx_hashes"] = [tx.get("hash") for tx in outbound_txs]
-                print(f"✅ Bridge completed! Solana transaction(s): {result_entry['solana_tx_hashes']}")
-            else:
-                print(f"⚠️  Bridge status: {final_status} (no outbound transactions yet)")
-        else:
-            result_entry["final_status"] = "TIMEOUT_OR_ERROR"
-            print("❌ Bridge tracking timed out or failed")
+        # Quote was requested ahead of time; usually it is already here
+        eth_amount, calldata_quote = quote_future.result()
+        print(f"Planning to send {eth_amount:.6f} ETH from Base to Solana wallet: {solana_wallet}")
+
+        if not calldata_quote:
+            print("Could not get calldata quote. Skipping this wallet.")
+            journal.record(solana_wallet, FAILED, reason = "No calldata quote available", eth_amount = eth_amount)
+            continue
 
-        results.append(result_entry)
+        calldata = calldata_quote.get("calldata")
+        quotes = calldata_quote.get("quotes", [])
 
-    except Exception as e:
-        print(f"❌ Error sending bridge transaction for {solana_wallet}: {e}")
-        results.append({
-            "solana_wallet": solana_wallet,
-            "eth_amount": eth_amount,
-            "status": f"Failed to send transaction: {str(e)}"
-        })
-
-    # Add delay between transactions to avoid rate limiting
-    if i < len(SOLANA_WALLETS) - 1:
-        print(f"Waiting {sleep_time} seconds before next transaction...")
-        time.sleep(sleep_time)
-
-# Save results to file
-output_file = "bridge_results.json"
-with open(output_file, "w") as f:
-    json.dump(results, f, indent = 4)
-
-print(f"\n{'=' * 60}")
-print("🎉 Script completed!")
-print(f"Results saved to {output_file}")
-
-# Summary
-successful_bridges = sum(1 for r in results if r.get("final_status") == "CONFIRMED")
-failed_bridges = sum(
-    1 for r in results if "Failed" in r.get("status", "") or r.get("final_status") in ["FAILED", "CANCELLED"])
-pending_bridges = len(results) - successful_bridges - failed_bridges
-
-print(f"\nSummary:")
-print(f"  ✅ Successful bridges: {successful_bridges}")
-print(f"  ❌ Failed bridges: {failed_bridges}")
-print(f"  ⏳ Pending/Timeout bridges: {pending_bridges}")
-print(f"  📊 Total processed: {len(results)}")
-
-if successful_bridges > 0:
-    print(f"\n🎯 Successfully bridged ETH from Base to {successful_bridges} Solana wallet(s)!")
+        if not calldata:
+            print("No calldata received from Gas.zip. Skipping this wallet.")
+            journal.record(solana_wallet, FAILED, reason = "No calldata received", eth_amount = eth_amount)
+            continue
+
+        print(f"Received calldata: {calldata}")
+        if quotes:
+            for quote in quotes:
+                chain_id = quote.get("chain", "Unknown")
+                expected_amount = quote.get("expected", "0")
+                usd_value = quote.get("usd", 0)
+                print(f"  Expected output on chain {chain_id}: {expected_amount} wei (~${usd_value:.4f})")
+        journal.record(solana_wallet, QUOTED, eth_amount = eth_amount, quotes = quotes,
+                       calldata_source = calldata_quote.get("source", "api"))
+
+        # Pick a sender key that can pay for it; the worst-case cost stays reserved until confirmed
+        reserved_wei = web3.to_wei(eth_amount, 'ether') + FALLBACK_GAS_LIMIT * get_eip1559_gas_params()[0]
+        sender = senders.acquire(reserved_wei)
+        if sender is None:
+            print("No sender key has enough ETH left for this transaction. Skipping this wallet.")
+            journal.record(solana_wallet, FAILED, reason = "Insufficient balance on all sender keys")
+            continue
+
+        # Send the bridging transaction
+        try:
+            print(f"Sending bridge transaction from {sender.address}...")
+            tx_hash = send_bridge_transaction(
+                sender,
+                eth_amount,
+                inbound_address_base,
+                calldata,
+                solana_wallet = solana_wallet
+            )
+            print(f"Bridge transaction sent! Hash: {tx_hash}")
+            print(f"Base explorer: https://basescan.org/tx/{tx_hash}")
+
+            # Deposit status is tracked for all wallets at once after sending
+            journal.record(solana_wallet, BROADCAST, tx_hash = tx_hash)
+            sent.append((solana_wallet, tx_hash, BROADCAST, [], sender.address,
+                         sender.nonce_manager.nonce_for(tx_hash)))
+
+        except Exception as e:
+            senders.release(sender, reserved_wei)
+            print(f"❌ Error sending bridge transaction for {solana_wallet}: {e}")
+            journal.record(solana_wallet, FAILED, reason = f"Failed to send transaction: {str(e)}")
+
+    # Close any nonce gaps left by failed broadcasts so no account is stuck
+    for sender in senders:
+        cancel_nonce_gaps(sender)
+
+    # Track every sent deposit concurrently instead of blocking after each wallet
+    print(f"\nTracking {len(sent)} deposit(s)...")
+    track_deposit_statuses(sent, start_block = start_block)
+    journal.close()
+
+    # Save results to file, streamed from the journal
+    output_file = "bridge_results.json"
+    outcome_counts = write_results(output_file, JOURNAL_PATH)
+
+    print(f"\n{'=' * 60}")
+    print("🎉 Script completed!")
+    print(f"Results saved to {output_file}")
+
+    # Summary
+    successful_bridges = outcome_counts.get("CONFIRMED", 0)
+    failed_bridges = sum(outcome_counts.get(k, 0) for k in (FAILED, "FAILED", "CANCELLED"))
+    skipped_wallets = outcome_counts.get(SKIPPED, 0)
+    total_wallets = sum(outcome_counts.values())
+    pending_bridges = total_wallets - successful_bridges - failed_bridges - skipped_wallets
+
+    print(f"\nSummary:")
+    print(f"  ✅ Successful bridges: {successful_bridges}")
+    print(f"  ❌ Failed bridges: {failed_bridges}")
+    print(f"  ⏳ Pending/Timeout bridges: {pending_bridges}")
+    print(f"  ⚠️  Skipped wallets: {skipped_wallets}")
+    print(f"  📊 Total processed: {total_wallets}")
+
+    oracle_stats = gas_oracle.stats()
+    print(f"  ⛽ Gas oracle: {oracle_stats['hits']} cache hits, {oracle_stats['misses']} misses "
+          f"({oracle_stats['rpc_saved']} RPC round trips saved)")
+    gas_limit_stats = gas_limits.stats()
+    print(f"  ⛽ Gas limits: {gas_limit_stats['estimates']} estimates, {gas_limit_stats['hits']} reused "
+          f"across {gas_limit_stats['shapes']} calldata shape(s)")
+    for sender in senders:
+        sender_stats = sender.stats()
+        print(f"  🔑 {sender.address}: {sender_stats['assigned']} assigned, {sender_stats['pending']} unconfirmed")
+    print(f"  📡 RPC: {rpc_provider.failovers} failovers")
+    if REPLACE_STUCK:
+        bump_stats = fee_bumper.stats()
+        print(f"  ⛽ Fee bumps: {bump_stats['replaced']} replaced, {bump_stats['capped']} at a cap, "
+              f"{bump_stats['rejected']} rejected")
+    for stage, stage_stats in metrics.registry.stages().items():
+        print(f"  ⏱  {stage}: {stage_stats['count']} calls, p50 {stage_stats['p50_ms']} ms, "
+              f"p99 {stage_stats['p99_ms']} ms, {stage_stats['errors']} errors")
+    for name, bucket_stats in rate_limits.stats().items():
+        print(f"  🪣 Gas.zip /{name}: {bucket_stats['requests']} requests, {bucket_stats['waited_s']}s rate-limit wait, "
+              f"{bucket_stats['pauses']} server-requested pauses")
+    for url, endpoint_stats in rpc_provider.stats()["endpoints"].items():
+        print(f"     {url}: {endpoint_stats}")
+    if USE_CALLDATA_TEMPLATE:
+        template_stats = calldata_cache.stats()
+        print(f"  🧩 Calldata: {template_stats['local_builds']} built locally, "
+              f"{template_stats['api_quotes']} fetched from Gas.zip")
+
+    if successful_bridges > 0:
+        print(f"\n🎯 Successfully bridged ETH from Base to {successful_bridges} Solana wallet(s)!")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description = "Send ETH from Base to Solana wallets via Gas.zip")
+    parser.add_argument("--resume", action = "store_true",
+                        help = f"continue from {JOURNAL_PATH}: skip finished wallets, re-broadcast signed "
+                               f"transactions and keep tracking sent deposits")
+    parser.add_argument("--lines", metavar = "START:END", type = parse_line_range, default = (0, None),
+                        help = "only process this line range of wallets.txt (0-based, END exclusive)")
+    parser.add_argument("--dry-run", action = "store_true",
+                        help = "only validate wallets and show the plan: no web3, keys, network or journal")
+    args = parser.parse_args(argv)
+    line_range = args.lines
+
+    if BUFFERED_OUTPUT:
+        metrics.buffer_stdout()
+    check_wallets_file()
+    if args.dry_run:
+        dry_run(resume = args.resume, line_range = line_range)
+        return
+    if METRICS_PORT:
+        metrics.serve(METRICS_PORT)
+        print(f"Metrics: http://127.0.0.1:{METRICS_PORT}/metrics")
+    if METRICS_SNAPSHOT_PATH:
+        metrics.start_snapshots(METRICS_SNAPSHOT_PATH)
+    run(resume = args.resume, line_range = line_range)
+
+
+if __name__ == "__main__":
+    main()
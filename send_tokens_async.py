@@ -1,50 +1,170 @@
 import os
 import random
-import json
+import argparse
 import asyncio
 import aiohttp
+import functools
 import time
-from web3 import Web3
-from eth_account import Account
+from concurrent.futures import ProcessPoolExecutor
 from typing import Dict, Any
+from gas_oracle import GasOracle
+from gas_limit_cache import GasLimitCache
+from adaptive_limit import AdaptiveLimiter
+from rate_limit import RateLimiter, get_json_async
+import metrics
+from async_rpc import EthMethods, RPCBatcher, make_connector
+from rpc_pool import RPCPool
+from sender_pool import KEYS_PATH, Sender, SenderPool, read_private_keys
+from nonce_manager import (NonceManager, build_cancel_transaction, is_already_known, is_nonce_conflict, is_nonce_too_low,
+                           is_rejection)
+from deposit_tracker import DepositTracker
+from confirmation_watcher import DROPPED, INCLUDED as TX_INCLUDED, TIMEOUT, ConfirmationWatcher
+from fee_bumper import FeeBumper
+from pipeline import Stage, run_pipeline
+from calldata_template import CalldataCache
+from solana_address import is_valid_address
+from presign import SIGN_WORKERS, SpoolWriter, decode_transaction, read_spool, sign_transaction
+from units import from_wei, to_wei
+from wallet_source import WALLETS_PATH, iter_wallets, parse_line_range
+from journal import (JOURNAL_PATH, QUOTED, SIGNED, BROADCAST, INCLUDED, CONFIRMED, FAILED, SKIPPED, IN_FLIGHT_STATES,
+                     Journal, completed_wallets, fold_journal, write_results)
 
 # ==================== CONFIG ====================
 MIN_ETH_AMOUNT = 0.00015
 MAX_ETH_AMOUNT = 0.0002
-MAX_CONCURRENT_TX = 5  # Количество одновременно выполняемых бриджей
+# Параллельность адаптивная (AIMD): растёт, пока задержка ровная, режется при 429, таймаутах и росте p95.
+# *_START - стартовый лимит, *_MAX - потолок; у котировок, каждого RPC эндпоинта и /deposit свой лимит
+QUOTE_CONCURRENCY_START = 4
+QUOTE_CONCURRENCY_MAX = 64
+RPC_CONCURRENCY_START = 8
+RPC_CONCURRENCY_MAX = 64
+STATUS_CONCURRENCY_START = 4
+STATUS_CONCURRENCY_MAX = 32
+SEND_WORKERS_PER_KEY = 32  # воркеров подписи/отправки на ключ; реальный темп задаёт лимит RPC
+PIPELINE_QUEUE_SIZE = 100  # размер очереди между стадиями пайплайна
+USE_CALLDATA_TEMPLATE = True  # собирать calldata локально после проверки шаблона на реальных котировках
+REQUIRE_ON_CURVE = False  # отклонять ключи вне кривой ed25519 (PDA программ)
+DEDUPE_WALLETS = True  # пропускать повторы в wallets.txt: 16-32 МБ на миллион строк, для огромных чистых файлов - False
+SENDER_SCHEDULER = "least-pending"  # распределение кошельков по ключам: least-pending / round-robin
+FALLBACK_GAS_LIMIT = 100000  # газ, если оценка не удалась; по нему же резервируется баланс ключа
+GAS_LIMIT_RESAMPLE_EVERY = 50  # оценка газа кэшируется по форме calldata, переоценка раз в N транзакций
 MAX_PRIORITY_FEE_MULTIPLIER = 0.1
 MAX_FEE_MULTIPLIER = 2.0
 BASE_CHAIN_ID = 8453
 SOLANA_CHAIN_ID = 501474
-GAS_ZIP_API_BASE_URL = "https://backend.gas.zip/v2"
-BASE_RPC_URL = "https://mainnet.base.org"
+# GAS_ZIP_API_BASE_URL и BASE_RPC_URLS (через запятую) можно переопределить переменными окружения
+GAS_ZIP_API_BASE_URL = os.environ.get("GAS_ZIP_API_BASE_URL", "https://backend.gas.zip/v2")
+# по умолчанию один официальный эндпоинт; с несколькими чтение идёт на самый быстрый живой,
+# падающие временно отключаются, а транзакция уходит сразу на BROADCAST_FANOUT из них
+BASE_RPC_URLS = os.environ["BASE_RPC_URLS"].split(",") if os.environ.get("BASE_RPC_URLS") else [
+    "https://mainnet.base.org",
+]
+BROADCAST_FANOUT = 3  # на сколько эндпоинтов сразу отправлять подписанную транзакцию
+RPC_CONNECTIONS_PER_HOST = 100  # keep-alive соединений на хост (RPC и Gas.zip)
+RPC_TIMEOUT = 15  # таймаут одного RPC запроса, сек
+RPC_BATCH_SIZE = 50  # максимум вызовов в одном JSON-RPC batch
+RPC_BATCH_INTERVAL = 0.01  # как долго копить вызовы перед отправкой batch, сек
+TRACK_DEPOSITS = True  # отслеживать статус депозитов Gas.zip параллельно с отправкой
+QUOTE_REQUESTS_PER_SECOND = 10.0  # бюджет запросов /quotes в секунду (Retry-After и rate-limit заголовки API важнее)
+STATUS_REQUESTS_PER_SECOND = 5.0  # бюджет запросов /deposit в секунду
+DEPOSIT_MAX_WAIT = 300  # сколько ждать финального статуса депозита, сек
+TRACK_RECEIPTS = True  # подтверждать включение в блок Base по новым блокам (O(блоков) RPC, а не O(транзакций))
+BLOCK_TIME = 2.0  # время блока Base, сек
+STUCK_AFTER = 30  # через сколько секунд без включения транзакция проверяется: застряла, недоплачена, выпала
+BASE_WS_URL = os.environ.get("BASE_WS_URL")  # websocket RPC для eth_subscribe newHeads; без него - опрос блоков
+REPLACE_STUCK = True  # заменять застрявшие транзакции той же nonce с поднятыми комиссиями
+FEE_BUMP = 0.125  # на сколько поднимать maxFee и priority fee при замене (ноды требуют минимум 10%)
+MAX_FEE_BUMPS = 5  # сколько раз заменять одну транзакцию
+FALLBACK_MAX_FEE_GWEI = 2.0  # maxFeePerGas, если газ не удалось получить, Gwei
+FALLBACK_PRIORITY_FEE_GWEI = 0.001  # priority fee на тот же случай, Gwei
+# потолок maxFeePerGas для замен, Gwei: даже транзакцию с запасными комиссиями можно поднять все MAX_FEE_BUMPS раз
+MAX_FEE_CAP_GWEI = FALLBACK_MAX_FEE_GWEI * (1 + FEE_BUMP) ** MAX_FEE_BUMPS
+MAX_PRIORITY_FEE_CAP_GWEI = 0.1  # потолок maxPriorityFeePerGas для замен, Gwei
+# Счётчики и гистограммы задержек по стадиям: /metrics на 127.0.0.1:METRICS_PORT и/или JSON в METRICS_SNAPSHOT_PATH
+METRICS_PORT = int(os.environ["METRICS_PORT"]) if os.environ.get("METRICS_PORT") else None
+METRICS_SNAPSHOT_PATH = os.environ.get("METRICS_SNAPSHOT_PATH")
+BUFFERED_OUTPUT = True  # буферизовать stdout и сбрасывать в фоне, а не писать каждую строку
 # =================================================
 
-# Читаем приватный ключ
-with open("pk.txt", "r") as f:
-    PRIVATE_KEY = f.read().strip()
+# При импорте модуль ничего не читает и не ходит в сеть: ключи, соединения и кэши создаются в start(),
+# web3 не используется вовсе (подпись - eth_account, импортируется при первой подписи).
+# Solana адреса читаются из wallets.txt потоково (wallet_source.iter_wallets), не целиком
 
-# Читаем Solana адреса
-with open("wallets.txt", "r") as f:
-    SOLANA_WALLETS = [line.strip() for line in f if line.strip()]
+# Ключи отправителей из pk.txt, создаются при первом start(); nonce и баланс заполняются там же
+senders: SenderPool | None = None
 
-web3 = Web3(Web3.HTTPProvider(BASE_RPC_URL))
-if not web3.is_connected():
-    raise SystemExit("Не удалось подключиться к Base RPC")
+# Шаблон calldata, выученный по реальным котировкам Gas.zip
+calldata_cache = CalldataCache()
 
-account = Account.from_key(PRIVATE_KEY)
-print(f"Sender: {account.address}")
+# Журнал состояний кошельков (JSONL), создаётся в start()
+journal: Journal | None = None
 
-# nonce контроль
-nonce_lock = asyncio.Lock()
-current_nonce = None
+# Трекер депозитов: опрашивает все хэши сразу, не блокируя отправку; создаётся в start()
+deposit_tracker: DepositTracker | None = None
+
+# Следит за новыми блоками Base и сверяет их с отправленными хэшами; создаётся в start()
+confirmation_watcher: ConfirmationWatcher | None = None
+
+# Замены застрявших транзакций (та же nonce, комиссии выше, в пределах потолков), создаётся вместе с senders
+fee_bumper: FeeBumper | None = None
+
+# Адаптивный лимит одновременных запросов котировок Gas.zip
+quote_limiter = AdaptiveLimiter("quotes", QUOTE_CONCURRENCY_START, max_limit=QUOTE_CONCURRENCY_MAX)
+
+# Token bucket на каждый эндпоинт Gas.zip API
+rate_limits = RateLimiter({"quotes": QUOTE_REQUESTS_PER_SECOND, "deposit": STATUS_REQUESTS_PER_SECOND})
+
+# Общая aiohttp сессия (keep-alive к RPC и Gas.zip) и пул RPC эндпоинтов, создаются в start()
+session: aiohttp.ClientSession | None = None
+endpoints: RPCPool | None = None
+
+# Async RPC клиент с батчингом поверх пула, создаётся в start()
+rpc: EthMethods | None = None
+
+# Фоновые задачи трекеров (подтверждения, депозиты), живут от start() до finish()/stop()
+background: list[asyncio.Task] = []
+
+# Статистика компонентов экспортируется рядом со стадиями
+metrics.registry.add_collector("calldata_template", calldata_cache.stats)
+metrics.registry.add_collector("quote_limiter", quote_limiter.stats)
+
+
+def load_senders() -> SenderPool:
+    """Читает pk.txt: по ключу на строку, у каждого своя очередь nonce"""
+    try:
+        private_keys = read_private_keys(KEYS_PATH)
+    except FileNotFoundError:
+        raise SystemExit("pk.txt не найден: добавьте приватные ключи, по одному на строку")
+    if not private_keys:
+        raise SystemExit("pk.txt пуст: добавьте приватные ключи, по одному на строку")
+    return SenderPool(private_keys, scheduler=SENDER_SCHEDULER)
+
+
+async def send_replacement(raw_transaction: str) -> str:
+    with metrics.timer("replace"):
+        return await rpc.send_raw_transaction(raw_transaction)
+
+
+def setup_senders() -> None:
+    """Ключи и движок замен создаются один раз и переживают повторные run() в долгоживущем процессе"""
+    global senders, fee_bumper
+    if senders is not None:
+        return
+    if (MAX_FEE_CAP_GWEI < FALLBACK_MAX_FEE_GWEI * (1 + FEE_BUMP)
+            or MAX_PRIORITY_FEE_CAP_GWEI < FALLBACK_PRIORITY_FEE_GWEI * (1 + FEE_BUMP)):
+        raise SystemExit(f"Потолки комиссий ({MAX_FEE_CAP_GWEI} / {MAX_PRIORITY_FEE_CAP_GWEI} Gwei) не дают поднять "
+                         f"транзакцию с запасными комиссиями ({FALLBACK_MAX_FEE_GWEI} / {FALLBACK_PRIORITY_FEE_GWEI} Gwei)")
+    senders = load_senders()
+    fee_bumper = FeeBumper(senders, send_replacement, bump=FEE_BUMP,
+                           max_fee_cap=to_wei(MAX_FEE_CAP_GWEI, 'gwei'),
+                           max_priority_fee_cap=to_wei(MAX_PRIORITY_FEE_CAP_GWEI, 'gwei'),
+                           max_bumps=MAX_FEE_BUMPS, base_fee_multiplier=MAX_FEE_MULTIPLIER)
+    metrics.registry.add_collector("fee_bumper", fee_bumper.stats)
 
 
 def validate_solana_address(address: str) -> bool:
-    if not (32 <= len(address) <= 44):
-        return False
-    allowed_chars = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
-    return all(c in allowed_chars for c in address)
+    # base58 и ровно 32 байта после декодирования
+    return is_valid_address(address, require_on_curve=REQUIRE_ON_CURVE)
 
 
 async def get_gas_zip_calldata_quote(session: aiohttp.ClientSession,
@@ -56,9 +176,10 @@ async def get_gas_zip_calldata_quote(session: aiohttp.ClientSession,
     url = f"{GAS_ZIP_API_BASE_URL}/quotes/{deposit_chain_id}/{deposit_amount_wei}/{outbound_chain_id}"
     params = {'to': destination_address, 'from': sender_address}
     try:
-        async with session.get(url, params=params, timeout=15) as resp:
-            resp.raise_for_status()
-            return await resp.json()
+        # лимит скорости на эндпоинт, временные ошибки повторяются с jitter
+        with metrics.timer("quote"):
+            return await get_json_async(session, url, rate_limits.bucket("quotes"), params=params, timeout=15,
+                                        limiter=quote_limiter)
     except Exception as e:
         print(f"❌ Ошибка при получении calldata quote: {e}")
         return None
@@ -71,110 +192,715 @@ def get_inbound_address(chain_id: int) -> str | None:
     return inbound_addresses.get(chain_id)
 
 
-def get_eip1559_gas_params() -> tuple[int, int]:
+async def fetch_gas_snapshot() -> tuple[int, int, int]:
+    latest_block = await rpc.get_block('latest')
+    base_fee_per_gas = int(latest_block.get('baseFeePerGas', '0x0'), 16)
     try:
-        latest_block = web3.eth.get_block('latest')
-        base_fee_per_gas = latest_block.get('baseFeePerGas', 0)
-        try:
-            priority_fee = web3.eth.max_priority_fee
-        except:
-            priority_fee = web3.to_wei(0.001, 'gwei')
+        priority_fee = await rpc.max_priority_fee()
+    except Exception:
+        priority_fee = to_wei(FALLBACK_PRIORITY_FEE_GWEI, 'gwei')
+    return int(latest_block['number'], 16), base_fee_per_gas, priority_fee
+
+
+# Один кэш газа на блок для всех параллельных отправок
+gas_oracle = GasOracle(fetch_gas_snapshot)
+
+
+async def estimate_gas(transaction: dict) -> int:
+    return await rpc.estimate_gas(transaction)
+
 
+# Один eth_estimateGas на форму calldata (контракт и длина calldata)
+gas_limits = GasLimitCache(estimate_gas, resample_every=GAS_LIMIT_RESAMPLE_EVERY)
+metrics.registry.add_collector("gas_oracle", gas_oracle.stats)
+metrics.registry.add_collector("gas_limits", gas_limits.stats)
+
+
+async def get_eip1559_gas_params() -> tuple[int, int]:
+    try:
+        with metrics.timer("gas_params"):
+            base_fee_per_gas, priority_fee = await gas_oracle.get_async()
         max_priority_fee_per_gas = int(priority_fee * MAX_PRIORITY_FEE_MULTIPLIER)
         max_fee_per_gas = int((base_fee_per_gas * MAX_FEE_MULTIPLIER) + max_priority_fee_per_gas)
         return max_fee_per_gas, max_priority_fee_per_gas
-    except:
-        return web3.to_wei(2, 'gwei'), web3.to_wei(0.001, 'gwei')
-
-
-async def send_bridge_transaction(private_key: str, sender_address: str, amount_eth: float, inbound_address: str,
-                                  calldata: str) -> str:
-    global current_nonce
+    except Exception:
+        return to_wei(FALLBACK_MAX_FEE_GWEI, 'gwei'), to_wei(FALLBACK_PRIORITY_FEE_GWEI, 'gwei')
 
-    async with nonce_lock:
-        if current_nonce is None:
-            current_nonce = await asyncio.to_thread(web3.eth.get_transaction_count, sender_address)
-        nonce = current_nonce
-        current_nonce += 1
 
-    amount_wei = web3.to_wei(amount_eth, 'ether')
-    max_fee_per_gas, max_priority_fee_per_gas = get_eip1559_gas_params()
+async def build_bridge_transaction(sender_address: str, amount_eth: float, inbound_address: str,
+                                   calldata: str) -> dict:
+    amount_wei = to_wei(amount_eth, 'ether')
+    max_fee_per_gas, max_priority_fee_per_gas = await get_eip1559_gas_params()
 
     try:
-        gas_estimate = await asyncio.to_thread(
-            web3.eth.estimate_gas,
-            {
+        # запас 20% уже включён
+        with metrics.timer("estimate"):
+            gas_limit = await gas_limits.get_async({
                 'from': sender_address,
                 'to': inbound_address,
                 'value': amount_wei,
                 'data': calldata,
                 'maxFeePerGas': max_fee_per_gas,
                 'maxPriorityFeePerGas': max_priority_fee_per_gas
-            }
-        )
-        gas_limit = int(gas_estimate * 1.2)
-    except:
-        gas_limit = 100000
+            })
+    except Exception:
+        gas_limit = FALLBACK_GAS_LIMIT
 
-    transaction = {
+    return {
         'from': sender_address,
         'to': inbound_address,
         'value': amount_wei,
         'gas': gas_limit,
         'maxFeePerGas': max_fee_per_gas,
         'maxPriorityFeePerGas': max_priority_fee_per_gas,
-        'nonce': nonce,
         'data': calldata,
         'chainId': BASE_CHAIN_ID,
         'type': 2
     }
 
-    signed_txn = web3.eth.account.sign_transaction(transaction, private_key)
-    tx_hash = await asyncio.to_thread(web3.eth.send_raw_transaction, signed_txn.rawTransaction)
-    return web3.to_hex(tx_hash)
 
+def sign_bridge_transaction(sender: Sender, transaction: dict) -> tuple[int, str, str]:
+    """Выдаёт nonce и подписывает; возвращает (nonce, raw hex, хэш)"""
+    nonce = sender.nonce_manager.allocate()
+    transaction['nonce'] = nonce
+    with metrics.timer("sign"):
+        raw_transaction, tx_hash = sign_transaction(transaction, sender.private_key)
+    return nonce, raw_transaction, tx_hash
 
-async def process_wallet(semaphore: asyncio.Semaphore, session: aiohttp.ClientSession, solana_wallet: str) -> dict:
-    async with semaphore:
-        if not validate_solana_address(solana_wallet):
-            print(f"⚠️ Пропуск: неверный Solana адрес {solana_wallet}")
-            return {"wallet": solana_wallet, "status": "invalid_address"}
 
-        eth_amount = round(random.uniform(MIN_ETH_AMOUNT, MAX_ETH_AMOUNT), 8)
-        print(f"🔄 Отправка {eth_amount} ETH -> {solana_wallet}")
-
-        deposit_amount_wei = web3.to_wei(eth_amount, 'ether')
-        calldata_quote = await get_gas_zip_calldata_quote(session,
-                                                          BASE_CHAIN_ID,
-                                                          deposit_amount_wei,
-                                                          SOLANA_CHAIN_ID,
-                                                          solana_wallet,
-                                                          account.address)
-        if not calldata_quote or not calldata_quote.get("calldata"):
-            print(f"❌ Нет calldata для {solana_wallet}")
-            return {"wallet": solana_wallet, "status": "no_calldata"}
-
-        calldata = calldata_quote["calldata"]
-        inbound_address = get_inbound_address(BASE_CHAIN_ID)
+async def broadcast_bridge_transaction(sender: Sender, transaction: dict, nonce: int, raw_transaction: str,
+                                       signed_hash: str, solana_wallet: str | None = None) -> tuple[int, str, str]:
+    """Отправляет подписанную транзакцию; возвращает (nonce, raw hex, хэш) - после переподписи они новые"""
+    nonce_manager = sender.nonce_manager
+    for attempt in range(2):
+        try:
+            with metrics.timer("broadcast"):
+                tx_hash = await rpc.send_raw_transaction(raw_transaction)
+        except Exception as e:
+            if not is_rejection(e) or is_already_known(e):
+                # ответа нет (таймаут, обрыв) или нода уже знает эти байты: транзакция могла уйти.
+                # nonce остаётся за подписанным хэшем, исход решат подтверждения по блокам
+                print(f"⚠️ Отправка {signed_hash} не подтверждена ({e}), отслеживается как отправленная")
+                tx_hash = signed_hash
+            else:
+                # нода отказала - транзакции в сети нет, nonce вернётся в пул и достанется следующей
+                nonce_manager.mark_failed(nonce, e)
+                if attempt == 0 and is_nonce_too_low(e):
+                    nonce_manager.resync(await rpc.get_transaction_count(sender.address, 'pending'))
+                    nonce, raw_transaction, signed_hash = sign_bridge_transaction(sender, transaction)
+                    if solana_wallet:
+                        # новые байты в журнал до отправки, иначе --resume дошлёт старые
+                        journal.record(solana_wallet, SIGNED, sender=sender.address, nonce=nonce,
+                                       tx_hash=signed_hash, raw=raw_transaction)
+                    continue
+                raise
+        nonce_manager.mark_sent(nonce, tx_hash)
+        return nonce, raw_transaction, tx_hash
+
+
+async def send_bridge_transaction(sender: Sender, amount_eth: float, inbound_address: str, calldata: str) -> str:
+    transaction = await build_bridge_transaction(sender.address, amount_eth, inbound_address, calldata)
+    nonce, raw_transaction, signed_hash = sign_bridge_transaction(sender, transaction)
+    _, _, tx_hash = await broadcast_bridge_transaction(sender, transaction, nonce, raw_transaction, signed_hash)
+    return tx_hash
+
+
+async def cancel_nonce_gaps(sender: Sender) -> None:
+    """Закрывает дыры в nonce нулевыми self-transfer, чтобы аккаунт не завис"""
+    nonce_manager = sender.nonce_manager
+    for nonce in nonce_manager.gaps():
+        if not nonce_manager.take_gap(nonce):
+            continue  # уже выдан новой транзакции (в демоне задания идут параллельно)
+        max_fee_per_gas, max_priority_fee_per_gas = await get_eip1559_gas_params()
+        transaction = build_cancel_transaction(sender.address, nonce, max_fee_per_gas,
+                                               max_priority_fee_per_gas, BASE_CHAIN_ID)
         try:
-            tx_hash = await send_bridge_transaction(PRIVATE_KEY, account.address, eth_amount, inbound_address, calldata)
-            print(f"✅ TX: {tx_hash}")
-            return {"wallet": solana_wallet, "status": "sent", "tx_hash": tx_hash}
+            raw_transaction, signed_hash = sign_transaction(transaction, sender.private_key)
         except Exception as e:
-            print(f"❌ Ошибка отправки: {e}")
-            return {"wallet": solana_wallet, "status": f"error: {e}"}
+            nonce_manager.mark_failed(nonce, e)
+            print(f"❌ Не удалось закрыть nonce {nonce} ({sender.address}): {e}")
+            continue
+        try:
+            tx_hash = await rpc.send_raw_transaction(raw_transaction)
+        except Exception as e:
+            if is_rejection(e) and not is_already_known(e):
+                nonce_manager.mark_failed(nonce, e)
+                print(f"❌ Не удалось закрыть nonce {nonce} ({sender.address}): {e}")
+                continue
+            tx_hash = signed_hash  # ответа нет - могла уйти, nonce не отдаём
+        nonce_manager.mark_sent(nonce, tx_hash)
+        print(f"🧹 Nonce {nonce} ({sender.address}) закрыт: {tx_hash}")
+
+
+# ==================== PIPELINE ====================
+# validate -> quote -> sign -> broadcast -> track, стадии связаны ограниченными очередями.
+# job - dict с рабочими полями стадии; каждый переход состояния пишется в журнал.
+
+def new_job(solana_wallet: str) -> dict:
+    return {"wallet": solana_wallet}
+
+
+async def validate_stage(job: dict) -> dict | None:
+    if not validate_solana_address(job["wallet"]):
+        print(f"⚠️ Пропуск: неверный Solana адрес {job['wallet']}")
+        journal.record(job["wallet"], SKIPPED, reason="invalid_address")
+        return None
+    return job
+
+
+async def quote_stage(session: aiohttp.ClientSession, job: dict) -> dict | None:
+    solana_wallet = job["wallet"]
+    eth_amount = round(random.uniform(MIN_ETH_AMOUNT, MAX_ETH_AMOUNT), 8)
+    job["eth_amount"] = eth_amount
+
+    if USE_CALLDATA_TEMPLATE:
+        calldata = calldata_cache.build(solana_wallet)
+        if calldata:
+            job["calldata"] = calldata
+            journal.record(solana_wallet, QUOTED, eth_amount=eth_amount, calldata_source="template")
+            return job
+
+    deposit_amount_wei = to_wei(eth_amount, 'ether')
+    calldata_quote = await get_gas_zip_calldata_quote(session,
+                                                      BASE_CHAIN_ID,
+                                                      deposit_amount_wei,
+                                                      SOLANA_CHAIN_ID,
+                                                      solana_wallet,
+                                                      senders.primary.address)  # calldata от отправителя не зависит
+    if not calldata_quote or not calldata_quote.get("calldata"):
+        print(f"❌ Нет calldata для {solana_wallet}")
+        journal.record(solana_wallet, FAILED, reason="no_calldata")
+        return None
+
+    job["calldata"] = calldata_quote["calldata"]
+    if USE_CALLDATA_TEMPLATE:
+        calldata_cache.observe(job["calldata"], solana_wallet)
+    journal.record(solana_wallet, QUOTED, eth_amount=eth_amount, calldata_source="api")
+    return job
+
+
+async def assign_sender(job: dict) -> Sender | None:
+    """Выбирает ключ отправителя и резервирует на нём худшую стоимость транзакции"""
+    max_fee_per_gas, _ = await get_eip1559_gas_params()
+    job["reserved"] = to_wei(job["eth_amount"], 'ether') + FALLBACK_GAS_LIMIT * max_fee_per_gas
+    sender = senders.acquire(job["reserved"])
+    if sender is None:
+        print(f"❌ Ни на одном ключе не хватает ETH для {job['wallet']}")
+        journal.record(job["wallet"], FAILED, reason="insufficient_balance")
+        return None
+    job["sender"] = sender
+    return sender
+
+
+async def sign_stage(job: dict) -> dict | None:
+    sender = await assign_sender(job)
+    if sender is None:
+        return None
+    try:
+        transaction = await build_bridge_transaction(sender.address, job["eth_amount"],
+                                                     get_inbound_address(BASE_CHAIN_ID), job["calldata"])
+        job["nonce"], job["raw_transaction"], job["signed_hash"] = sign_bridge_transaction(sender, transaction)
+        job["transaction"] = transaction
+    except Exception as e:
+        senders.release(sender, job["reserved"])
+        print(f"❌ Ошибка подписи: {e}")
+        journal.record(job["wallet"], FAILED, reason=str(e))
+        return None
+    journal.record(job["wallet"], SIGNED, sender=sender.address, nonce=job["nonce"],
+                   tx_hash=job["signed_hash"], raw=job["raw_transaction"])
+    return job
+
+
+async def broadcast_stage(job: dict) -> dict | None:
+    print(f"🔄 Отправка {job['eth_amount']} ETH -> {job['wallet']}")
+    try:
+        job["nonce"], job["raw_transaction"], tx_hash = await broadcast_bridge_transaction(
+            job["sender"], job["transaction"], job["nonce"], job["raw_transaction"], job["signed_hash"], job["wallet"])
+    except Exception as e:
+        senders.release(job["sender"], job["reserved"])
+        print(f"❌ Ошибка отправки: {e}")
+        journal.record(job["wallet"], FAILED, reason=str(e))
+        return None
+    print(f"✅ TX: {tx_hash}")
+    job["signed_hash"] = job["tx_hash"] = tx_hash
+    journal.record(job["wallet"], BROADCAST, tx_hash=tx_hash)
+    if REPLACE_STUCK:
+        fee_bumper.track(tx_hash, job["sender"], job["transaction"])
+    return job
+
+
+async def track_stage(job: dict) -> None:
+    if confirmation_watcher is not None:
+        # из spool приходят только адрес и nonce, без объекта отправителя
+        record = job.get("record")
+        if record:
+            sender_address, nonce = record["sender"], record["nonce"]
+        else:
+            sender_address, nonce = job["sender"].address, job["nonce"]
+        confirmation_watcher.add(job["tx_hash"], job["wallet"], sender_address, nonce)
+    if deposit_tracker is not None:
+        deposit_tracker.add(job["tx_hash"], job["wallet"])
+
+
+# ==================== PRESIGN / SPOOL ====================
+# --presign: quote -> подпись в пуле процессов -> spool файл, без отправки.
+# --broadcast-spool: поток из spool -> broadcast -> track, без повторной подписи.
+
+async def presign_stage(pool: ProcessPoolExecutor, job: dict) -> dict | None:
+    sender = await assign_sender(job)
+    if sender is None:
+        return None
+    transaction = {}
+    try:
+        transaction = await build_bridge_transaction(sender.address, job["eth_amount"],
+                                                     get_inbound_address(BASE_CHAIN_ID), job["calldata"])
+        # nonce берётся только под собранную транзакцию
+        transaction['nonce'] = sender.nonce_manager.allocate()
+        loop = asyncio.get_running_loop()
+        with metrics.timer("sign"):
+            raw_transaction, tx_hash = await loop.run_in_executor(pool, sign_transaction, transaction,
+                                                                  sender.private_key)
+    except Exception as e:
+        if 'nonce' in transaction:
+            # подпись не удалась - nonce вернётся в пул, иначе в spool останется дыра
+            sender.nonce_manager.mark_failed(transaction['nonce'])
+        senders.release(sender, job["reserved"])
+        print(f"❌ Ошибка подписи: {e}")
+        journal.record(job["wallet"], FAILED, reason=str(e))
+        return None
+    job.update({"nonce": transaction['nonce'], "raw_transaction": raw_transaction, "tx_hash": tx_hash})
+    return job
+
+
+async def spool_stage(spool: SpoolWriter, job: dict) -> None:
+    sender_address = job["sender"].address
+    spool.append({"wallet": job["wallet"], "eth_amount": job["eth_amount"], "sender": sender_address,
+                  "nonce": job["nonce"], "hash": job["tx_hash"], "raw": job["raw_transaction"]})
+    journal.record(job["wallet"], SIGNED, sender=sender_address, nonce=job["nonce"], tx_hash=job["tx_hash"],
+                   raw=job["raw_transaction"])
 
 
-async def main():
-    semaphore = asyncio.Semaphore(MAX_CONCURRENT_TX)
-    async with aiohttp.ClientSession() as session:
-        tasks = [process_wallet(semaphore, session, w) for w in SOLANA_WALLETS]
-        results = await asyncio.gather(*tasks)
+async def broadcast_raw(wallet: str, raw_transaction: str, signed_hash: str, sender: Sender | None = None,
+                        nonce: int | None = None) -> str | None:
+    """Отправляет уже подписанную транзакцию; повтор безопасен - nonce и хэш те же"""
+    nonce_manager = sender.nonce_manager if sender is not None else None
+    try:
+        with metrics.timer("broadcast"):
+            tx_hash = await rpc.send_raw_transaction(raw_transaction)
+    except Exception as e:
+        if is_rejection(e) and not is_nonce_conflict(e):
+            if nonce_manager is not None:
+                nonce_manager.mark_failed(nonce, e)  # дыру закроет cancel_nonce_gaps
+            print(f"❌ Ошибка отправки {signed_hash}: {e}")
+            journal.record(wallet, FAILED, reason=str(e))
+            return None
+        # Уже в мемпуле или в блоке, либо ответа нет - подтверждения по блокам покажут
+        tx_hash = signed_hash
+    if nonce_manager is not None:
+        nonce_manager.mark_sent(nonce, tx_hash)
+    journal.record(wallet, BROADCAST, tx_hash=tx_hash)
+    return tx_hash
+
+
+async def broadcast_spooled_stage(job: dict) -> dict | None:
+    record = job["record"]
+    # nonce и стоимость spool-транзакции учитываются на ключе, как при обычной отправке:
+    # отказ оставит дыру для cancel_nonce_gaps, застрявшую заменит fee_bumper
+    sender = senders.get(record["sender"])
+    try:
+        transaction = decode_transaction(record["raw"])
+    except Exception as e:
+        print(f"❌ Испорченная запись spool для {job['wallet']}: {e}")
+        journal.record(job["wallet"], FAILED, reason=str(e))
+        return None
+    reserved = transaction['value'] + transaction['gas'] * transaction['maxFeePerGas']
+    if sender is not None:
+        sender.nonce_manager.claim(record["nonce"])
+        senders.assign(sender, reserved)
+    tx_hash = await broadcast_raw(job["wallet"], record["raw"], record["hash"], sender, record["nonce"])
+    if tx_hash is None:
+        if sender is not None:
+            senders.release(sender, reserved)
+        return None
+    print(f"✅ TX: {tx_hash}")
+    job["tx_hash"] = tx_hash
+    if REPLACE_STUCK and sender is not None:
+        fee_bumper.track(tx_hash, sender, transaction)
+    return job
 
-    with open("bridge_results.json", "w") as f:
-        json.dump(results, f, indent=4)
+
+async def find_sent(entry: dict) -> bool | None:
+    """Ушла ли транзакция: True - в блоке или мемпуле, False - нигде нет или откатилась, None - не проверить"""
+    try:
+        for tx_hash in entry.get("replaces", []) + [entry["tx_hash"]]:
+            receipt = await rpc.get_transaction_receipt(tx_hash)
+            if receipt:
+                return receipt.get("status") == "0x1"
+            if await rpc.find_transaction(tx_hash) is not None:
+                return True
+    except Exception as e:
+        print(f"⚠️ Не удалось проверить {entry['tx_hash']}: {e}")
+        return None
+    return False
+
+
+async def reconcile_journal(entries: dict) -> set:
+    """--resume: досылает подписанные, но не отправленные транзакции и возвращает отправленные в трекер
+
+    FAILED с хэшем (потерянный ответ на отправку, выпадение) перед повтором ищется в сети: найденная
+    транзакция снова отслеживается, а кошельки, которые проверить не удалось, в этот запуск не отправляются -
+    их и возвращает функция.
+    """
+    signed = [(wallet, entry) for wallet, entry in entries.items() if entry["state"] == SIGNED and entry.get("raw")]
+    hashes = await asyncio.gather(*(broadcast_raw(wallet, entry["raw"], entry["tx_hash"]) for wallet, entry in signed))
+    for (wallet, entry), tx_hash in zip(signed, hashes):
+        if tx_hash is not None:
+            entry.update({"state": BROADCAST, "tx_hash": tx_hash})
+
+    failed = [(wallet, entry) for wallet, entry in entries.items() if entry["state"] == FAILED and entry.get("tx_hash")]
+    found = await asyncio.gather(*(find_sent(entry) for _, entry in failed))
+    held = set()
+    for (wallet, entry), sent in zip(failed, found):
+        if sent is None:
+            held.add(wallet)
+        elif sent:
+            print(f"🔎 {entry['tx_hash']} для {wallet} всё-таки отправлена, повтора не будет")
+            journal.record(wallet, BROADCAST, tx_hash=entry["tx_hash"])
+            entry["state"] = BROADCAST
+
+    in_flight = [(wallet, entry) for wallet, entry in entries.items()
+                 if entry["state"] in IN_FLIGHT_STATES and entry.get("tx_hash")]
+    for wallet, entry in in_flight:
+        if confirmation_watcher is not None and entry["state"] == BROADCAST:
+            # замены смотрим вместе с исходной транзакцией: в блок могла попасть любая
+            hashes = entry.get("replaces", []) + [entry["tx_hash"]]
+            confirmation_watcher.add(hashes[0], wallet, entry.get("sender"), entry.get("nonce"))
+            for old_hash, new_hash in zip(hashes, hashes[1:]):
+                confirmation_watcher.replace(old_hash, new_hash)
+        if deposit_tracker is not None:
+            deposit_tracker.add(entry["tx_hash"], wallet)
+    print(f"♻️ Продолжение: {len(completed_wallets(entries))} кошельков уже обработано, "
+          f"{len(signed)} подписанных дослано, {len(in_flight)} депозитов в отслеживании, "
+          f"{len(held)} отложено до следующего --resume")
+    return held
+
+
+async def track_deposits() -> None:
+    poller = asyncio.create_task(deposit_tracker.run())
+    async for tx_hash, deposit_status, wallet in deposit_tracker.results():
+        if deposit_status.get("timeout"):
+            # остаётся в состоянии broadcast - --resume продолжит отслеживание
+            journal.record(wallet, BROADCAST, tx_hash=tx_hash, final_status="TIMEOUT")
+            print(f"⏳ Таймаут отслеживания депозита {tx_hash}")
+            continue
+        final_status = deposit_status.get("deposit", {}).get("status", "UNKNOWN")
+        senders.confirm(tx_hash)
+        fee_bumper.forget(tx_hash)
+        if confirmation_watcher is not None:
+            # депозит подтверждён - значит транзакция в блоке, ждать receipt незачем
+            confirmation_watcher.discard(tx_hash)
+        solana_tx_hashes = [tx.get("hash") for tx in deposit_status.get("outbound", [])]
+        journal.record(wallet, CONFIRMED, tx_hash=tx_hash, final_status=final_status,
+                       solana_tx_hashes=solana_tx_hashes)
+        print(f"🌉 Депозит {tx_hash}: {final_status} {solana_tx_hashes}")
+    await poller
+
+
+async def replace_stuck(wallet: str, tx_hash: str, event: dict) -> None:
+    """Перевыпускает застрявшую транзакцию с той же nonce и поднятыми комиссиями"""
+    new_hash = await fee_bumper.replace(tx_hash, event["base_fee"])
+    if new_hash is None:
+        return
+    confirmation_watcher.replace(tx_hash, new_hash)
+    if deposit_tracker is not None:
+        # депозит ищется по хэшу новой транзакции; если в блок попадёт старая - вернёмся к ней
+        deposit_tracker.discard(tx_hash)
+        deposit_tracker.add(new_hash, wallet)
+    hashes = fee_bumper.hashes(new_hash)
+    journal.record(wallet, BROADCAST, tx_hash=new_hash, replaces=hashes[:-1])
+    print(f"⛽ Транзакция {tx_hash} заменена на {new_hash} (замена {len(hashes) - 1})")
+
+
+async def watch_confirmations() -> None:
+    watcher = asyncio.create_task(confirmation_watcher.run())
+    async for tx_hash, event, wallet in confirmation_watcher.results():
+        status = event["status"]
+        metrics.registry.inc("bridge_tx_events_total", status=status)
+        if status in (TX_INCLUDED, DROPPED, TIMEOUT):
+            fee_bumper.forget(tx_hash)
+        if status == TX_INCLUDED:
+            senders.confirm(tx_hash)
+            journal.record(wallet, INCLUDED, tx_hash=tx_hash, block=event["block"], success=event["success"])
+            if event["replaced"] and deposit_tracker is not None:
+                # в блок попала одна из версий - депозит отслеживается по её хэшу
+                for replaced_hash in event["replaced"]:
+                    deposit_tracker.discard(replaced_hash)
+                deposit_tracker.add(tx_hash, wallet)
+            if not event["success"]:
+                # ETH не ушёл, депозита не будет; --resume отправит заново
+                print(f"❌ Транзакция {tx_hash} откатилась в блоке {event['block']}")
+                journal.record(wallet, FAILED, reason="reverted", tx_hash=tx_hash)
+                if deposit_tracker is not None:
+                    deposit_tracker.discard(tx_hash)
+        elif status == DROPPED:
+            # nonce занят другой транзакцией, наша в блок не попала: ETH не ушёл, --resume отправит заново
+            senders.drop(tx_hash)
+            print(f"🕳  Транзакция {tx_hash} выпала: её nonce занят другой транзакцией")
+            journal.record(wallet, FAILED, reason="dropped", tx_hash=tx_hash)
+            if deposit_tracker is not None:
+                deposit_tracker.discard(tx_hash)
+        elif status == TIMEOUT:
+            print(f"⏳ Транзакция {tx_hash} не включена за {event['age']:.0f} с")
+            if deposit_tracker is None:
+                # больше никто не запишет исход; остаётся в broadcast - --resume продолжит отслеживание
+                journal.record(wallet, BROADCAST, tx_hash=tx_hash, final_status="TIMEOUT")
+        else:
+            if event["missing"]:
+                print(f"⚠️ Транзакция {tx_hash} не найдена ни на одном RPC за {event['age']:.0f} с")
+            else:
+                print(f"⚠️ Транзакция {tx_hash} ждёт {event['age']:.0f} с ({status}): "
+                      f"maxFee {event['max_fee_per_gas']}, baseFee {event['base_fee']}")
+            if REPLACE_STUCK:
+                await replace_stuck(wallet, tx_hash, event)
+    await watcher
+
+
+def dry_run(resume: bool = False, line_range: tuple[int, int | None] = (0, None)) -> dict:
+    """План без сети, ключей и журнала: проверка адресов и суммы, стартует за миллисекунды"""
+    done = completed_wallets(fold_journal(JOURNAL_PATH, drop=("raw",))) if resume else set()
+    planned = invalid = 0
+    total_eth = 0.0
+    for solana_wallet in iter_wallets(WALLETS_PATH, *line_range, dedupe=DEDUPE_WALLETS, skip=done):
+        if not validate_solana_address(solana_wallet):
+            invalid += 1
+            print(f"⚠️ Неверный Solana адрес: {solana_wallet}")
+            continue
+        eth_amount = round(random.uniform(MIN_ETH_AMOUNT, MAX_ETH_AMOUNT), 8)
+        planned += 1
+        total_eth += eth_amount
+        print(f"📝 {eth_amount} ETH -> {solana_wallet}")
+    summary = {"planned": planned, "invalid": invalid, "already_done": len(done), "total_eth": round(total_eth, 8)}
+    print(f"🧪 Пробный запуск, ничего не отправлено: {summary}")
+    return summary
+
+
+async def load_sender_state() -> None:
+    """nonce и баланс всех ключей одним batch; дальше nonce выдаются локально"""
+    addresses = [sender.address for sender in senders]
+    nonces, balances = await asyncio.gather(
+        asyncio.gather(*(rpc.get_transaction_count(address, 'pending') for address in addresses)),
+        asyncio.gather(*(rpc.get_balance(address) for address in addresses)))
+    for sender, nonce, balance in zip(senders, nonces, balances):
+        sender.nonce_manager = NonceManager(nonce)
+        sender.balance = balance
+        print(f"🔑 {sender.address}: nonce {nonce}, {from_wei(balance, 'ether'):.6f} ETH")
+
+
+async def refresh_balances() -> None:
+    """Перечитывает баланс ключей без неподтверждённых отправок: резерв по худшей цене газа больше
+    реально потраченного, и в долгоживущем процессе баланс иначе только убывает"""
+    idle = [(sender, sender.assigned) for sender in senders if sender.pending == 0]
+    balances = await asyncio.gather(*(rpc.get_balance(sender.address) for sender, _ in idle))
+    for (sender, assigned), balance in zip(idle, balances):
+        # за время запроса ключ мог получить новый кошелёк - тогда его резерв важнее
+        if sender.pending == 0 and sender.assigned == assigned:
+            sender.balance = balance
+
+
+async def start(resume: bool = False, track: bool = True) -> set[str]:
+    """Ключи, журнал, соединения, газ-оракул, трекеры и nonce - всё, что живёт дольше одной пачки
+
+    Возвращает кошельки, уже обработанные по журналу (при resume). Закрывается через stop().
+    """
+    global session, endpoints, rpc, deposit_tracker, confirmation_watcher, journal
+
+    setup_senders()
+    journal = Journal(JOURNAL_PATH, resume=resume)
+    session = aiohttp.ClientSession(connector=make_connector(RPC_CONNECTIONS_PER_HOST))
+    endpoints = RPCPool.from_urls(session, BASE_RPC_URLS, timeout=RPC_TIMEOUT,
+                                  broadcast_fanout=BROADCAST_FANOUT,
+                                  initial_concurrency=RPC_CONCURRENCY_START,
+                                  max_concurrency=RPC_CONCURRENCY_MAX)
+    rpc = RPCBatcher(endpoints,
+                     max_size=RPC_BATCH_SIZE,
+                     flush_interval=RPC_BATCH_INTERVAL)
+    metrics.registry.add_collector("rpc", rpc.stats)
+    confirmation_watcher = None
+    deposit_tracker = None
+    if TRACK_RECEIPTS and track:
+        confirmation_watcher = ConfirmationWatcher(rpc, block_time=BLOCK_TIME, stuck_after=STUCK_AFTER,
+                                                   ws_url=BASE_WS_URL, session=session)
+        metrics.registry.add_collector("confirmations", confirmation_watcher.stats)
+        background.append(asyncio.create_task(watch_confirmations()))
+    if TRACK_DEPOSITS and track:
+        deposit_tracker = DepositTracker(session, GAS_ZIP_API_BASE_URL,
+                                         limiter=AdaptiveLimiter("status", STATUS_CONCURRENCY_START,
+                                                                 max_limit=STATUS_CONCURRENCY_MAX),
+                                         bucket=rate_limits.bucket("deposit"),
+                                         max_wait_time=DEPOSIT_MAX_WAIT)
+        background.append(asyncio.create_task(track_deposits()))
+    gas_oracle.start()
+    done = set()
+    if resume:
+        entries = fold_journal(JOURNAL_PATH)
+        held = await reconcile_journal(entries)
+        done = completed_wallets(entries) | held
+        del entries
+    # nonce читаем после досылки из журнала, чтобы не выдать занятые
+    await load_sender_state()
+    return done
+
+
+def send_stages(size: int | None = None) -> list[Stage]:
+    """validate -> quote -> sign -> broadcast -> track; для пачки из size кошельков воркеров не больше size"""
+    # воркеров отправки больше с числом ключей: у каждого своя очередь nonce
+    send_concurrency = SEND_WORKERS_PER_KEY * len(senders)
+    quote_concurrency = QUOTE_CONCURRENCY_MAX
+    if size is not None:
+        send_concurrency = max(1, min(send_concurrency, size))
+        quote_concurrency = max(1, min(quote_concurrency, size))
+    return [
+        Stage("validate", validate_stage, 1, PIPELINE_QUEUE_SIZE),
+        Stage("quote", functools.partial(quote_stage, session), quote_concurrency, PIPELINE_QUEUE_SIZE),
+        Stage("sign", sign_stage, send_concurrency, PIPELINE_QUEUE_SIZE),
+        Stage("broadcast", broadcast_stage, send_concurrency, PIPELINE_QUEUE_SIZE),
+        Stage("track", track_stage, 1, PIPELINE_QUEUE_SIZE),
+    ]
+
+
+async def finish() -> None:
+    """Конец прохода: закрыть дыры nonce, дождаться включения в блоки и статусов депозитов"""
+    await asyncio.gather(*(cancel_nonce_gaps(sender) for sender in senders))
+    if confirmation_watcher is not None:
+        print(f"⏳ Ожидание включения {confirmation_watcher.outstanding} транзакций в блоки...")
+        confirmation_watcher.close()
+    if deposit_tracker is not None:
+        print(f"⏳ Ожидание статусов {deposit_tracker.outstanding} депозитов...")
+        deposit_tracker.close()
+    await asyncio.gather(*background)
+
+
+async def stop() -> None:
+    """Останавливает фоновые задачи и закрывает соединения и журнал; безопасно и после неудачного start()"""
+    for task in background:
+        if not task.done():
+            task.cancel()
+    background.clear()
+    await gas_oracle.stop()
+    if rpc is not None:
+        await rpc.close()
+    if endpoints is not None:
+        await endpoints.close()
+    if session is not None:
+        await session.close()
+    if journal is not None:
+        journal.close()
+
+
+async def run(presign_spool: str | None = None, broadcast_spool: str | None = None, resume: bool = False,
+              line_range: tuple[int, int | None] = (0, None)):
+    """Один проход по wallets.txt; можно вызывать повторно из долгоживущего процесса"""
+    pool = None
+    spool = None
+    try:
+        done = await start(resume=resume, track=not presign_spool)
+
+        def jobs():
+            # фиксированный пул воркеров тянет адреса из генератора по мере освобождения очереди
+            for solana_wallet in iter_wallets(WALLETS_PATH, *line_range, dedupe=DEDUPE_WALLETS, skip=done):
+                yield new_job(solana_wallet)
+
+        def spooled_jobs():
+            for record in read_spool(broadcast_spool):
+                if record["wallet"] not in done:
+                    job = new_job(record["wallet"])
+                    job["record"] = record
+                    yield job
+
+        if broadcast_spool:
+            items = spooled_jobs()
+            send_concurrency = SEND_WORKERS_PER_KEY * len(senders)
+            stages = [
+                Stage("broadcast", broadcast_spooled_stage, send_concurrency, PIPELINE_QUEUE_SIZE),
+                Stage("track", track_stage, 1, PIPELINE_QUEUE_SIZE),
+            ]
+        elif presign_spool:
+            items = jobs()
+            pool = ProcessPoolExecutor(SIGN_WORKERS)
+            spool = SpoolWriter(presign_spool)
+            stages = send_stages()[:2] + [
+                Stage("sign", functools.partial(presign_stage, pool), SIGN_WORKERS * 2, PIPELINE_QUEUE_SIZE),
+                Stage("spool", functools.partial(spool_stage, spool), 1, PIPELINE_QUEUE_SIZE),
+            ]
+        else:
+            items = jobs()
+            stages = send_stages()
+
+        stage_stats = await run_pipeline(items, stages)
+        if spool is not None:
+            print(f"📝 Подписано {spool.written} транзакций в {presign_spool}")
+        await finish()
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        if spool is not None:
+            spool.close()
+        await stop()
+
+    # Итог собирается потоково из журнала, а не из списка в памяти
+    outcome_counts = write_results("bridge_results.json", JOURNAL_PATH)
     print("🎉 Готово, результаты сохранены.")
+    print(f"📊 Итог: {outcome_counts}")
+    print(f"⛽ Кэш газа: {gas_oracle.stats()}")
+    print(f"⛽ Лимиты газа: {gas_limits.stats()}")
+    print(f"📡 RPC: {rpc.stats()}")
+    print(f"🛰  Эндпоинты: {endpoints.stats()}")
+    print(f"🔑 Отправители: {senders.stats()}")
+    print(f"🧵 Стадии: {stage_stats}")
+    print(f"⏱  Задержки: {metrics.registry.stages()}")
+    print(f"🎚  Лимит котировок: {quote_limiter.stats()}")
+    print(f"🪣 Gas.zip API: {rate_limits.stats()}")
+    if deposit_tracker is not None:
+        print(f"🎚  Лимит /deposit: {deposit_tracker.limiter.stats()}")
+    if confirmation_watcher is not None:
+        print(f"🧱 Подтверждения по блокам: {confirmation_watcher.stats()}")
+    if REPLACE_STUCK:
+        print(f"⛽ Замены с поднятой комиссией: {fee_bumper.stats()}")
+    if USE_CALLDATA_TEMPLATE:
+        print(f"🧩 Calldata: {calldata_cache.stats()}")
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Base -> Solana sender via Gas.zip")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--presign", metavar="SPOOL",
+                      help="подписать транзакции для всех кошельков в spool файл без отправки")
+    mode.add_argument("--broadcast-spool", metavar="SPOOL",
+                      help="отправить заранее подписанные транзакции из spool файла")
+    mode.add_argument("--dry-run", action="store_true",
+                      help="только проверить адреса и показать план, без сети, ключей и журнала")
+    parser.add_argument("--resume", action="store_true",
+                        help=f"продолжить по журналу {JOURNAL_PATH}: пропустить готовые кошельки, "
+                             f"дослать подписанные и доотследить отправленные")
+    parser.add_argument("--lines", metavar="START:END", type=parse_line_range, default=(0, None),
+                        help="обработать только этот диапазон строк wallets.txt (с 0, END не включая)")
+    args = parser.parse_args(argv)
+    if BUFFERED_OUTPUT:
+        metrics.buffer_stdout()
+    try:
+        if args.dry_run:
+            dry_run(resume=args.resume, line_range=args.lines)
+            return
+    except FileNotFoundError:
+        raise SystemExit(f"{WALLETS_PATH} не найден: добавьте Solana адреса, по одному на строку")
+    if METRICS_PORT:
+        metrics.serve(METRICS_PORT)
+        print(f"📈 Метрики: http://127.0.0.1:{METRICS_PORT}/metrics")
+    if METRICS_SNAPSHOT_PATH:
+        metrics.start_snapshots(METRICS_SNAPSHOT_PATH)
+    asyncio.run(run(presign_spool=args.presign, broadcast_spool=args.broadcast_spool, resume=args.resume,
+                    line_range=args.lines))
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    main()
@@ -0,0 +1,184 @@
+import functools
+import threading
+from typing import Any, Dict, List, Optional, Union
+
+from nonce_manager import NonceManager
+
+KEYS_PATH = "pk.txt"
+
+# Default way of picking the sender key for the next wallet, see SCHEDULERS
+DEFAULT_SCHEDULER = "least-pending"
+
+
+def read_private_keys(path: str = KEYS_PATH) -> List[str]:
+    """One private key per line; blank lines and `#` comments are ignored"""
+    keys = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            key = line.strip()
+            if key and not key.startswith("#"):
+                keys.append(key)
+    return keys
+
+
+class Sender:
+    """One sender key: its own nonce lane and a running view of its balance
+
+    `nonce_manager` and `balance` are filled in by the caller from the RPC
+    (`eth_getTransactionCount` / `eth_getBalance`). A `balance` of None means
+    unknown and is treated as unlimited.
+    """
+
+    def __init__(self, private_key: str):
+        self.private_key = private_key
+        self.nonce_manager: Optional[NonceManager] = None
+        self.balance: Optional[int] = None  # wei, minus reservations of unconfirmed sends
+        self.pending = 0  # assigned wallets not yet confirmed or released
+        self.assigned = 0
+
+    @functools.cached_property
+    def address(self) -> str:
+        # Derived on first use: importing eth_account is slow and a dry run never needs it
+        from eth_account import Account
+
+        return Account.from_key(self.private_key).address
+
+    def can_afford(self, cost_wei: int) -> bool:
+        return self.balance is None or self.balance >= cost_wei
+
+    def stats(self) -> Dict[str, Any]:
+        stats = {"assigned": self.assigned, "pending": self.pending, "balance_wei": self.balance}
+        if self.nonce_manager is not None:
+            stats["nonces"] = self.nonce_manager.stats()
+        return stats
+
+
+class RoundRobinScheduler:
+    """Hands wallets to the sender keys in turn"""
+
+    def __init__(self):
+        self._turn = 0
+
+    def pick(self, candidates: List[Sender]) -> Sender:
+        sender = candidates[self._turn % len(candidates)]
+        self._turn += 1
+        return sender
+
+
+class LeastPendingScheduler:
+    """Hands each wallet to the sender key with the fewest unconfirmed transactions"""
+
+    def pick(self, candidates: List[Sender]) -> Sender:
+        return min(candidates, key=lambda sender: (sender.pending, sender.assigned))
+
+
+SCHEDULERS = {
+    "round-robin": RoundRobinScheduler,
+    "least-pending": LeastPendingScheduler,
+}
+
+
+class SenderPool:
+    """Spreads wallets over several sender keys, each with an independent nonce lane
+
+    One account can only keep so many transactions pending, so throughput is
+    capped per key; with N keys sends run in N parallel lanes. `acquire()`
+    picks a key through the scheduler (a `SCHEDULERS` name or any object with
+    `pick(candidates)`) among the keys whose balance covers the cost, and
+    reserves that cost until the send is confirmed or released.
+    """
+
+    def __init__(self, private_keys: List[str], scheduler: Union[str, Any] = DEFAULT_SCHEDULER):
+        if not private_keys:
+            raise ValueError("SenderPool needs at least one private key")
+        self.senders = [Sender(key) for key in private_keys]
+        if len({key.lower().removeprefix("0x") for key in private_keys}) != len(self.senders):
+            raise ValueError("duplicate sender key")
+        self.scheduler = SCHEDULERS[scheduler]() if isinstance(scheduler, str) else scheduler
+        self._lock = threading.Lock()
+        self.rejected = 0  # wallets no key could pay for
+
+    def __len__(self) -> int:
+        return len(self.senders)
+
+    def __iter__(self):
+        return iter(self.senders)
+
+    @property
+    def primary(self) -> Sender:
+        return self.senders[0]
+
+    def get(self, address: str) -> Optional[Sender]:
+        for sender in self.senders:
+            if sender.address.lower() == address.lower():
+                return sender
+        return None
+
+    def acquire(self, cost_wei: int) -> Optional[Sender]:
+        """Pick a sender for one transaction and reserve `cost_wei`; None if no key can afford it"""
+        with self._lock:
+            candidates = [sender for sender in self.senders if sender.can_afford(cost_wei)]
+            if not candidates:
+                self.rejected += 1
+                return None
+            sender = self.scheduler.pick(candidates)
+            if sender.balance is not None:
+                sender.balance -= cost_wei
+            sender.pending += 1
+            sender.assigned += 1
+            return sender
+
+    def assign(self, sender: Sender, cost_wei: int) -> None:
+        """Count a transaction already bound to `sender` (presigned) like `acquire()` would, without picking"""
+        with self._lock:
+            if sender.balance is not None:
+                sender.balance -= cost_wei
+            sender.pending += 1
+            sender.assigned += 1
+
+    def release(self, sender: Sender, cost_wei: int) -> None:
+        """Give back a reservation whose transaction never reached the network"""
+        with self._lock:
+            if sender.balance is not None:
+                sender.balance += cost_wei
+            sender.pending -= 1
+
+    def reserve(self, sender: Sender, cost_wei: int) -> bool:
+        """Reserve extra cost on an already assigned sender (e.g. a fee bump); False if it cannot afford it"""
+        with self._lock:
+            if not sender.can_afford(cost_wei):
+                return False
+            if sender.balance is not None:
+                sender.balance -= cost_wei
+            return True
+
+    def refund(self, sender: Sender, cost_wei: int) -> None:
+        """Give back a `reserve()` whose transaction never reached the network"""
+        with self._lock:
+            if sender.balance is not None:
+                sender.balance += cost_wei
+
+    def _lookup(self, tx_hash: str) -> Optional[tuple]:
+        for sender in self.senders:
+            nonce = sender.nonce_manager.nonce_for(tx_hash) if sender.nonce_manager is not None else None
+            if nonce is not None:
+                return sender, nonce
+        return None
+
+    def confirm(self, tx_hash: str) -> Optional[Sender]:
+        """Mark a sent transaction as confirmed in the nonce lane of the key that sent it (idempotent)"""
+        found = self._lookup(tx_hash)
+        if found is None:
+            return None
+        sender, nonce = found
+        if sender.nonce_manager.mark_confirmed(nonce):
+            with self._lock:
+                sender.pending -= 1
+        return sender
+
+    def drop(self, tx_hash: str) -> Optional[Sender]:
+        """A sent transaction lost its nonce to another one: the nonce is used, not recycled; unassign it"""
+        return self.confirm(tx_hash)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"rejected": self.rejected, "senders": {sender.address: sender.stats() for sender in self.senders}}
@@ -0,0 +1,85 @@
+BASE58_ALPHABET = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+_BASE58_INDEX = {c: i for i, c in enumerate(BASE58_ALPHABET)}
+
+# str.translate table deleting every alphabet character: whatever survives is invalid
+_STRIP_ALPHABET = str.maketrans("", "", BASE58_ALPHABET)
+
+PUBKEY_LENGTH = 32
+# Shortest/longest base58 encodings of a 32-byte value
+MIN_ADDRESS_LENGTH = 32
+MAX_ADDRESS_LENGTH = 44
+
+# ed25519 curve constants for the optional on-curve check
+_P = 2 ** 255 - 19
+_D = -121665 * pow(121666, _P - 2, _P) % _P
+
+
+def b58decode(value: str) -> bytes:
+    """Decode a base58 (Bitcoin alphabet) string; raises ValueError on bad characters"""
+    n = 0
+    try:
+        for c in value:
+            n = n * 58 + _BASE58_INDEX[c]
+    except KeyError as e:
+        raise ValueError(f"invalid base58 character {e.args[0]!r}") from None
+    # Every leading '1' encodes one leading zero byte
+    leading_zeros = len(value) - len(value.lstrip("1"))
+    return b"\x00" * leading_zeros + n.to_bytes((n.bit_length() + 7) // 8, "big")
+
+
+def decode_pubkey(address: str) -> bytes:
+    """Decode a Solana address into its 32-byte public key"""
+    raw = b58decode(address)
+    if len(raw) != PUBKEY_LENGTH:
+        raise ValueError(f"decodes to {len(raw)} bytes, expected {PUBKEY_LENGTH}")
+    return raw
+
+
+def _b58encode_int(n: int) -> str:
+    out = ""
+    while n:
+        n, r = divmod(n, 58)
+        out = BASE58_ALPHABET[r] + out
+    return out
+
+
+# The alphabet is in ASCII order, so for base58 strings without leading '1's
+# numeric order is (length, lexicographic) order. With k leading '1's (zero
+# bytes) the rest must encode a value of exactly 32 - k bytes; these are the
+# smallest and largest such encodings, so a decode-free range check suffices.
+_PUBKEY_BOUNDS = [(_b58encode_int(2 ** (8 * (PUBKEY_LENGTH - 1 - k))),
+                   _b58encode_int(2 ** (8 * (PUBKEY_LENGTH - k)) - 1))
+                  for k in range(PUBKEY_LENGTH)]
+
+
+def _encodes_pubkey(address: str) -> bool:
+    """True if an all-base58 string decodes to exactly 32 bytes, without decoding it"""
+    digits = address.lstrip("1")
+    leading_zeros = len(address) - len(digits)
+    if leading_zeros >= PUBKEY_LENGTH:
+        return leading_zeros == PUBKEY_LENGTH and not digits
+    low, high = _PUBKEY_BOUNDS[leading_zeros]
+    return (len(low), low) <= (len(digits), digits) <= (len(high), high)
+
+
+def is_on_curve(pubkey: bytes) -> bool:
+    """True if the 32 bytes are a valid compressed ed25519 point (a wallet, not a PDA)"""
+    y = int.from_bytes(pubkey, "little") & ((1 << 255) - 1)
+    if y >= _P:
+        return False
+    y2 = y * y % _P
+    u = (y2 - 1) % _P
+    v = (_D * y2 + 1) % _P
+    # x = sqrt(u / v) exists iff v * x^2 == +-u for the candidate root (RFC 8032, 5.1.3)
+    x = u * pow(v, 3, _P) * pow(u * pow(v, 7, _P), (_P - 5) // 8, _P) % _P
+    vx2 = v * x * x % _P
+    return vx2 == u or vx2 == (-u) % _P
+
+
+def is_valid_address(address: str, require_on_curve: bool = False) -> bool:
+    """Strict Solana address check: base58 that decodes to exactly 32 bytes"""
+    if not address or not MIN_ADDRESS_LENGTH <= len(address) <= MAX_ADDRESS_LENGTH:
+        return False
+    if address.translate(_STRIP_ALPHABET) or not _encodes_pubkey(address):
+        return False
+    return not require_on_curve or is_on_curve(decode_pubkey(address))
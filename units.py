@@ -0,0 +1,13 @@
+from decimal import Decimal
+from typing import Union
+
+# Same results as web3's to_wei / from_wei, without importing web3 (about a second at startup)
+UNITS = {"wei": 1, "gwei": 10 ** 9, "ether": 10 ** 18}
+
+
+def to_wei(value: Union[int, float, str, Decimal], unit: str = "ether") -> int:
+    return int(Decimal(str(value)) * UNITS[unit])
+
+
+def from_wei(value: int, unit: str = "ether") -> Decimal:
+    return Decimal(value) / UNITS[unit]
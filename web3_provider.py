@@ -0,0 +1,94 @@
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Dict, List, Optional
+
+import requests
+from web3.providers import HTTPProvider, JSONBaseProvider
+
+from async_rpc import RPC_TIMEOUT
+from nonce_manager import is_nonce_conflict
+from rpc_pool import BROADCAST_FANOUT, BROADCAST_RETRIES, BROADCAST_RETRY_DELAY, EndpointHealth, rank_endpoints
+
+
+class FailoverHTTPProvider(JSONBaseProvider):
+    """web3 provider for the sync script with the same routing as `RPCPool`
+
+    Requests go to the fastest healthy endpoint and fail over on transport
+    errors; `eth_sendRawTransaction` is fanned out over a small thread pool.
+    Lives outside `rpc_pool` so the async sender never imports web3.
+    """
+
+    def __init__(self, urls: List[str], timeout: float = RPC_TIMEOUT, broadcast_fanout: int = BROADCAST_FANOUT):
+        if not urls:
+            raise ValueError("FailoverHTTPProvider needs at least one endpoint")
+        super().__init__()
+        self.endpoints = [EndpointHealth(url) for url in urls]
+        self._providers = {url: HTTPProvider(url, request_kwargs={"timeout": timeout}) for url in urls}
+        self.broadcast_fanout = broadcast_fanout
+        self._executor = ThreadPoolExecutor(max(len(urls), broadcast_fanout), thread_name_prefix="rpc-broadcast")
+        self.failovers = 0
+
+    def _timed(self, endpoint: EndpointHealth, method: str, params: Any) -> Any:
+        started = time.monotonic()
+        try:
+            response = self._providers[endpoint.url].make_request(method, params)
+        except (requests.RequestException, ValueError):
+            endpoint.record_failure()
+            raise
+        endpoint.record_success(time.monotonic() - started)
+        return response
+
+    def make_request(self, method: str, params: Any) -> Any:
+        if method == "eth_sendRawTransaction":
+            return self._broadcast(method, params)
+        last_error: Optional[Exception] = None
+        for attempt, endpoint in enumerate(rank_endpoints(self.endpoints)):
+            if attempt:
+                self.failovers += 1
+            try:
+                return self._timed(endpoint, method, params)
+            except (requests.RequestException, ValueError) as e:
+                last_error = e
+        raise last_error
+
+    def _broadcast(self, method: str, params: Any) -> Any:
+        for attempt in range(BROADCAST_RETRIES + 1):
+            try:
+                response = self._broadcast_once(method, params)
+            except (requests.RequestException, ValueError) as e:
+                transport_error = e
+                if attempt == BROADCAST_RETRIES:
+                    raise
+                time.sleep(BROADCAST_RETRY_DELAY * (attempt + 1))
+                continue
+            # After a silent attempt a nonce conflict may be our own copy: still ambiguous
+            if attempt and "error" in response and is_nonce_conflict(ValueError(response["error"])):
+                raise transport_error
+            return response
+
+    def _broadcast_once(self, method: str, params: Any) -> Any:
+        targets = rank_endpoints(self.endpoints)[:self.broadcast_fanout]
+        pending = {self._executor.submit(self._timed, endpoint, method, params) for endpoint in targets}
+        error_response = None
+        transport_error: Optional[Exception] = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    response = future.result()
+                except (requests.RequestException, ValueError) as e:
+                    transport_error = e
+                    continue
+                if "error" not in response:
+                    # Slower endpoints finish in the background
+                    return response
+                error_response = error_response or response
+        # A refusal is only definite if no target went silent: one that timed out may have taken it
+        if error_response is not None and (transport_error is None
+                                           or is_nonce_conflict(ValueError(error_response["error"]))):
+            return error_response
+        raise transport_error
+
+    def stats(self) -> Dict[str, Any]:
+        return {"failovers": self.failovers,
+                "endpoints": {endpoint.url: endpoint.stats() for endpoint in self.endpoints}}